@@ -919,11 +919,8 @@ function makeColumnPanelDraggable(){
 
 async function main(){
   try{
-    const res = await fetch("./index.json", {cache:"no-store"});
-    if(!res.ok) throw new Error(`index.json HTTP ${res.status}`);
-
-    const data = await res.json();
-    state.all = Array.isArray(data?.items) ? data.items : [];
+    // alle Airlines -> alle Shards, aber aus dem Browser-Cache (helper.js)
+    state.all = await loadIndexShards([]);
     
     try{
       const gtRes = await fetch("./data/group_aircraft_types.json", {cache:"no-store"});
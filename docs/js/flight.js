@@ -92,7 +92,11 @@ function buildFirstBadges(f, firstMaps){
   if(a && t && firstMaps.airlineType.get(a + "|" + t) === id) badges.push("Erstflug Airline+Typ");
   if(a && r && firstMaps.airlineReg.get(a + "|" + r) === id) badges.push("Erstflug Airline+Reg");
 
-  if(!badges.length) return "";
+  return firstBadgesToHtml(badges);
+}
+
+function firstBadgesToHtml(badges){
+  if(!badges || !badges.length) return "";
 
   // Du hast .badge/.pill bereits – wir nutzen .badge-warn als auffällig, sonst .badge
   return badges.map(x => `<span class="badge badge-warn">${x}</span>`).join(" ");
@@ -217,26 +221,36 @@ async function main(){
   }
 
   try{
-    // flights
-    const resF = await fetch("./data/flights.json", {cache:"no-store"});
-    if(!resF.ok) throw new Error(`flights.json HTTP ${resF.status}`);
-    const flights = await resF.json();
-    const items = flights.items || [];
-    
-    const firstMaps = computeFirstMaps(items);
-
-    const f = items.find(x => asText(x.flight_id) === asText(id));
-    if(!f){
-      document.getElementById("content").innerHTML =
-        `<div class="err"><b>Fehler:</b> Flug <span class="mono">${esc(id)}</span> nicht gefunden.</div>`;
-      return;
+    // vorverknüpft (tools/build_details.py): Flug, Erstflug-Badges, Modelle desselben Typs
+    const detail = await loadDetailBundle("flight", id);
+    let f, firstBadgesHtml, models;
+
+    if(detail?.flight){
+      f = detail.flight;
+      firstBadgesHtml = firstBadgesToHtml(detail.first_badges);
+      models = detail.models || [];
+    }else{
+      // flights
+      const resF = await fetch("./data/flights.json", {cache:"no-store"});
+      if(!resF.ok) throw new Error(`flights.json HTTP ${resF.status}`);
+      const flights = await resF.json();
+      const items = flights.items || [];
+      
+      const firstMaps = computeFirstMaps(items);
+
+      f = items.find(x => asText(x.flight_id) === asText(id));
+      if(!f){
+        document.getElementById("content").innerHTML =
+          `<div class="err"><b>Fehler:</b> Flug <span class="mono">${esc(id)}</span> nicht gefunden.</div>`;
+        return;
+      }
+      firstBadgesHtml = buildFirstBadges(f, firstMaps);
+
+      // models index (für Matching)
+      const resI = await fetch("./index.json", {cache:"no-store"});
+      const idx = await resI.json();
+      models = idx.items || [];
     }
-    const firstBadgesHtml = buildFirstBadges(f, firstMaps);
-
-    // models index (für Matching)
-    const resI = await fetch("./index.json", {cache:"no-store"});
-    const idx = await resI.json();
-    const models = idx.items || [];
 
     const dateISO = asText(f.date);
     const timeRaw = asText(f.time);
@@ -11,3 +11,224 @@ function registrationLink(reg){
 
   return `<a href="${esc(airportDataUrl(r))}" target="airportDataTab">${esc(r)}</a>`;
 }
+
+// index.json aufgeteilt nach airline_code (data/index/, siehe tools/build_json.py).
+// codes: gewünschte airline_codes (ohne Groß-/Kleinschreibung, "" = Modelle
+// ohne Code), leer = alle. Reihenfolge wie in index.json (Shards liegen im
+// Manifest nach airline_code sortiert). Die Shards sind über ihren Hash
+// versioniert und dürfen im Browser-Cache liegen. Ohne Manifest (älteres
+// Deployment) wird wie bisher die ganze index.json geladen und gefiltert.
+async function loadIndexShards(codes){
+  const want = new Set((codes || []).map(c => String(c || "").trim().toUpperCase()));
+  try{
+    const res = await fetch("./data/index/manifest.json", {cache:"no-store"});
+    if(!res.ok) throw new Error(`index manifest HTTP ${res.status}`);
+    const manifest = await res.json();
+    const shards = manifest?.shards || {};
+    const selected = Object.keys(shards).filter(c => !want.size || want.has(c.trim().toUpperCase()));
+
+    const parts = await Promise.all(selected.map(async c => {
+      const s = shards[c];
+      const r = await fetch(`./${s.file}?v=${encodeURIComponent(String(s.sha1 || "").slice(0, 12))}`);
+      if(!r.ok) throw new Error(`${s.file} HTTP ${r.status}`);
+      const j = await r.json();
+      return Array.isArray(j?.items) ? j.items : [];
+    }));
+    return parts.flat();
+  }catch(e){
+    const res = await fetch("./index.json", {cache:"no-store"});
+    if(!res.ok) throw new Error(`index.json HTTP ${res.status}`);
+    const j = await res.json();
+    const items = Array.isArray(j?.items) ? j.items : [];
+    if(!want.size) return items;
+    return items.filter(it => want.has(String(it?.airline_code || "").trim().toUpperCase()));
+  }
+}
+
+// Dateiname wie safe_filename() in tools/build_json.py
+function safeFileKey(id){
+  return String(id || "").trim().replace(/[^A-Za-z0-9_-]/g, "_");
+}
+
+// Vorverknüpftes Detail-Bundle einer Seite (data/details/<kind>/<id>.json,
+// siehe tools/build_details.py); null, wenn es nicht gebaut ist.
+async function loadDetailBundle(kind, id){
+  try{
+    const res = await fetch(`./data/details/${kind}/${encodeURIComponent(safeFileKey(id))}.json`, {cache:"no-store"});
+    if(!res.ok) return null;
+    const j = await res.json();
+    return (j && typeof j === "object") ? j : null;
+  }catch(e){
+    return null;
+  }
+}
+
+// Einzelnes Modell-JSON aus dem gepackten Bundle (data/models.bundle.jsonl,
+// siehe tools/utils_bundle.py) per HTTP-Range statt data/models/<id>.json.
+// Ohne Bundle (Standard-Build) oder ohne Range-Unterstützung: Einzeldatei.
+var _modelBundleIndex = null; // var: model.html bindet helper.js zweimal ein
+
+async function loadModelRecord(modelId){
+  const id = String(modelId || "").trim();
+  const key = safeFileKey(id);
+  try{
+    if(!_modelBundleIndex){
+      _modelBundleIndex = fetch("./data/models.bundle.idx.json", {cache:"no-store"})
+        .then(r => { if(!r.ok) throw new Error(`bundle index HTTP ${r.status}`); return r.json(); });
+    }
+    const idx = await _modelBundleIndex;
+    const rec = idx?.records?.[key];
+    if(!rec) throw new Error(`${key} not in bundle`);
+    const [off, len] = rec;
+    const res = await fetch(`./data/${idx.file}?v=${idx.size}`, {headers:{Range:`bytes=${off}-${off + len - 1}`}});
+    if(!res.ok) throw new Error(`bundle HTTP ${res.status}`);
+    let buf = await res.arrayBuffer();
+    // 200 statt 206: Server ignoriert Range, ganze Datei kam zurück
+    if(res.status !== 206) buf = buf.slice(off, off + len);
+    return JSON.parse(new TextDecoder().decode(buf));
+  }catch(e){
+    const res = await fetch(`./data/models/${encodeURIComponent(id)}.json`, {cache:"no-store"});
+    if(!res.ok) throw new Error(`model ${id} HTTP ${res.status}`);
+    return res.json();
+  }
+}
+
+// Globale Suche über Modelle, Flüge, Postkarten, Typen und Bemalungen
+// (data/search/, siehe tools/utils_search.py). Geladen werden nur die Shards
+// der Anfangszeichen der Suchterme; sie bleiben für weitere Eingaben im Speicher.
+// opts: { kinds: ["model", ...], limit: 50 } -> [{kind, id, label, url}]
+var _searchIndex = null;
+
+function searchNormalize(s){
+  return String(s ?? "").toLowerCase().normalize("NFKD")
+    .replace(/[\u0300-\u036f]/g, "").replace(/ß/g, "ss")
+    .replace(/[^a-z0-9]+/g, " ").trim();
+}
+
+function _searchQueryTerms(w){
+  if(w.length < 3) return ["^" + w.slice(0, 2)];
+  const out = [];
+  for(let i = 0; i + 3 <= w.length; i++) out.push(w.slice(i, i + 3));
+  return out;
+}
+
+function _searchShardOf(term){
+  const c = term.replace(/^\^+/, "").charAt(0);
+  return /^[a-z0-9]$/.test(c) ? c : "_";
+}
+
+async function _searchPostings(idx, term){
+  const key = _searchShardOf(term);
+  const meta = idx.manifest?.shards?.[key];
+  if(!meta) return [];
+  if(!idx.shards[key]){
+    idx.shards[key] = fetch(`./data/search/${meta.file}?v=${encodeURIComponent(String(meta.sha1 || "").slice(0, 12))}`)
+      .then(r => { if(!r.ok) throw new Error(`${meta.file} HTTP ${r.status}`); return r.json(); });
+  }
+  const gaps = (await idx.shards[key])[term] || [];
+  let cur = 0;
+  return gaps.map(g => (cur += g));
+}
+
+async function searchGlobal(q, opts){
+  const words = searchNormalize(q).split(" ").filter(Boolean);
+  if(!words.length) return [];
+  if(!_searchIndex){
+    _searchIndex = (async () => {
+      const res = await fetch("./data/search/manifest.json", {cache:"no-store"});
+      if(!res.ok) throw new Error(`search manifest HTTP ${res.status}`);
+      const manifest = await res.json();
+      const d = await fetch(`./data/search/docs.json?v=${encodeURIComponent(String(manifest.docs?.sha1 || "").slice(0, 12))}`);
+      if(!d.ok) throw new Error(`search docs HTTP ${d.status}`);
+      return { manifest, docs: (await d.json()).docs || [], shards: {} };
+    })();
+    _searchIndex.catch(() => { _searchIndex = null; });
+  }
+  const idx = await _searchIndex;
+
+  const terms = [...new Set(words.flatMap(_searchQueryTerms))];
+  const lists = (await Promise.all(terms.map(t => _searchPostings(idx, t)))).sort((a, b) => a.length - b.length);
+  let hits = new Set(lists[0]);
+  for(const ids of lists.slice(1)){
+    if(!hits.size) break;
+    const next = new Set(ids);
+    hits = new Set([...hits].filter(n => next.has(n)));
+  }
+
+  const kinds = opts?.kinds?.length ? new Set(opts.kinds) : null;
+  const limit = opts?.limit ?? Infinity;
+  const out = [];
+  for(const n of [...hits].sort((a, b) => a - b)){
+    const [kind, id, label, url] = idx.docs[n];
+    if(kinds && !kinds.has(kind)) continue;
+    out.push({ kind, id, label, url });
+    if(out.length >= limit) break;
+  }
+  return out;
+}
+
+// Treffer der globalen Suche unter einem Suchfeld der Übersichtsseiten
+// ("Auch gefunden": Flüge, Postkarten, Typen, Bemalungen ...). Das Feld
+// filtert die Seite weiter wie bisher; die Liste ist nur zusätzlich.
+// opts: { exclude: ["model"], limit: 12 } – exclude = Arten, die die Seite
+// selbst schon zeigt.
+var SEARCH_KIND_LABELS = { model: "Modell", flight: "Flug", postcard: "Postkarte", type: "Typ", livery: "Bemalung" };
+
+function searchSuggest(input, opts){
+  if(!input) return;
+  const exclude = new Set(opts?.exclude || []);
+  const kinds = Object.keys(SEARCH_KIND_LABELS).filter(k => !exclude.has(k));
+  const limit = opts?.limit ?? 12;
+
+  const box = document.createElement("div");
+  box.className = "gsearch";
+  box.hidden = true;
+  (input.closest(".bar") || input).insertAdjacentElement("afterend", box);
+
+  let timer = 0;
+  let seq = 0;
+  async function update(){
+    const q = input.value;
+    const mine = ++seq;
+    if(searchNormalize(q).length < 2){
+      box.hidden = true;
+      return;
+    }
+    let hits = [];
+    try{
+      hits = await searchGlobal(q, { kinds, limit });
+    }catch(e){
+      hits = [];   // ohne Suchindex (älteres Deployment) einfach nichts anzeigen
+    }
+    if(mine !== seq) return;   // inzwischen weitergetippt
+    box.replaceChildren();
+    if(!hits.length){
+      box.hidden = true;
+      return;
+    }
+    const title = document.createElement("div");
+    title.className = "gsearchTitle";
+    title.textContent = "Auch gefunden";
+    box.appendChild(title);
+    for(const h of hits){
+      const a = document.createElement("a");
+      a.className = "gsearchHit";
+      a.href = h.url;
+      const kind = document.createElement("span");
+      kind.className = "pill";
+      kind.textContent = SEARCH_KIND_LABELS[h.kind] || h.kind;
+      a.append(kind, " ", h.label);
+      box.appendChild(a);
+    }
+    box.hidden = false;
+  }
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(update, 150);
+  });
+  input.addEventListener("keydown", (ev) => {
+    if(ev.key === "Escape") box.hidden = true;
+  });
+  if(input.value) update();
+}
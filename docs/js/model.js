@@ -1335,11 +1335,21 @@ async function main(){
     return;
   }
   
+  // alles für diese Seite in einer Datei (tools/build_details.py);
+  // ohne Bundle wie bisher aus index.json & Co.
+  const detail = await loadDetailBundle("model", id);
+  if(detail?.family){
+    _aircraftFamiliesCache = { families: { [detail.family.name]: detail.family.rows || [] } };
+  }
+
   let prevId = "", nextId = "", pos = 0, total = 0;
   try{
-    const ids = await loadIndexIds();
-    console.log("current id:", id, "found index:", ids.indexOf(id), "first10:", ids.slice(0,10));
-    const n = navNeighbors(ids, id);
+    let n = detail?.nav;
+    if(!n){
+      const ids = await loadIndexIds();
+      console.log("current id:", id, "found index:", ids.indexOf(id), "first10:", ids.slice(0,10));
+      n = navNeighbors(ids, id);
+    }
     prevId = n.prev; nextId = n.next; pos = n.pos; total = n.total;
     enableArrowKeys(prevId, nextId);
   }catch(e){
@@ -1349,14 +1359,17 @@ async function main(){
   const url = `./data/models/${encodeURIComponent(id)}.json`;
   
   try{
-    const res = await fetch(url, {cache:"no-store"});
-    if(!res.ok) throw new Error(`HTTP ${res.status}`);
-    const d = await res.json();
+    let d = detail?.model;
+    if(!d){
+      // aus dem Modell-Bundle, falls gebaut, sonst data/models/<id>.json (helper.js)
+      d = await loadModelRecord(id);
+    }
 
     let sameTypeModels = [];
     try{
-      const indexItems = await loadIndexItems();
-      const groupTypes = await loadGroupAircraftTypes();
+      const st = detail?.same_type;
+      const indexItems = st ? (st.index_items || []) : await loadIndexItems();
+      const groupTypes = st ? (st.group_types || []) : await loadGroupAircraftTypes();
       const aircraftId = asText(d.aircraft_id);
     
       sameTypeModels = buildSameTypeOverviewRows(indexItems, groupTypes, aircraftId);
@@ -1364,8 +1377,8 @@ async function main(){
       sameTypeModels = [];
     }  
 
-    const photosEnriched = await loadAircraftPhotosEnriched();
-    const photoE = photosEnriched ? (photosEnriched[id] || null) : null;    
+    const photosEnriched = detail ? null : await loadAircraftPhotosEnriched();
+    const photoE = detail ? (detail.photo_enriched || null) : (photosEnriched ? (photosEnriched[id] || null) : null);    
     const airline = asText(d.airline_row) || asText(d.airline) || asText(d.airline_code);
     const typ = asText(d.aircraft_type) || asText(d.aircraft?.type);
     const reg = asText(d.registration) || asText(d.aircraft?.registration);
@@ -1481,7 +1494,7 @@ async function main(){
     let enrichedById = {};
     
     if(Array.isArray(d.postcards) && d.postcards.length){
-      enrichedById = await loadPostcardsEnriched();
+      enrichedById = detail ? (detail.postcards_enriched || {}) : await loadPostcardsEnriched();
       postcardBlock = renderPostcardsCard(d, enrichedById);
     }
     
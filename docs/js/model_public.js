@@ -61,29 +61,14 @@ function esc(s){
 }
 
 async function loadSameAirlineIndexIds(currentModel){
-  const res = await fetch("./index.json", { cache:"no-store" });
-  if(!res.ok) throw new Error(`index.json HTTP ${res.status}`);
-  const j = await res.json();
-
-  let items = [];
-  if(Array.isArray(j)){
-    items = j;
-  }else if(Array.isArray(j?.items)){
-    items = j.items;
-  }else if(Array.isArray(j?.index)){
-    items = j.index;
-  }else if(Array.isArray(j?.models)){
-    items = j.models;
-  }else{
-    for(const k of Object.keys(j || {})){
-      if(Array.isArray(j[k])) { items = j[k]; break; }
-    }
-  }
-
   const currentAirlineCode = String(currentModel?.airline_code || "").trim().toUpperCase();
   const currentAirline = String(currentModel?.airline || "").trim().toUpperCase();
   const currentAirlineRow = String(currentModel?.airline_row || "").trim().toUpperCase();
 
+  // mit airline_code kommen nur Modelle mit gleichem oder ohne Code in Frage
+  // -> nur diese Shards laden (helper.js)
+  const items = await loadIndexShards(currentAirlineCode ? [currentAirlineCode, ""] : []);
+
   const ids = [];
 
   for(const it of items){
@@ -373,9 +358,8 @@ async function main(){
   const url = `./data/models/${encodeURIComponent(id)}.json`;
 
   try{
-    const res = await fetch(url, {cache:"no-store"});
-    if(!res.ok) throw new Error(`HTTP ${res.status}`);
-    const d = await res.json();
+    // aus dem Modell-Bundle, falls gebaut, sonst data/models/<id>.json (helper.js)
+    const d = await loadModelRecord(id);
 
     let prevId = "", nextId = "", pos = 0, total = 0;
     try{
@@ -1615,6 +1615,8 @@ async function main(){
       // sondern nutzen die Suche (matchesQuery enthält aircraft_id bereits)
       document.getElementById("q").value = p.get("aircraft_id") || "";
     }
+    // seitenübergreifende Treffer (Flüge, Postkarten, Typen, Bemalungen) unter dem Suchfeld
+    searchSuggest(document.getElementById("q"), { exclude: ["model"] });
 
     if(p.has("group")){
       setSelectValueFromUrl("group", p.get("group") || "");
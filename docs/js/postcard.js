@@ -176,11 +176,13 @@ async function main(){
     return;
   }
 
+  // vorverknüpft (tools/build_details.py); ohne Bundle beide Postkarten-Dateien
+  const detail = await loadDetailBundle("postcard", id);
+
   let prevId = "", nextId = "", pos = 0, total = 0;
 
   try{
-    const ids = await loadIndexIds();
-    const n = navNeighbors(ids, id);
+    const n = detail?.nav || navNeighbors(await loadIndexIds(), id);
     prevId = n.prev;
     nextId = n.next;
     pos = n.pos;
@@ -191,16 +193,22 @@ async function main(){
   }
 
   try{
-    const [idx, enr] = await Promise.all([
-      loadPostcardIndex(),
-      loadPostcardEnriched()
-    ]);
-
-    const base = (Array.isArray(idx?.items) ? idx.items : []).find(it =>
-      String(it?.id || "").trim().toUpperCase() === id
-    );
-
-    const e = enr && typeof enr === "object" ? (enr[id] || null) : null;
+    let base, e;
+    if(detail){
+      base = detail.base || null;
+      e = detail.enriched || null;
+    }else{
+      const [idx, enr] = await Promise.all([
+        loadPostcardIndex(),
+        loadPostcardEnriched()
+      ]);
+
+      base = (Array.isArray(idx?.items) ? idx.items : []).find(it =>
+        String(it?.id || "").trim().toUpperCase() === id
+      );
+
+      e = enr && typeof enr === "object" ? (enr[id] || null) : null;
+    }
 
     if(!base && !e){
       throw new Error(`Postkarte ${id} nicht gefunden`);
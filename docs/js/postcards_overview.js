@@ -399,6 +399,8 @@ async function main(){
 
     const p = new URLSearchParams(location.search);
     if(p.has("q")) document.getElementById("q").value = p.get("q") || "";
+    // seitenübergreifende Treffer (Modelle, Flüge, Typen, Bemalungen) unter dem Suchfeld
+    searchSuggest(document.getElementById("q"), { exclude: ["postcard"] });
 
     apply();
   }catch(e){
@@ -640,6 +640,8 @@ async function main(){
 
   // events
   document.getElementById("q").addEventListener("input", apply);
+  // seitenübergreifende Treffer (Modelle, Flüge, Postkarten, Bemalungen) unter dem Suchfeld
+  searchSuggest(document.getElementById("q"), { exclude: ["type"] });
   document.getElementById("manu").addEventListener("change", apply);
   document.getElementById("wing").addEventListener("change", apply);
   document.getElementById("fMissing").addEventListener("change", apply);
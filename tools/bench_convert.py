@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark der Konverter aus utils_convert auf den echten CSV-Werten.
+
+Gibt pro Konverter die Kosten pro Aufruf aus (ohne Memo = __wrapped__,
+kalt = leerer Cache, warm = Cache gefüllt) und die Konvertierungskosten
+pro Modell- bzw. Flugzeile, wie sie build_json anfallen.
+
+    python tools/bench_convert.py [--repeat N] [--profile]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import utils_convert as conv
+import utils_profile
+from utils_dataset import get_dataset
+
+REPEAT = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 20
+
+
+def _ns_per_call(fn: Callable, values: List[str], repeat: int) -> float:
+    if not values:
+        return 0.0
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for v in values:
+            fn(v)
+        best = min(best, (time.perf_counter_ns() - t0) / len(values))
+    return best
+
+
+def bench_function(name: str, fn: Callable, values: List[str]) -> Tuple[str, int, float, float, float]:
+    raw = getattr(fn, "__wrapped__", fn)
+    uncached = _ns_per_call(raw, values, REPEAT)
+
+    cold = float("nan")  # nicht memoisiert
+    if hasattr(fn, "cache_clear"):
+        # kalt: jede Wiederholung mit leerem Cache
+        best = float("inf")
+        for _ in range(REPEAT):
+            fn.cache_clear()
+            best = min(best, _ns_per_call(fn, values, 1))
+        cold = best
+    warm = _ns_per_call(fn, values, REPEAT)
+    return name, len(values), uncached, cold, warm
+
+
+def model_row_conversions(r) -> None:
+    conv.to_float(r.get("Preis"))
+    conv.to_float(r.get("Versandkosten"))
+    conv.to_float(r.get("Preis_Postkarte"))
+    conv.to_bool_x(r.get("Eigenfluege"))
+    conv.to_bool_x(r.get("Wunsch"))
+    conv.excel_serial_to_iso(r.get("angekommen"))
+    conv.excel_serial_to_iso(r.get("bestellt_am"))
+    conv.parse_scale_from_text(r.get("special_note"))
+
+
+def flight_row_conversions(r) -> None:
+    conv.excel_time_to_hhmm(r.get("time"))
+
+
+def bench_rows(name: str, fn: Callable, rows) -> Tuple[str, int, float]:
+    rows = list(rows)
+    if not rows:
+        return name, 0, 0.0
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter_ns()
+        for r in rows:
+            fn(r)
+        best = min(best, (time.perf_counter_ns() - t0) / len(rows))
+    return name, len(rows), best
+
+
+def main() -> int:
+    ds = get_dataset()
+    models = ds.models
+    flights = ds.flights
+
+    cases = [
+        ("to_float(Preis)", conv.to_float, [r.get("Preis") for r in models]),
+        ("to_bool_x(Eigenfluege)", conv.to_bool_x, [r.get("Eigenfluege") for r in models]),
+        ("excel_serial_to_iso(angekommen)", conv.excel_serial_to_iso, [r.get("angekommen") for r in models]),
+        ("excel_serial_to_iso(bestellt_am)", conv.excel_serial_to_iso, [r.get("bestellt_am") for r in models]),
+        ("parse_scale_from_text(special_note)", conv.parse_scale_from_text, [r.get("special_note") for r in models]),
+        ("excel_time_to_hhmm(time)", conv.excel_time_to_hhmm, [r.get("time") for r in flights]),
+        ("norm_space(Notes)", conv.norm_space, [r.get("Notes") for r in ds.liveries]),
+    ]
+
+    print(f"[bench_convert] repeat={REPEAT} (best of), ns per call")
+    print(f"{'converter':40} {'n':>6} {'no memo':>10} {'cold':>10} {'warm':>10}")
+    for name, fn, values in cases:
+        name, n, uncached, cold, warm = bench_function(name, fn, values)
+        print(f"{name:40} {n:>6} {uncached:>10.0f} {cold:>10.0f} {warm:>10.0f}")
+
+    print()
+    print(f"{'per row (warm)':40} {'rows':>6} {'ns/row':>10}")
+    for name, n, ns in (
+        bench_rows("models_export.csv", model_row_conversions, models),
+        bench_rows("flights_export.csv", flight_row_conversions, flights),
+    ):
+        print(f"{name:40} {n:>6} {ns:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_profile.run("bench_convert", main))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Durchsatz des JSON-Codecs (utils_json) pro Datei unter docs/: Lesen
+(loads) und Schreiben (dumps im aktuellen JSON_STYLE) mit der
+Standardbibliothek und mit orjson, dazu die Prüfung, dass beide dieselben
+Bytes liefern.
+
+    python tools/bench_json.py [--repeat N] [--compact] [--top 20]
+
+Die Modell-JSONs (docs/data/models/*.json) erscheinen als eine Zeile
+(Summe über alle Dateien, so wie build_json und die Enricher sie lesen und
+schreiben). Gemessen wird auf den Bytes im Speicher, ohne Platte.
+Ergebnis zusätzlich als .cache/bench/json.json.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import utils_json
+import utils_profile
+from utils_dataset import REPO_ROOT
+from utils_output import COMPACT, atomic_write_bytes, dump_json
+from utils_time import now_local_iso
+
+REPEAT = max(1, int(sys.argv[sys.argv.index("--repeat") + 1])) if "--repeat" in sys.argv else 5
+TOP = int(sys.argv[sys.argv.index("--top") + 1]) if "--top" in sys.argv else 20
+DOCS_DIR = os.path.join(REPO_ROOT, "docs")
+OUT_JSON = os.path.join(REPO_ROOT, ".cache", "bench", "json.json")
+
+BACKENDS = ["stdlib"] + (["orjson"] if utils_json.orjson is not None else [])
+
+
+def collect() -> List[Tuple[str, List[bytes]]]:
+    """[(Name, [Inhalt, ...])], größte Dateien zuerst, Modell-JSONs zusammengefasst."""
+    models_dir = os.path.join(DOCS_DIR, "data", "models")
+    groups: List[Tuple[str, List[bytes]]] = []
+    models: List[bytes] = []
+    for path in sorted(glob.glob(os.path.join(DOCS_DIR, "**", "*.json"), recursive=True)):
+        with open(path, "rb") as f:
+            data = f.read()
+        if os.path.dirname(path) == models_dir:
+            models.append(data)
+        else:
+            groups.append((os.path.relpath(path, DOCS_DIR).replace(os.sep, "/"), [data]))
+    groups.sort(key=lambda g: -len(g[1][0]))
+    groups = groups[:TOP]
+    if models:
+        groups.insert(0, (f"data/models/*.json ({len(models)})", models))
+    return groups
+
+
+def _best_s(fn: Callable[[Any], Any], items: List[Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        for it in items:
+            fn(it)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_group(blobs: List[bytes]) -> Dict[str, Any]:
+    size = sum(len(b) for b in blobs)
+    objs = [utils_json.loads(b) for b in blobs]
+    out: Dict[str, Any] = {"files": len(blobs), "bytes": size}
+    encoded: Dict[str, List[bytes]] = {}
+    prev = utils_json.BACKEND
+    try:
+        for backend in BACKENDS:
+            utils_json.BACKEND = backend
+            dump = lambda o: utils_json.dumps(o, compact=COMPACT)  # noqa: E731
+            out[f"read_mb_s_{backend}"] = round(size / 1e6 / _best_s(utils_json.loads, blobs), 1)
+            out[f"write_mb_s_{backend}"] = round(size / 1e6 / _best_s(dump, objs), 1)
+            encoded[backend] = [dump(o) for o in objs]
+            if [utils_json.loads(b) for b in encoded[backend]] != objs:
+                out["roundtrip_error"] = backend
+    finally:
+        utils_json.BACKEND = prev
+    out["identical"] = all(e == encoded["stdlib"] for e in encoded.values())
+    return out
+
+
+def main() -> int:
+    groups = collect()
+    if not groups:
+        print(f"[bench_json] no JSON files under {DOCS_DIR} (run tools/build_all.py first)")
+        return 1
+
+    print(f"[bench_json] backends={','.join(BACKENDS)} style={'compact' if COMPACT else 'pretty'} repeat={REPEAT} (best of)")
+    cols = "".join(f" {'rd ' + b[:6]:>10} {'wr ' + b[:6]:>10}" for b in BACKENDS)
+    print(f"{'file':44} {'KB':>8}{cols}  same  (MB/s)")
+    results: Dict[str, Any] = {}
+    mismatch = []
+    for name, blobs in groups:
+        r = bench_group(blobs)
+        results[name] = r
+        vals = "".join(f" {r[f'read_mb_s_{b}']:>10.1f} {r[f'write_mb_s_{b}']:>10.1f}" for b in BACKENDS)
+        print(f"{name:44} {r['bytes'] / 1024:>8.0f}{vals}  {'yes' if r['identical'] else 'NO'}")
+        if not r["identical"] or "roundtrip_error" in r:
+            mismatch.append(name)
+
+    if len(BACKENDS) > 1:
+        total = sum(r["bytes"] for r in results.values()) / 1e6
+        for kind in ("read", "write"):
+            t = {b: sum(r["bytes"] / 1e6 / r[f"{kind}_mb_s_{b}"] for r in results.values()) for b in BACKENDS}
+            print(f"{kind:>5} total {total:.1f} MB: " + ", ".join(f"{b} {t[b] * 1000:.0f} ms" for b in BACKENDS)
+                  + f" (x{t['stdlib'] / t['orjson']:.1f})")
+
+    atomic_write_bytes(OUT_JSON, dump_json({
+        "generated_at": now_local_iso(),
+        "backends": BACKENDS,
+        "compact": COMPACT,
+        "repeat": REPEAT,
+        "files": results,
+    }, newline=True, compact=False))
+    if mismatch:
+        print("[bench_json] OUTPUT MISMATCH: " + ", ".join(mismatch))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_profile.run("bench_json", main))
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-Benchmarks der heißen Einzelfunktionen auf einem festen Fixture-Korpus
+(tools/bench_fixtures/), unabhängig von Netzwerk und Build.
+
+    python tools/bench_micro.py [--only to_float,label_html] [--repeat N]
+    python tools/bench_micro.py --save-baseline   # Referenz festhalten
+    python tools/bench_micro.py --baseline .cache/bench/micro_baseline.json
+    python tools/bench_micro.py --refresh-fixtures
+    python tools/bench_micro.py --help
+
+Korpus:
+- csv_cells.json: echte Zellen aus models_export.csv (Datumsangaben,
+  Preise, special_note, postcards_raw, Label-Felder) plus Randfälle;
+  pro Liste jeder Wert einmal als [Wert, Anzahl] (kompakt geschrieben),
+  load_fixtures() vervielfacht sie wieder. --refresh-fixtures liest sie
+  neu aus den aktuellen CSVs
+- jjpostcards/*.html: SYNTHETISCH - nachgebaute Produktseiten mit dem
+  Aufbau der echten (Kopf mit Platzhalter-Stylesheets theme-000N.css,
+  Artikeldetails-Tabelle), keine gespeicherten Originale; Parser-Zeiten
+  auf echten Seiten können abweichen
+- planespotters/*.json: SYNTHETISCH - Antworten im Format von
+  /pub/photos/reg/<REG>, Foto-IDs und Links erfunden
+
+Pro Funktion:
+- ns/call: beste von --repeat Runden über den ganzen Korpus; jede Runde
+  läuft so oft, dass sie mindestens ~50 ms dauert
+- peak B: höchster Speicherzuwachs während eines Aufrufs (tracemalloc,
+  Mittel über den Korpus), also auch kurzlebige Zwischenobjekte
+- blocks: pro Aufruf netto neu belegte Speicherblöcke (sys.getallocatedblocks,
+  ohne GC), d.h. das Ergebnis und alles, was es festhält
+
+Memoisierte Konverter werden ohne Cache gemessen (__wrapped__), damit
+Änderungen an der Funktion selbst sichtbar werden; Cache-Effekte zeigt
+bench_convert.py. Die Enricher brauchen requests/bs4, build_labels qrcode;
+fehlen sie, wird der Fall übersprungen. Ergebnis als JSON unter
+.cache/bench/micro.json, mit Baseline zusätzlich die Änderung in Prozent.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import glob
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import utils_convert as conv
+import utils_profile
+from utils_dataset import REPO_ROOT, get_dataset
+from utils_output import atomic_write_bytes, dump_json
+from utils_time import now_local_iso
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+CSV_CELLS_JSON = os.path.join(FIXTURES_DIR, "csv_cells.json")
+BENCH_DIR = os.path.join(REPO_ROOT, ".cache", "bench")
+OUT_JSON = os.path.join(BENCH_DIR, "micro.json")
+BASELINE_JSON = os.path.join(BENCH_DIR, "micro_baseline.json")
+MIN_ROUND_S = 0.05
+
+# Randfälle, die in den echten Daten (noch) selten sind
+EXTRA_CELLS = {
+    "dates": ["45799", "45799.0", "22.05.2025", "1.6.2024", "2025-06-20", "31.02.2024", "", "unbekannt"],
+    "prices": ["119,53", "54,5", "€ 12,90", "12.90", "1 299,00", "", "-", "gratis"],
+    "special_note": ["'1:350", "1 : 200", "Sondermodell 1:500 limitiert", "Jubiläum", ""],
+    "postcards_raw": [
+        ["ORD-LH-7", "I:andere Kennung|U:https://jjpostcards.com/de/ansichtskarten/15351-lufthansa-a300.html|P:1,35", ""],
+        ["US004", "I:andere Kennung | U:https://jjpostcards.com/de/ansichtskarten/26234-luftwaffe-usa-c-47-dakota.html"
+                  " || U:https://jjpostcards.com/de/ansichtskarten/12271-usa-air-force-one-vc-25a.html|p:0,85", "0,85"],
+        ["AB001", "U:https://jjpostcards.com/de/ansichtskarten/14917-austrian-a320.html", "1,35"],
+    ],
+}
+
+
+# =========================
+# Fixtures
+# =========================
+def _counted(values: List[Any]) -> List[List[Any]]:
+    """[[Wert, Anzahl], ...] in Reihenfolge des ersten Auftretens."""
+    pairs: Dict[str, List[Any]] = {}
+    for v in values:
+        key = json.dumps(v, sort_keys=True)
+        if key in pairs:
+            pairs[key][1] += 1
+        else:
+            pairs[key] = [v, 1]
+    return list(pairs.values())
+
+
+def _expand(pairs: List[List[Any]]) -> List[Any]:
+    return [v for v, n in pairs for _ in range(n)]
+
+
+def refresh_csv_cells() -> str:
+    ds = get_dataset()
+    models = ds.models
+    logos = ds.logos_by_id
+
+    labels = []
+    for r in models:
+        if r.model_id.upper().startswith("ORD-"):
+            continue
+        logo = logos.get(r.logo_id) if r.logo_id else None
+        labels.append({
+            "model_id": r.model_id,
+            "airline": r.get("airline_row") or r.get("airline"),
+            "type": r.get("aircraft_type"),
+            "reg": r.get("registration"),
+            "logo": logo.get("Logo_Link") if logo else None,
+            "flown": conv.to_bool_x(r.get("Eigenfluege")) is True,
+            "qr": f"qr/{r.model_id}.png",
+        })
+
+    cells = {
+        "dates": [r.get("angekommen") for r in models] + [r.get("bestellt_am") for r in models] + EXTRA_CELLS["dates"],
+        "prices": [r.get("Preis") for r in models] + [r.get("Versandkosten") for r in models] + EXTRA_CELLS["prices"],
+        "special_note": [r.get("special_note") for r in models] + EXTRA_CELLS["special_note"],
+        "postcards_raw": [
+            [r.model_id, r.get("postcards_raw"), r.get("Preis_Postkarte")] for r in models if r.get("postcards_raw")
+        ] + EXTRA_CELLS["postcards_raw"],
+        "photo_wants": sorted({
+            (r.get("registration"), r.get("airline_row"), r.get("aircraft_type")) for r in models if r.get("registration")
+        }),
+        "labels": labels,
+    }
+    counted = {k: _counted(v) for k, v in cells.items()}
+    atomic_write_bytes(CSV_CELLS_JSON, dump_json({"source": "models_export.csv", **counted}, newline=True, compact=True))
+    return CSV_CELLS_JSON
+
+
+def load_fixtures() -> Dict[str, Any]:
+    with open(CSV_CELLS_JSON, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    cells = {k: _expand(v) for k, v in stored.items() if k != "source"}
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "jjpostcards", "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+
+    responses: Dict[str, List[dict]] = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "planespotters", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            responses[os.path.splitext(os.path.basename(path))[0]] = json.load(f).get("photos") or []
+
+    cells["pages"] = pages
+    cells["responses"] = responses
+    return cells
+
+
+# =========================
+# Fälle
+# =========================
+Case = Tuple[str, Optional[Callable[..., Any]], List[Tuple[Any, ...]], str]
+
+
+def _optional(module: str) -> Tuple[Any, str]:
+    """(Modul, "") oder (None, "skipped (<dep> missing)")."""
+    try:
+        return importlib.import_module(module), ""
+    except ImportError as e:
+        return None, f"skipped ({e.name} missing)"
+
+
+def _raw(fn: Callable[..., Any]) -> Callable[..., Any]:
+    return getattr(fn, "__wrapped__", fn)
+
+
+def build_cases(fx: Dict[str, Any]) -> List[Case]:
+    import build_json
+
+    cases: List[Case] = [
+        ("excel_serial_to_iso", _raw(conv.excel_serial_to_iso), [(v,) for v in fx["dates"]], ""),
+        ("parse_scale_from_text", _raw(conv.parse_scale_from_text), [(v,) for v in fx["special_note"]], ""),
+        ("to_float", _raw(conv.to_float), [(v,) for v in fx["prices"]], ""),
+        (
+            "build_json.parse_postcards_raw",
+            build_json.parse_postcards_raw,
+            [(mid, raw, conv.to_float(price)) for mid, raw, price in fx["postcards_raw"]],
+            "",
+        ),
+    ]
+
+    photos, skip = _optional("build_aircraft_photos_enrich")
+    wants = {reg: (airline, typ) for reg, airline, typ in fx["photo_wants"]}
+    all_photos = [p for ps in fx["responses"].values() for p in ps]
+    score_args: List[Tuple[Any, ...]] = []
+    for reg, ps in fx["responses"].items():
+        # eigene Registrierung (so läuft es im Enricher) und die der anderen Antworten
+        for want in [wants.get(reg, ("", ""))] + [wants[r] for r in fx["responses"] if r != reg and r in wants]:
+            score_args.extend((p, want[0], want[1]) for p in ps)
+    norm_args = [(s,) for _reg, airline, typ in fx["photo_wants"] for s in (airline, typ)]
+    norm_args += [(p.get("link") or "",) for p in all_photos]
+    cases += [
+        ("photos_enrich._score_photo", photos and photos._score_photo, score_args, skip),
+        ("photos_enrich._norm_match", photos and photos._norm_match, norm_args, skip),
+    ]
+
+    postcards, skip = _optional("build_postcards_enrich")
+    cases.append((
+        "postcards_enrich.extract_artikeldetails_pairs",
+        postcards and postcards.extract_artikeldetails_pairs,
+        [(html,) for html in fx["pages"]],
+        skip,
+    ))
+
+    labels, skip = _optional("build_labels")
+    cases.append((
+        "build_labels.label_html",
+        labels and labels.label_html,
+        [(it, cut, True) for it in fx["labels"] for cut in (False, True)],
+        skip,
+    ))
+    return cases
+
+
+# =========================
+# Messen
+# =========================
+def _round(fn: Callable[..., Any], args: Sequence[Tuple[Any, ...]], loops: int) -> float:
+    t0 = time.perf_counter_ns()
+    for _ in range(loops):
+        for a in args:
+            fn(*a)
+    return time.perf_counter_ns() - t0
+
+
+def time_per_call(fn: Callable[..., Any], args: Sequence[Tuple[Any, ...]], repeat: int) -> float:
+    loops = 1
+    while True:
+        ns = _round(fn, args, loops)
+        if ns >= MIN_ROUND_S * 1e9 or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = ns
+    for _ in range(repeat - 1):
+        best = min(best, _round(fn, args, loops))
+    return best / (loops * len(args))
+
+
+def alloc_per_call(fn: Callable[..., Any], args: Sequence[Tuple[Any, ...]]) -> Tuple[float, float]:
+    """(mittlerer Peak-Zuwachs in Bytes, mittlere netto neue Blöcke)."""
+    gc_was = gc.isenabled()
+    gc.disable()
+    try:
+        blocks = 0
+        for a in args:
+            b0 = sys.getallocatedblocks()
+            res = fn(*a)
+            blocks += sys.getallocatedblocks() - b0
+            del res
+
+        peak_sum = 0
+        tracemalloc.start()
+        try:
+            for a in args:
+                tracemalloc.reset_peak()
+                cur0, _ = tracemalloc.get_traced_memory()
+                res = fn(*a)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_sum += peak - cur0
+                del res
+        finally:
+            tracemalloc.stop()
+    finally:
+        if gc_was:
+            gc.enable()
+    return peak_sum / len(args), blocks / len(args)
+
+
+def _pct(new: float, old: Optional[float]) -> str:
+    return f"{100.0 * (new - old) / old:+6.1f}%" if old else "      "
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Micro-Benchmarks auf tools/bench_fixtures/")
+    ap.add_argument("--only", default="", help="nur Funktionen, deren Name einen der Teile enthält (kommagetrennt)")
+    ap.add_argument("--repeat", type=int, default=5, help="Runden pro Funktion, gemeldet wird die beste (Standard: 5)")
+    ap.add_argument("--baseline", default=BASELINE_JSON, help="Baseline-JSON zum Vergleich bzw. Ziel von --save-baseline")
+    ap.add_argument("--save-baseline", action="store_true", help="Ergebnis als Baseline speichern")
+    ap.add_argument("--refresh-fixtures", action="store_true", help="csv_cells.json aus den aktuellen CSVs neu schreiben")
+    # ausgewertet von utils_profile
+    ap.add_argument("--profile", action="store_true", help="cProfile-Report (utils_profile)")
+    ap.add_argument("--tracemalloc", action="store_true", help="tracemalloc-Top-Liste (utils_profile)")
+    return ap.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    repeat = max(1, args.repeat)
+    only = [x.strip() for x in args.only.split(",") if x.strip()]
+    baseline_json = os.path.abspath(args.baseline)
+
+    if args.refresh_fixtures:
+        print(f"[bench_micro] wrote {os.path.relpath(refresh_csv_cells(), REPO_ROOT)}")
+        return 0
+
+    cases = build_cases(load_fixtures())
+    if only:
+        cases = [c for c in cases if any(o in c[0] for o in only)]
+
+    baseline: Dict[str, Any] = {}
+    if not args.save_baseline:
+        try:
+            with open(baseline_json, "r", encoding="utf-8") as f:
+                baseline = json.load(f).get("functions", {})
+        except (OSError, ValueError):
+            pass
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"[bench_micro] repeat={repeat} (best of), fixtures={os.path.relpath(FIXTURES_DIR, REPO_ROOT)}")
+    print(f"{'function':46} {'calls':>6} {'ns/call':>10} {'Δ':>7} {'peak B':>8} {'blocks':>7}")
+    for name, fn, fn_args, skip in cases:
+        if fn is None or not fn_args:
+            results[name] = {"status": skip or "skipped (no fixtures)"}
+            print(f"{name:46} {results[name]['status']}")
+            continue
+        ns = time_per_call(fn, fn_args, repeat)
+        peak, blocks = alloc_per_call(fn, fn_args)
+        results[name] = {
+            "status": "ok",
+            "calls": len(fn_args),
+            "ns_per_call": round(ns, 1),
+            "peak_bytes_per_call": round(peak, 1),
+            "blocks_per_call": round(blocks, 2),
+        }
+        base = (baseline.get(name) or {}).get("ns_per_call")
+        print(f"{name:46} {len(fn_args):>6} {ns:>10.0f} {_pct(ns, base)} {peak:>8.0f} {blocks:>7.1f}")
+
+    report = {
+        "generated_at": now_local_iso(),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "functions": results,
+    }
+    path = baseline_json if args.save_baseline else OUT_JSON
+    atomic_write_bytes(path, dump_json(report, newline=True, compact=False))
+    print(f"[bench_micro] wrote {os.path.relpath(path, REPO_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_profile.run("bench_micro", main))
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regressions-Harness für die Build-Performance: feste Matrix aus Stufen x
+Datengrößen, Vergleich mit einer gespeicherten Baseline.
+
+    python tools/bench_regress.py --save-baseline      # Referenz festhalten
+    python tools/bench_regress.py                      # messen + vergleichen
+        [--scales real,10000] [--tools build_json,build_stats] [--repeat 3]
+        [--baseline .cache/bench/baseline.json]
+
+Jede Zelle läuft --repeat mal kalt (bench_scale.run_tool), gewertet wird
+das Minimum von Wall-Zeit und Peak-RSS. Fehlschlag (Exit 1), wenn
+- Wall- und CPU-Zeit beide um mehr als BENCH_TIME_TOLERANCE (Default
+  0.15 = +15 %) und mindestens BENCH_TIME_FLOOR Sekunden (Default 0.1)
+  steigen (nur Wall-Zeit schwankt mit der Last der Maschine),
+- der Peak-RSS um mehr als BENCH_RSS_TOLERANCE (Default 0.10) steigt,
+- sich die erzeugten Dateien unter docs/ inhaltlich ändern (sha1 je Datei,
+  "generated_at" zählt nicht; Manifeste und .gz/.br sind ausgenommen).
+  Damit ist jede Optimierung als ausgabegleich nachgewiesen.
+
+Jeder Lauf wird mit Commit (und Dirty-Flag) unter .cache/bench/runs/
+abgelegt und an .cache/bench/history.jsonl angehängt. Zeiten sind
+maschinenabhängig: Baseline und Vergleich auf demselben Rechner erzeugen.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import bench_scale
+from utils_dataset import REPO_ROOT
+from utils_output import atomic_write_bytes, dump_json
+from utils_time import now_local_iso
+
+
+def _opt(name: str, default: str) -> str:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+BENCH_DIR = os.path.join(REPO_ROOT, ".cache", "bench")
+BASELINE_JSON = os.path.abspath(_opt("--baseline", os.path.join(BENCH_DIR, "baseline.json")))
+
+SCALES = bench_scale.parse_scales(_opt("--scales", "real,10000"))
+STAGES = [x for x in _opt("--tools", ",".join(bench_scale.TOOLS)).split(",") if x.strip()]
+REPEAT = max(1, int(_opt("--repeat", "3")))
+SAVE_BASELINE = "--save-baseline" in sys.argv
+
+TIME_TOLERANCE = _float_env("BENCH_TIME_TOLERANCE", 0.15)
+TIME_FLOOR = _float_env("BENCH_TIME_FLOOR", 0.1)
+RSS_TOLERANCE = _float_env("BENCH_RSS_TOLERANCE", 0.10)
+
+# nicht Teil des Ausgabevergleichs: Buchhaltung mit Hashes/Zeitstempeln und
+# komprimierte Geschwister (enthalten generated_at unverändert mit)
+DIGEST_SKIP_FILES = {"models_manifest.json", "outputs_manifest.json", "compressed_manifest.json"}
+DIGEST_SKIP_EXT = (".gz", ".br")
+VOLATILE_RE = re.compile(rb'"generated_at":\s*"[^"]*"')
+
+
+# =========================
+# Messen
+# =========================
+def git_commit() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.check_output(["git", *args], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def output_digests(root: str) -> Dict[str, str]:
+    digests: Dict[str, str] = {}
+    docs = os.path.join(root, "docs")
+    for d, _dirs, files in os.walk(docs):
+        for fn in files:
+            if fn in DIGEST_SKIP_FILES or fn.endswith(DIGEST_SKIP_EXT) or fn.startswith(".tmp-"):
+                continue
+            path = os.path.join(d, fn)
+            with open(path, "rb") as f:
+                data = VOLATILE_RE.sub(b'"generated_at": ""', f.read())
+            digests[os.path.relpath(path, docs).replace(os.sep, "/")] = hashlib.sha1(data).hexdigest()
+    return dict(sorted(digests.items()))
+
+
+def _best(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [r for r in runs if r.get("status") == "ok" and "wall_s" in r]
+    if not ok:
+        return {"status": runs[-1].get("status", "failed")}
+    rss = [r["peak_rss_kb"] for r in ok if r.get("peak_rss_kb") is not None]
+    return {
+        "status": "ok",
+        "wall_s": min(r["wall_s"] for r in ok),
+        "cpu_s": min(r["cpu_s"] for r in ok),
+        "peak_rss_kb": min(rss) if rss else None,
+        "wall_s_runs": [r["wall_s"] for r in ok],
+    }
+
+
+def run_matrix() -> Dict[str, Any]:
+    scales: Dict[str, Any] = {}
+    for n in SCALES:
+        name = bench_scale.scale_name(n)
+        runs: Dict[str, List[Dict[str, Any]]] = {s: [] for s in STAGES}
+        root = ""
+        for i in range(REPEAT):
+            root = bench_scale.prepare_root(n, workdir=BENCH_DIR)  # leert docs/ und .cache/
+            for stage in bench_scale.TOOLS:
+                if stage in STAGES:
+                    print(f"[bench_regress] {name} #{i + 1}: {stage}", flush=True)
+                    runs[stage].append(bench_scale.run_tool(root, stage, tracemalloc=False))
+        scales[name] = {
+            "stages": {s: _best(r) for s, r in runs.items()},
+            "outputs": output_digests(root),
+        }
+    return scales
+
+
+# =========================
+# Vergleichen
+# =========================
+def _pct(new: float, old: float) -> str:
+    return f"{100.0 * (new - old) / old:+6.1f}%" if old else "    n/a"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Gibt die Tabelle aus und liefert die Liste der Verstöße."""
+    problems: List[str] = []
+    print(f"\n{'scale':8} {'stage':24} {'wall s':>8} {'base':>8} {'Δ':>7} {'rss':>7} {'base':>7} {'Δ':>7}  verdict")
+    for scale, cur in current.items():
+        base = baseline.get(scale)
+        if base is None:
+            print(f"{scale:8} (no baseline for this scale)")
+            continue
+        for stage, c in cur["stages"].items():
+            b = base["stages"].get(stage)
+            if c.get("status") != "ok":
+                if not c.get("status", "").startswith("skipped"):
+                    problems.append(f"{scale}/{stage}: {c.get('status')}")
+                print(f"{scale:8} {stage:24} {c.get('status')}")
+                continue
+            if not b or b.get("status") != "ok":
+                print(f"{scale:8} {stage:24} {c['wall_s']:>8.2f} {'-':>8} {'':>7} (no baseline)")
+                continue
+
+            verdict = []
+            if all(
+                c[k] - b[k] > TIME_FLOOR and c[k] - b[k] > TIME_TOLERANCE * b[k]
+                for k in ("wall_s", "cpu_s")
+            ):
+                verdict.append("TIME")
+            rss_c, rss_b = c.get("peak_rss_kb"), b.get("peak_rss_kb")
+            if rss_c and rss_b and rss_c - rss_b > RSS_TOLERANCE * rss_b:
+                verdict.append("RSS")
+            for v in verdict:
+                problems.append(f"{scale}/{stage}: {v} regression")
+            print(
+                f"{scale:8} {stage:24} {c['wall_s']:>8.2f} {b['wall_s']:>8.2f} {_pct(c['wall_s'], b['wall_s'])} "
+                f"{bench_scale._fmt_kb(rss_c):>7} {bench_scale._fmt_kb(rss_b):>7} "
+                f"{_pct(rss_c or 0, rss_b or 0)}  {' '.join(verdict) or 'ok'}"
+            )
+
+        changed, missing, added = _diff_outputs(cur["outputs"], base.get("outputs") or {})
+        if changed or missing or added:
+            problems.append(
+                f"{scale}: outputs differ (changed={len(changed)} missing={len(missing)} new={len(added)})"
+            )
+            for label, files in (("changed", changed), ("missing", missing), ("new", added)):
+                for fn in files[:10]:
+                    print(f"         output {label}: {fn}")
+                if len(files) > 10:
+                    print(f"         ... {len(files) - 10} more {label}")
+        else:
+            print(f"{scale:8} outputs identical ({len(cur['outputs'])} files)")
+    return problems
+
+
+def _diff_outputs(cur: Dict[str, str], base: Dict[str, str]) -> Tuple[List[str], List[str], List[str]]:
+    changed = [fn for fn in cur if fn in base and cur[fn] != base[fn]]
+    missing = [fn for fn in base if fn not in cur]
+    added = [fn for fn in cur if fn not in base]
+    return changed, missing, added
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> int:
+    unknown = [s for s in STAGES if s not in bench_scale.TOOLS]
+    if unknown:
+        print(f"[bench_regress] unknown stages: {unknown} (choose from {bench_scale.TOOLS})")
+        return 2
+
+    run = {
+        "generated_at": now_local_iso(),
+        **git_commit(),
+        "repeat": REPEAT,
+        "python": sys.version.split()[0],
+        "scales": run_matrix(),
+    }
+
+    commit = (run["commit"] or "nogit")[:12] + ("-dirty" if run["dirty"] else "")
+    run_path = os.path.join(BENCH_DIR, "runs", f"{run['generated_at'][:19].replace(':', '')}-{commit}.json")
+    atomic_write_bytes(run_path, dump_json(run, newline=True, compact=False))
+    # Verlauf ohne die Ausgabe-Hashes, eine Zeile pro Lauf
+    summary = {k: v for k, v in run.items() if k != "scales"}
+    summary["scales"] = {
+        scale: {
+            stage: {k: r.get(k) for k in ("status", "wall_s", "cpu_s", "peak_rss_kb")}
+            for stage, r in s["stages"].items()
+        }
+        for scale, s in run["scales"].items()
+    }
+    with open(os.path.join(BENCH_DIR, "history.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    print(f"[bench_regress] run stored: {os.path.relpath(run_path, REPO_ROOT)}")
+
+    failed = [
+        f"{scale}/{stage}: {r['status']}"
+        for scale, s in run["scales"].items() for stage, r in s["stages"].items()
+        if r["status"] != "ok" and not r["status"].startswith("skipped")
+    ]
+
+    if SAVE_BASELINE:
+        if failed:
+            print("[bench_regress] not saving baseline, failed cells: " + "; ".join(failed))
+            return 1
+        atomic_write_bytes(BASELINE_JSON, dump_json(run, newline=True, compact=False))
+        print(f"[bench_regress] baseline saved: {BASELINE_JSON} (commit {commit})")
+        return 0
+
+    baseline = load_baseline(BASELINE_JSON)
+    if baseline is None:
+        print(f"[bench_regress] no baseline at {BASELINE_JSON}; run with --save-baseline first")
+        return 1 if failed else 0
+
+    print(f"[bench_regress] baseline: commit {(baseline.get('commit') or '?')[:12]} from {baseline.get('generated_at')}")
+    problems = compare(run["scales"], baseline.get("scales") or {})
+    print(
+        f"\nthresholds: time +{TIME_TOLERANCE:.0%} (min {TIME_FLOOR}s), rss +{RSS_TOLERANCE:.0%}; "
+        f"repeat={REPEAT} (best of)"
+    )
+    if problems:
+        print("[bench_regress] FAILED:\n  " + "\n  ".join(problems))
+        return 1
+    print("[bench_regress] OK: no regressions, outputs identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
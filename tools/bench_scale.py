@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skalierungs-Benchmark: jedes Build-Skript auf synthetischen Datensätzen
+verschiedener Größe (gen_synthetic_data.py), Zeiten und Speicher aus den
+Stufen-Metriken (utils_metrics).
+
+    python tools/bench_scale.py [--scales real,1000,10000,100000] [--tools build_json,build_stats]
+        [--workdir .cache/bench_scale] [--tracemalloc] [--keep]
+
+Pro Größe entsteht unter --workdir ein eigener Repo-Root (models-<n>/) mit
+den generierten CSVs und einer Kopie von tools/; "real" nimmt eine Kopie
+der echten Eingaben (real/). Die Skripte laufen dort als eigene Prozesse
+(Peak-RSS pro Skript), kalt: NO_CACHE=1 und FORCE_REBUILD=1. Die CSVs
+bleiben für den nächsten Lauf liegen, die erzeugten docs/ nur mit --keep.
+
+--tracemalloc: zusätzlich Allokations-Report je Skript (utils_profile,
+unter models-<n>/.cache/profile/), kostet aber Laufzeit.
+
+Ergebnis: Tabelle pro Größe, Wachstumsexponent der Laufzeit zwischen den
+Größen (1.0 = linear) und alles als JSON in <workdir>/bench_scale.json.
+Die Enricher fehlen bewusst (Netzwerk), build_labels braucht qrcode
+(requirements-labels.txt) und wird sonst übersprungen.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import gen_synthetic_data
+from utils_dataset import (
+    AIRLINE_LOGOS_CSV,
+    AIRPORTS_CSV,
+    FLIGHTS_CSV,
+    GROUP_TYPES_CSV,
+    LIV_CSV,
+    MODELS_CSV,
+    PAX_CSV,
+    REPO_ROOT,
+)
+from utils_output import atomic_write_bytes, dump_json
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Reihenfolge = Abhängigkeiten (postcards_index/labels lesen die Modell-JSONs,
+# heatmap braucht flights.json und airports.json, details liest index.json,
+# stats und postcards_index, public_pages/search_index index.json)
+TOOLS = [
+    "build_json",
+    "build_airports",
+    "build_stats",
+    "build_postcards_index",
+    "build_heatmap",
+    "build_details",
+    "build_public_pages",
+    "build_search_index",
+    "build_labels",
+    "build_compressed",
+]
+OPTIONAL_DEPS = {"build_labels": "qrcode"}
+
+
+def _opt(name: str, default: str) -> str:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+INPUTS = (MODELS_CSV, PAX_CSV, LIV_CSV, AIRLINE_LOGOS_CSV, FLIGHTS_CSV, GROUP_TYPES_CSV, AIRPORTS_CSV)
+# handgepflegte Dateien unter docs/, die Skripte lesen (build_public_pages: CSS)
+STATIC_DIRS = (os.path.join(REPO_ROOT, "docs", "css"),)
+
+
+def parse_scales(v: str) -> List[Optional[int]]:
+    """ "real,10000" -> [None, 10000]; None = echte Eingaben."""
+    return [None if x.strip() == "real" else int(x) for x in v.split(",") if x.strip()]
+
+
+def scale_name(n: Optional[int]) -> str:
+    return "real" if n is None else str(n)
+
+
+SCALES = parse_scales(_opt("--scales", "1000,10000,100000"))
+SELECTED = [x for x in _opt("--tools", ",".join(TOOLS)).split(",") if x.strip()]
+WORKDIR = os.path.abspath(_opt("--workdir", os.path.join(REPO_ROOT, ".cache", "bench_scale")))
+TRACEMALLOC = "--tracemalloc" in sys.argv
+KEEP = "--keep" in sys.argv
+SEED = int(_opt("--seed", "1"))
+
+
+def prepare_root(n: Optional[int], workdir: str = WORKDIR, seed: int = SEED) -> str:
+    """
+    Repo-Root für n Modelle/Flüge (synthetische CSVs nur bei Bedarf neu
+    erzeugen) bzw. für n=None mit einer Kopie der echten Eingaben.
+    """
+    if n is None:
+        root = os.path.join(workdir, "real")
+        for src in INPUTS:
+            dst = os.path.join(root, os.path.relpath(src, REPO_ROOT))
+            if os.path.isfile(src):
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copyfile(src, dst)
+    else:
+        root = os.path.join(workdir, f"models-{n}")
+        meta_path = os.path.join(root, "synthetic.json")
+        meta = {"models": n, "seed": seed, "generator": gen_synthetic_data.GENERATOR_VERSION}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                fresh = json.load(f).get("params") == meta
+        except (OSError, ValueError):
+            fresh = False
+
+        if not fresh:
+            t0 = time.perf_counter()
+            counts = gen_synthetic_data.generate(root, models=n, seed=seed)
+            atomic_write_bytes(meta_path, dump_json({"params": meta, "rows": counts}, newline=True, compact=False))
+            print(f"[bench_scale] generated {n}: {counts} ({time.perf_counter() - t0:.1f}s)")
+
+    # Skripte leiten ihre Pfade aus __file__ ab -> Kopie von tools/ im Root
+    shutil.rmtree(os.path.join(root, "tools"), ignore_errors=True)
+    shutil.copytree(TOOLS_DIR, os.path.join(root, "tools"), ignore=shutil.ignore_patterns("__pycache__"))
+    for d in ("docs", ".cache"):
+        shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+    for src in STATIC_DIRS:
+        shutil.copytree(src, os.path.join(root, os.path.relpath(src, REPO_ROOT)))
+    return root
+
+
+def run_tool(root: str, tool: str, tracemalloc: bool = TRACEMALLOC) -> Dict[str, Any]:
+    dep = OPTIONAL_DEPS.get(tool)
+    if dep and importlib.util.find_spec(dep) is None:
+        return {"status": f"skipped ({dep} missing)"}
+
+    env = dict(os.environ)
+    env.update({
+        "NO_CACHE": "1",
+        "FORCE_REBUILD": "1",
+        "BUILD_METRICS": os.path.join(root, ".cache", "build_metrics.json"),
+        "PROFILE_DIR": os.path.join(root, ".cache", "profile"),
+    })
+    if tracemalloc:
+        env.update({"PROFILE": "1", "PROFILE_TRACEMALLOC": env.get("PROFILE_TRACEMALLOC") or "25"})
+
+    log_path = os.path.join(root, "logs", f"{tool}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    t0 = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        rc = subprocess.call(
+            [sys.executable, os.path.join(root, "tools", f"{tool}.py")],
+            cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    wall = time.perf_counter() - t0
+
+    try:
+        with open(env["BUILD_METRICS"], "r", encoding="utf-8") as f:
+            stage = json.load(f).get("stages", {}).get(tool, {})
+    except (OSError, ValueError):
+        stage = {}
+    result = dict(stage)
+    result["status"] = "ok" if rc == 0 else f"failed (rc={rc}, see {log_path})"
+    result["process_wall_s"] = round(wall, 4)  # inkl. Interpreter-Start und Imports
+    return result
+
+
+def _fmt_kb(kb: Any) -> str:
+    return f"{kb / 1024:.0f}M" if isinstance(kb, (int, float)) else "-"
+
+
+def print_scale(n: Optional[int], results: Dict[str, Dict[str, Any]]) -> None:
+    print("\n== real data" if n is None else f"\n== {n} models / {n} flights")
+    print(f"{'tool':24} {'wall s':>9} {'cpu s':>9} {'rss':>7} {'rows':>9} {'written':>10} {'files':>8}  status")
+    for tool, r in results.items():
+        if "wall_s" not in r:
+            print(f"{tool:24} {'-':>9} {'-':>9} {'-':>7} {'-':>9} {'-':>10} {'-':>8}  {r['status']}")
+            continue
+        print(
+            f"{tool:24} {r['wall_s']:>9.2f} {r['cpu_s']:>9.2f} {_fmt_kb(r.get('peak_rss_kb')):>7} "
+            f"{r.get('rows_read', 0):>9} {r.get('bytes_written', 0) / 1e6:>9.1f}M {r.get('files_written', 0):>8}  {r['status']}"
+        )
+
+
+def growth(report: Dict[Optional[int], Dict[str, Dict[str, Any]]]) -> Dict[str, List[float]]:
+    """Exponent k in wall ~ n^k zwischen aufeinanderfolgenden (synthetischen) Größen."""
+    out: Dict[str, List[float]] = {}
+    scales = sorted(n for n in report if n is not None)
+    for tool in SELECTED:
+        ks = []
+        for a, b in zip(scales, scales[1:]):
+            wa = report[a].get(tool, {}).get("wall_s")
+            wb = report[b].get(tool, {}).get("wall_s")
+            if wa and wb and wa > 0.01:
+                ks.append(round(math.log(wb / wa) / math.log(b / a), 2))
+        if ks:
+            out[tool] = ks
+    return out
+
+
+def main() -> int:
+    unknown = [t for t in SELECTED if t not in TOOLS]
+    if unknown:
+        print(f"[bench_scale] unknown tools: {unknown} (choose from {TOOLS})")
+        return 2
+
+    report: Dict[Optional[int], Dict[str, Dict[str, Any]]] = {}
+    for n in SCALES:
+        root = prepare_root(n)
+        results: Dict[str, Dict[str, Any]] = {}
+        for tool in TOOLS:
+            if tool in SELECTED:
+                print(f"[bench_scale] {scale_name(n)}: {tool} ...", flush=True)
+                results[tool] = run_tool(root, tool)
+        report[n] = results
+        print_scale(n, results)
+        if not KEEP:
+            shutil.rmtree(os.path.join(root, "docs"), ignore_errors=True)
+
+    exponents = growth(report)
+    if exponents:
+        print("\nwall-time growth exponent between scales (1.0 = linear)")
+        for tool, ks in exponents.items():
+            print(f"{tool:24} " + " ".join(f"{k:>6.2f}" for k in ks))
+
+    out_path = os.path.join(WORKDIR, "bench_scale.json")
+    atomic_write_bytes(out_path, dump_json({
+        "scales": {scale_name(n): r for n, r in report.items()},
+        "growth_exponent": exponents,
+        "seed": SEED,
+        "tracemalloc": TRACEMALLOC,
+    }, newline=True, compact=False))
+    print(f"\n[bench_scale] wrote {out_path}")
+    failed = [t for r in report.values() for t, v in r.items() if v["status"].startswith("failed")]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suchindex (utils_search) gegen den linearen Scan, wie ihn die
+Übersichtsseiten pro Tastendruck machen: Zeit pro Abfrage, geladene
+Shards/Bytes und Abweichung der Treffer.
+
+    python tools/bench_search.py [--repeat N] [--query "lufthansa a320"]
+
+Dokumente wie build_search_index (aus docs/index.json, flights.json,
+postcards_*.json und den CSVs), der Index wird im Speicher gebaut. Abfragen:
+feste Beispiele plus Präfixe (2/4/8 Zeichen) von Labels quer durch alle
+Arten, jeweils "getippt" (jeder Präfix der Eingabe einzeln, wie beim
+Tippen im Suchfeld). "extra" zählt Treffer des Index, die der Scan nicht
+hat (Trigramme aus verschiedenen Wörtern); fehlende Treffer wären ein Fehler.
+Ergebnis zusätzlich als .cache/bench/search.json.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import utils_profile
+import utils_search
+from build_search_index import collect_docs
+from utils_dataset import REPO_ROOT, get_dataset
+from utils_output import atomic_write_bytes, dump_json
+from utils_time import now_local_iso
+
+REPEAT = max(1, int(sys.argv[sys.argv.index("--repeat") + 1])) if "--repeat" in sys.argv else 5
+QUERY = sys.argv[sys.argv.index("--query") + 1] if "--query" in sys.argv else ""
+OUT_JSON = os.path.join(REPO_ROOT, ".cache", "bench", "search.json")
+
+FIXED_QUERIES = [
+    "lufthansa a320", "d-ab", "oe-l", "jjpostcards", "retro", "cheatline",
+    "weiß rot", "737 800", "dy1632", "boeing 787", "vie", "a3",
+]
+
+
+def queries(docs: List[List[Any]]) -> List[str]:
+    if QUERY:
+        return [QUERY]
+    out = list(FIXED_QUERIES)
+    for d in docs[:: max(1, len(docs) // 40)]:
+        label = str(d[2])
+        out.extend(label[:n] for n in (2, 4, 8) if len(label) >= n)
+    return list(dict.fromkeys(q for q in out if utils_search.words(q)))
+
+
+def typed(q: str) -> List[str]:
+    return [q[:n] for n in range(1, len(q) + 1) if utils_search.words(q[:n])]
+
+
+def _best_s(fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    rows = collect_docs(get_dataset())
+    if not rows:
+        print("[bench_search] no documents (run tools/build_all.py first)")
+        return 1
+    texts = [r[4] for r in rows]
+    docs = [list(r[:4]) for r in rows]
+
+    t_build = _best_s(lambda: utils_search.build_postings(texts))
+    shards = utils_search.build_postings(texts)
+    shard_bytes = {k: len(dump_json(v, compact=True)) for k, v in shards.items()}
+    idx = utils_search.SearchIndex.from_memory(docs, shards)
+    print(f"[bench_search] docs={len(docs)} terms={sum(len(v) for v in shards.values())} "
+          f"shards={len(shards)} bytes={sum(shard_bytes.values())} build={t_build * 1000:.1f} ms repeat={REPEAT} (best of)")
+
+    qs = queries(docs)
+    results: Dict[str, Any] = {}
+    missing: List[str] = []
+    print(f"{'query':28} {'hits':>5} {'extra':>5} {'shards':>6} {'KB':>6} {'index µs':>9} {'scan µs':>9} {'x':>6}")
+    for q in qs:
+        keys = sorted({utils_search.shard_of(t) for w in utils_search.words(q) for t in utils_search.query_terms(w)})
+        hits = idx.match(q)
+        ref = utils_search.linear_match(texts, q)
+        extra = len(set(hits) - set(ref))
+        if set(ref) - set(hits):
+            missing.append(q)
+        steps = typed(q)
+        t_idx = _best_s(lambda: [idx.match(s) for s in steps]) / len(steps)
+        t_scan = _best_s(lambda: [utils_search.linear_match(texts, s) for s in steps]) / len(steps)
+        results[q] = {
+            "hits": len(hits), "extra": extra, "shards": keys,
+            "shard_bytes": sum(shard_bytes[k] for k in keys if k in shard_bytes),
+            "index_us": round(t_idx * 1e6, 1), "scan_us": round(t_scan * 1e6, 1),
+        }
+        r = results[q]
+        print(f"{q[:28]:28} {r['hits']:>5} {extra:>5} {len(keys):>6} {r['shard_bytes'] / 1024:>6.1f} "
+              f"{r['index_us']:>9.1f} {r['scan_us']:>9.1f} {t_scan / t_idx:>6.0f}")
+
+    n = len(results)
+    total_idx = sum(r["index_us"] for r in results.values())
+    total_scan = sum(r["scan_us"] for r in results.values())
+    extra_q = sum(1 for r in results.values() if r["extra"])
+    print(f"[bench_search] queries={n} mean index={total_idx / n:.1f} µs scan={total_scan / n:.1f} µs "
+          f"(x{total_scan / total_idx:.0f}) queries with extra hits={extra_q}")
+
+    atomic_write_bytes(OUT_JSON, dump_json({
+        "generated_at": now_local_iso(),
+        "docs": len(docs),
+        "shards": shard_bytes,
+        "build_ms": round(t_build * 1000, 2),
+        "repeat": REPEAT,
+        "queries": results,
+    }, newline=True, compact=False))
+    if missing:
+        print("[bench_search] MISSING HITS: " + ", ".join(missing))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_profile.run("bench_search", main))
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import os
 import time
+import utils_bundle
+import utils_json
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import write_json
 from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin
 
@@ -35,14 +38,12 @@ UA = "aircraft-labels photo enrichment (personal collection; polite; contact via
 
 
 def load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    d = utils_json.read_json(path)
+    return d
 
 
 def save_json(path: str, obj: Any) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    write_json(path, obj)
 
 
 def norm(s: Any) -> str:
@@ -72,6 +73,8 @@ def host_allowed(url: str) -> bool:
 def scrape_thumb(url: str) -> Dict[str, Any]:
     res = requests.get(url, timeout=TIMEOUT, headers={"User-Agent": UA})
     res.raise_for_status()
+    utils_metrics.count("http_requests")
+    utils_metrics.count("http_bytes_read", len(res.content))
     soup = BeautifulSoup(res.text, "html.parser")
     thumb = extract_og_image(soup, url)
     return {
@@ -85,17 +88,7 @@ def collect_models() -> List[Dict[str, str]]:
     Returns list of dict: {model_id, photo_url}
     """
     out: List[Dict[str, str]] = []
-    if not os.path.isdir(MODELS_DIR):
-        return out
-
-    for fn in sorted(os.listdir(MODELS_DIR)):
-        if not fn.lower().endswith(".json"):
-            continue
-        path = os.path.join(MODELS_DIR, fn)
-        try:
-            d = load_json(path)
-        except Exception:
-            continue
+    for _fn, d in utils_bundle.iter_model_jsons(MODELS_DIR):
         if not isinstance(d, dict):
             continue
 
@@ -303,6 +296,8 @@ def fetch_planespotters_api_by_reg(reg: str, want_airline: str = "", want_type:
     api_url = f"https://api.planespotters.net/pub/photos/reg/{reg}"
     res = requests.get(api_url, timeout=TIMEOUT, headers={"User-Agent": UA})
     res.raise_for_status()
+    utils_metrics.count("http_requests")
+    utils_metrics.count("http_bytes_read", len(res.content))
     j = res.json()
 
     if not isinstance(j, dict):
@@ -342,6 +337,7 @@ def is_direct_image(url: str) -> bool:
 
 
 def main() -> int:
+    utils_metrics.phase("load")
     existing: Dict[str, Any] = {}
     if os.path.exists(OUT_PATH) and not FORCE_REBUILD:
         try:
@@ -378,6 +374,7 @@ def main() -> int:
 
     print(f"[photos_enrich] to fetch: {len(to_fetch)}")
 
+    utils_metrics.phase("fetch")
     for i, m in enumerate(to_fetch, start=1):
         model_id = m["model_id"]
         url = m["photo_url"]
@@ -458,10 +455,11 @@ def main() -> int:
     
         time.sleep(SLEEP_SECONDS)
     
+    utils_metrics.phase("write")
     save_json(OUT_PATH, existing)
     print(f"[photos_enrich] wrote: {OUT_PATH} entries={len(existing)}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(utils_metrics.run_stage("build_aircraft_photos_enrich", main))
@@ -1,15 +1,20 @@
 # tools/build_airports.py
 from __future__ import annotations
 
-import csv
-import json
 from pathlib import Path
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import write_json
+from utils_cache import file_digest, load_or_build
+from utils_dataset import AIRPORTS_CSV, Dataset, get_dataset
+from utils_csv import PARSER_VERSION, Table
 
 ROOT = Path(__file__).resolve().parents[1]
-AIRPORTS_CSV = ROOT / "data" / "airports.csv"
 OUT_JSON = ROOT / "docs" / "data" / "airports.json"
 
+# Bei Änderungen an Filter/Normalisierung erhöhen (Teil des Cache-Schlüssels)
+AIRPORTS_VERSION = 1
+
 
 def _to_float(v: str | None) -> float | None:
     if v is None:
@@ -23,45 +28,62 @@ def _to_float(v: str | None) -> float | None:
         return None
 
 
-def main() -> None:
-    if not AIRPORTS_CSV.exists():
-        raise FileNotFoundError(f"Missing input: {AIRPORTS_CSV}")
-
+def parse_airports(table: Table) -> dict[str, dict]:
     airports: dict[str, dict] = {}
 
-    with AIRPORTS_CSV.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        # OurAirports typical columns: ident, type, name, latitude_deg, longitude_deg,
-        # elevation_ft, continent, iso_country, iso_region, municipality, scheduled_service,
-        # gps_code, iata_code, local_code, home_link, wikipedia_link, keywords
-        for row in reader:
-            iata = (row.get("iata_code") or "").strip().upper()
-            if not iata or len(iata) != 3:
-                continue
-
-            lat = _to_float(row.get("latitude_deg"))
-            lon = _to_float(row.get("longitude_deg"))
-            if lat is None or lon is None:
-                # For heatmap we need coordinates; skip if missing.
-                continue
-
-            airports[iata] = {
-                "iata": iata,
-                "icao": (row.get("ident") or "").strip().upper() or None,
-                "name": (row.get("name") or "").strip() or None,
-                "city": (row.get("municipality") or "").strip() or None,
-                "country": (row.get("iso_country") or "").strip().upper() or None,
-                "lat": lat,
-                "lon": lon,
-            }
+    # OurAirports typical columns: ident, type, name, latitude_deg, longitude_deg,
+    # elevation_ft, continent, iso_country, iso_region, municipality, scheduled_service,
+    # gps_code, iata_code, local_code, home_link, wikipedia_link, keywords
+    for row in table:
+        iata = (row.get("iata_code") or "").strip().upper()
+        if not iata or len(iata) != 3:
+            continue
+
+        lat = _to_float(row.get("latitude_deg"))
+        lon = _to_float(row.get("longitude_deg"))
+        if lat is None or lon is None:
+            # For heatmap we need coordinates; skip if missing.
+            continue
+
+        airports[iata] = {
+            "iata": iata,
+            "icao": (row.get("ident") or "").strip().upper() or None,
+            "name": (row.get("name") or "").strip() or None,
+            "city": (row.get("municipality") or "").strip() or None,
+            "country": (row.get("iso_country") or "").strip().upper() or None,
+            "lat": lat,
+            "lon": lon,
+        }
+
+    return airports
+
+
+def main(ds: Dataset | None = None) -> None:
+    if ds is None:
+        ds = get_dataset()
+    airports_csv = Path(ds.input_path(AIRPORTS_CSV))
+    if not airports_csv.exists():
+        raise FileNotFoundError(f"Missing input: {airports_csv}")
+
+    utils_metrics.phase("load")
+    # Die gefilterte Flughafenliste wird pro Inhalt von airports.csv gecacht;
+    # bei einem Treffer wird die CSV gar nicht geparst. PARSER_VERSION im
+    # Schlüssel: neuer CSV-Parser -> Liste neu aufbauen.
+    airports = load_or_build(
+        "airports",
+        (file_digest(str(airports_csv)), AIRPORTS_VERSION, PARSER_VERSION),
+        lambda: parse_airports(ds.airports),
+    )
 
+    utils_metrics.phase("write")
     OUT_JSON.parent.mkdir(parents=True, exist_ok=True)
     # Stable ordering for diffs
     ordered = {k: airports[k] for k in sorted(airports.keys())}
 
-    OUT_JSON.write_text(json.dumps(ordered, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    write_json(OUT_JSON, ordered, newline=True)
+    ds.outputs["airports.json"] = ordered
     print(f"[build_airports] wrote {OUT_JSON} ({len(ordered)} airports)")
 
 
 if __name__ == "__main__":
-    main()
+    utils_metrics.run_stage("build_airports", main)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kompletter Daten-Build in einem Prozess.
+
+Jede Stufe deklariert Eingaben, Ausgaben und Abhängigkeiten. Die Stufen
+laufen im selben Prozess und teilen sich ein Dataset (CSV-Tabellen werden
+einmal gelesen; flights/airports gehen über ds.outputs im Speicher an den
+Heatmap-Schritt). Unabhängige Stufen (airports / models / stats) laufen
+parallel in Threads.
+
+Eine Stufe wird übersprungen, wenn sich weder ihre Eingaben (Inhalts-Hash
+der Dateien + Code der Stufe + Ausgabeformat) noch ihre Ausgaben seit dem
+letzten Lauf geändert haben. Der Zustand liegt in .cache/build_state.json.
+Passt der Eingabe-Schlüssel zu einem Eintrag im Stufen-Cache
+(.cache/stages, siehe utils_stage_cache), werden die Ausgaben nur
+wiederhergestellt statt neu berechnet.
+
+    python tools/build_all.py [--force]
+
+BUILD_JOBS: Anzahl paralleler Stufen (Default 3, 0/1 = seriell).
+MODELS_BUNDLE=1 oder --bundle: Modell-JSONs zusätzlich gepackt (utils_bundle).
+--force oder FORCE_REBUILD=1: nichts überspringen.
+
+Zeiten und I/O je Stufe und Phase landen in .cache/build_metrics.json
+(siehe utils_metrics). --profile oder PROFILE=1: jede laufende Stufe wird
+einzeln profiliert (siehe utils_profile); die Stufen laufen dann seriell.
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence
+
+import build_airports
+import build_compressed
+import build_details
+import build_heatmap
+import build_json
+import build_postcards_index
+import build_public_pages
+import build_search_index
+import build_stats
+import utils_bundle
+import utils_json
+import utils_metrics
+import utils_profile
+from utils_cache import file_digest
+from utils_dataset import (
+    AIRPORTS_CSV,
+    AIRLINE_LOGOS_CSV,
+    FLIGHTS_CSV,
+    GROUP_TYPES_CSV,
+    LIV_CSV,
+    MODELS_CSV,
+    PAX_CSV,
+    REPO_ROOT,
+    Dataset,
+    get_dataset,
+)
+from utils_output import COMPACT, atomic_write_bytes, dump_json
+from utils_stage_cache import OUTPUT_EXTS, StageCache
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_JSON = os.path.join(REPO_ROOT, ".cache", "build_state.json")
+
+FORCE = "--force" in sys.argv or os.environ.get("FORCE_REBUILD", "").strip() == "1"
+
+
+def build_jobs() -> int:
+    v = os.environ.get("BUILD_JOBS", "").strip()
+    jobs = int(v) if v.isdigit() else 3
+    # es kann nur ein cProfile gleichzeitig aktiv sein (ab 3.12: "Another
+    # profiling tool is already active") -> mit Profiling seriell
+    if utils_profile.ENABLED and jobs > 1:
+        print(f"[build_all] profiling: BUILD_JOBS={jobs} -> 1 (one profiler at a time)")
+        return 1
+    return jobs
+
+
+def _docs(*parts: str) -> str:
+    return os.path.join(REPO_ROOT, "docs", *parts)
+
+
+class Stage:
+    """
+    Eine Build-Stufe. inputs/outputs sind Dateien oder Ordner (alle *.json darin).
+    always=True: läuft immer (Stufe prüft selbst, was zu tun ist).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dataset], object],
+        script: str,
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        deps: Sequence[str] = (),
+        always: bool = False,
+    ):
+        self.name = name
+        self.run = run
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.always = always
+
+
+STAGES: List[Stage] = [
+    Stage(
+        "airports", build_airports.main, "build_airports.py",
+        inputs=[AIRPORTS_CSV],
+        outputs=[_docs("data", "airports.json")],
+    ),
+    Stage(
+        "models", build_json.main, "build_json.py",
+        inputs=[MODELS_CSV, PAX_CSV, LIV_CSV, AIRLINE_LOGOS_CSV, FLIGHTS_CSV],
+        outputs=[
+            _docs("index.json"),
+            _docs("data", "flights.json"),
+            _docs("data", "aircraft_families.json"),
+            _docs("data", "models_manifest.json"),
+            _docs("data", "models"),
+            _docs("data", "index"),
+            utils_bundle.BUNDLE_PATH,
+            utils_bundle.BUNDLE_INDEX_JSON,
+        ],
+    ),
+    Stage(
+        "stats", build_stats.main, "build_stats.py",
+        inputs=[MODELS_CSV, PAX_CSV, GROUP_TYPES_CSV],
+        outputs=[
+            _docs("data", "group_aircraft_types.json"),
+            _docs("data", "missing_types.json"),
+            _docs("data", "matrix.json"),
+            _docs("data", "types_overview.json"),
+        ],
+    ),
+    Stage(
+        "postcards_index", lambda ds: build_postcards_index.main(), "build_postcards_index.py",
+        inputs=[_docs("data", "models"), utils_bundle.BUNDLE_INDEX_JSON],
+        outputs=[_docs("data", "postcards_index.json")],
+        deps=["models"],
+    ),
+    Stage(
+        "heatmap", build_heatmap.main, "build_heatmap.py",
+        inputs=[_docs("data", "flights.json"), _docs("data", "airports.json")],
+        outputs=[
+            _docs("data", "flights_points.json"),
+            _docs("data", "flights_routes.json"),
+            _docs("data", "airports_missing.json"),
+        ],
+        deps=["models", "airports"],
+    ),
+    Stage(
+        "details", build_details.main, "build_details.py",
+        inputs=[
+            _docs("index.json"),
+            _docs("data", "flights.json"),
+            _docs("data", "group_aircraft_types.json"),
+            _docs("data", "aircraft_families.json"),
+            _docs("data", "postcards_index.json"),
+            _docs("data", "postcards_enriched.json"),
+            _docs("data", "aircraft_photos_enriched.json"),
+            _docs("data", "models"),
+            utils_bundle.BUNDLE_INDEX_JSON,
+        ],
+        outputs=[
+            build_details.MODEL_DETAILS_DIR,
+            build_details.FLIGHT_DETAILS_DIR,
+            build_details.POSTCARD_DETAILS_DIR,
+        ],
+        deps=["models", "stats", "postcards_index"],
+    ),
+    Stage(
+        "public_pages", build_public_pages.main, "build_public_pages.py",
+        inputs=[
+            _docs("index.json"),
+            _docs("data", "models"),
+            utils_bundle.BUNDLE_INDEX_JSON,
+            *build_public_pages.CSS_FILES,
+        ],
+        outputs=[build_public_pages.OUT_DIR],
+        deps=["models"],
+    ),
+    Stage(
+        "search", build_search_index.main, "build_search_index.py",
+        inputs=[
+            _docs("index.json"),
+            _docs("data", "flights.json"),
+            _docs("data", "postcards_index.json"),
+            _docs("data", "postcards_enriched.json"),
+            PAX_CSV,
+            LIV_CSV,
+        ],
+        outputs=[build_search_index.SEARCH_DIR],
+        deps=["models", "postcards_index"],
+    ),
+    Stage(
+        "compress", lambda ds: build_compressed.main(), "build_compressed.py",
+        deps=["airports", "models", "stats", "postcards_index", "heatmap", "details", "search"],
+        always=True,
+    ),
+]
+
+
+# =========================
+# Fingerprints
+# =========================
+def _path_digest(path: str) -> str:
+    """sha1 einer Datei bzw. aller Ausgabedateien eines Ordners; "-" wenn nicht vorhanden."""
+    if os.path.isdir(path):
+        h = hashlib.sha1()
+        for fn in sorted(os.listdir(path)):
+            if fn.endswith(OUTPUT_EXTS):
+                h.update(fn.encode("utf-8") + b"\0" + file_digest(os.path.join(path, fn)).encode("ascii"))
+        return h.hexdigest()
+    if os.path.isfile(path):
+        return file_digest(path)
+    return "-"
+
+
+def _rel(path: str) -> str:
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+
+
+def input_key(stage: Stage, ds: Dataset) -> str:
+    h = hashlib.sha1()
+    h.update(b"compact" if COMPACT else b"pretty")
+    if utils_bundle.ENABLED:
+        h.update(b"bundle")
+    code = [os.path.join(TOOLS_DIR, stage.script)] + sorted(glob.glob(os.path.join(TOOLS_DIR, "utils_*.py")))
+    for p in code + [ds.input_path(p) for p in stage.inputs]:
+        h.update(_rel(p).encode("utf-8") + b"\0" + _path_digest(p).encode("ascii") + b"\n")
+    return h.hexdigest()
+
+
+def output_digests(stage: Stage, ds: Dataset) -> Dict[str, str]:
+    return {_rel(p): _path_digest(ds.input_path(p)) for p in stage.outputs}
+
+
+def load_state() -> Dict[str, Dict[str, object]]:
+    try:
+        return utils_json.read_json(STATE_JSON)
+    except (OSError, ValueError):
+        return {}
+
+
+# =========================
+# Scheduler
+# =========================
+class Runner:
+    def __init__(self, stages: List[Stage], ds: Dataset, jobs: int):
+        self.stages = {s.name: s for s in stages}
+        self.ds = ds
+        self.jobs = max(1, jobs)
+        self.state = {} if FORCE else load_state()
+        self.cache = StageCache()
+        self.result: Dict[str, str] = {}  # name -> ran / skipped / restored / failed / blocked
+        self.seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _save_state(self) -> None:
+        with self._lock:
+            data = dump_json(dict(sorted(self.state.items())), newline=True, compact=False)
+        atomic_write_bytes(STATE_JSON, data)
+
+    def _execute(self, stage: Stage) -> str:
+        with utils_metrics.stage(os.path.splitext(stage.script)[0]) as rec:
+            try:
+                rec.status = self._execute_stage(stage)
+            except BaseException:
+                rec.status = "failed"
+                raise
+        return rec.status
+
+    def _execute_stage(self, stage: Stage) -> str:
+        key = None if stage.always else input_key(stage, self.ds)
+        prev = self.state.get(stage.name) or {}
+        if (
+            key is not None
+            and prev.get("inputs") == key
+            and prev.get("outputs") == output_digests(stage, self.ds)
+        ):
+            return "skipped"
+
+        t0 = time.perf_counter()
+        if key is not None and not FORCE and self.cache.restore(stage.name, key):
+            status = "restored"
+        else:
+            with utils_profile.profiled(os.path.splitext(stage.script)[0]):
+                rc = stage.run(self.ds)
+            if isinstance(rc, int) and rc != 0:
+                raise RuntimeError(f"stage {stage.name} returned {rc}")
+            if key is not None:
+                self.cache.store(stage.name, key, [self.ds.input_path(p) for p in stage.outputs])
+            status = "ran"
+        self.seconds[stage.name] = time.perf_counter() - t0
+
+        if key is not None:
+            with self._lock:
+                self.state[stage.name] = {"inputs": key, "outputs": output_digests(stage, self.ds)}
+            self._save_state()
+        return status
+
+    def _ready(self) -> List[Stage]:
+        out = []
+        for s in self.stages.values():
+            if s.name in self.result or s.name in self._running:
+                continue
+            dep_results = [self.result.get(d) for d in s.deps]
+            if any(r in ("failed", "blocked") for r in dep_results):
+                self.result[s.name] = "blocked"
+                print(f"[build_all] {s.name}: blocked (dependency failed)")
+                continue
+            if all(r in ("ran", "skipped", "restored") for r in dep_results):
+                out.append(s)
+        return out
+
+    def run(self) -> bool:
+        self._running: Dict[str, Future] = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as ex:
+            while True:
+                for s in self._ready():
+                    print(f"[build_all] {s.name}: start")
+                    self._running[s.name] = ex.submit(self._execute, s)
+                if not self._running:
+                    break
+                done, _ = wait(self._running.values(), return_when=FIRST_COMPLETED)
+                for name, fut in list(self._running.items()):
+                    if fut not in done:
+                        continue
+                    del self._running[name]
+                    try:
+                        self.result[name] = fut.result()
+                    except Exception:
+                        traceback.print_exc()
+                        self.result[name] = "failed"
+                    took = self.seconds.get(name)
+                    print(f"[build_all] {name}: {self.result[name]}" + (f" ({took:.2f}s)" if took is not None else ""))
+        return all(r in ("ran", "skipped", "restored") for r in self.result.values())
+
+
+def main(ds: Optional[Dataset] = None) -> int:
+    if ds is None:
+        ds = get_dataset()
+
+    t0 = time.perf_counter()
+    runner = Runner(STAGES, ds, build_jobs())
+    ok = runner.run()
+
+    runner.cache.evict()
+    print(runner.cache.report())
+
+    total = time.perf_counter() - t0
+    summary = " ".join(f"{s.name}={runner.result.get(s.name, '?')}" for s in STAGES)
+    print(f"[build_all] {summary} total={total:.2f}s jobs={runner.jobs}")
+
+    metrics_path = utils_metrics.write_report(replace=True, extra={
+        "wall_s": round(total, 4),
+        "cpu_s": round(time.process_time(), 4),
+        "peak_rss_kb": utils_metrics.peak_rss_kb(),
+        "jobs": runner.jobs,
+        "compact": COMPACT,
+        "force": FORCE,
+        "stage_cache": {"hits": runner.cache.hits, "misses": runner.cache.misses},
+    })
+    print(f"[build_all] metrics -> {_rel(metrics_path)}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+# tools/build_compressed.py
+"""
+Vorkomprimierte Geschwister (.gz, .br) für alle veröffentlichten Datendateien
+(docs/index.json, docs/data/*.json, docs/data/models/*.json,
+docs/data/index/*.json, docs/data/search/*.json) plus Größenreport pro Datei.
+
+- gzip mit mtime=0 und brotli sind deterministisch, unveränderte Quellen
+  erzeugen also byte-gleiche Geschwister (kein Git-Churn).
+- Neu berechnet wird nach Inhalt: docs/data/compressed_manifest.json hält
+  pro Quelle den sha1, aus dem die Geschwister erzeugt wurden, und deren
+  Größe. Passen beide, bleibt das Geschwister stehen (mtimes sind nach
+  einem Checkout bzw. nach Enrichment-Workflows ohne Kompression
+  nicht aussagekräftig).
+- Geschwister ohne Quelle (gelöschte Modelle) werden entfernt.
+- Sehr kleine Dateien (< COMPRESS_MIN_BYTES) bekommen keine Geschwister.
+- brotli ist optional (requirements-data.txt); fehlt es, gibt es nur .gz.
+
+    python tools/build_compressed.py [--force]
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+import utils_json
+import utils_metrics
+from utils_cache import file_digest
+from utils_output import write_bytes_if_changed, write_json
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_DIR = os.path.join(REPO_ROOT, "docs")
+DATA_DIR = os.path.join(DOCS_DIR, "data")
+MODELS_DIR = os.path.join(DATA_DIR, "models")
+INDEX_SHARDS_DIR = os.path.join(DATA_DIR, "index")
+SEARCH_DIR = os.path.join(DATA_DIR, "search")
+# im Report zusammengefasst statt einer Zeile pro Datei
+GROUPED_DIRS = {MODELS_DIR: "data/models", INDEX_SHARDS_DIR: "data/index", SEARCH_DIR: "data/search"}
+
+COMPRESSED_MANIFEST_JSON = os.path.join(DATA_DIR, "compressed_manifest.json")
+COMPRESSED_MANIFEST_VERSION = 1
+
+FORCE = "--force" in sys.argv
+COMPRESS_MIN_BYTES = 256
+
+# interne Buchhaltung, wird nicht vom Frontend geladen
+SKIP_FILES = {"models_manifest.json", "outputs_manifest.json", "compressed_manifest.json"}
+
+
+def published_files() -> List[str]:
+    files = [os.path.join(DOCS_DIR, "index.json")]
+    for d in (DATA_DIR, MODELS_DIR, INDEX_SHARDS_DIR, SEARCH_DIR):
+        if not os.path.isdir(d):
+            continue
+        for fn in sorted(os.listdir(d)):
+            if fn.endswith(".json") and fn not in SKIP_FILES:
+                files.append(os.path.join(d, fn))
+    return [p for p in files if os.path.isfile(p)]
+
+
+def _gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    try:
+        manifest = utils_json.read_json(COMPRESSED_MANIFEST_JSON)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != COMPRESSED_MANIFEST_VERSION:
+        return {}
+    files = manifest.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def compress_file(path: str, prev: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Schreibt path.gz / path.br falls nötig; liefert den Manifest-Eintrag
+    (sha1 der Quelle, raw und die Größen der Geschwister).
+    prev: Eintrag aus dem letzten Lauf ({} wenn keiner).
+    """
+    sha1 = file_digest(path)
+    entry: Dict[str, Any] = {"sha1": sha1, "raw": os.path.getsize(path)}
+    data = None
+
+    encoders: List[Tuple[str, Callable[[bytes], bytes]]] = [("gz", _gzip)]
+    if brotli is not None:
+        encoders.append(("br", _brotli))
+
+    if entry["raw"] < COMPRESS_MIN_BYTES:
+        for ext, _ in encoders:
+            if os.path.exists(f"{path}.{ext}"):
+                os.remove(f"{path}.{ext}")
+        return entry
+
+    same_source = not FORCE and prev.get("sha1") == sha1
+    # ohne brotli kein neues .br -> ein altes zu anderem Inhalt wäre veraltet
+    if brotli is None and not same_source and os.path.exists(f"{path}.br"):
+        os.remove(f"{path}.br")
+    for ext, encode in encoders:
+        sibling = f"{path}.{ext}"
+        if same_source and ext in prev and os.path.isfile(sibling) and os.path.getsize(sibling) == prev[ext]:
+            entry[ext] = prev[ext]
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+            utils_metrics.count("bytes_read", len(data))
+        blob = encode(data)
+        write_bytes_if_changed(sibling, blob)
+        entry[ext] = len(blob)
+    return entry
+
+
+def remove_orphans() -> int:
+    removed = 0
+    for d in (DOCS_DIR, DATA_DIR, MODELS_DIR, INDEX_SHARDS_DIR, SEARCH_DIR):
+        if not os.path.isdir(d):
+            continue
+        for fn in os.listdir(d):
+            base, ext = os.path.splitext(fn)
+            if ext not in (".gz", ".br") or not base.endswith(".json"):
+                continue
+            if not os.path.exists(os.path.join(d, base)):
+                os.remove(os.path.join(d, fn))
+                removed += 1
+    utils_metrics.count("files_removed", removed)
+    return removed
+
+
+def _fmt(n: int) -> str:
+    return f"{n / 1024:9.1f}K"
+
+
+def main() -> int:
+    if brotli is None:
+        print("[compress] brotli not installed -> only .gz (pip install -r requirements-data.txt)")
+
+    utils_metrics.phase("compress")
+    removed = remove_orphans()
+    previous = load_manifest()
+    manifest: Dict[str, Dict[str, Any]] = {}
+    report: List[Tuple[str, Dict[str, int]]] = []
+    group_totals: Dict[str, Dict[str, int]] = {d: {"raw": 0} for d in GROUPED_DIRS}
+    group_counts: Dict[str, int] = {d: 0 for d in GROUPED_DIRS}
+
+    for path in published_files():
+        rel = os.path.relpath(path, DOCS_DIR).replace(os.sep, "/")
+        entry = compress_file(path, previous.get(rel) or {})
+        manifest[rel] = entry
+        sizes = {k: v for k, v in entry.items() if k != "sha1"}
+        d = os.path.dirname(path)
+        if d in GROUPED_DIRS:
+            group_counts[d] += 1
+            for k, v in sizes.items():
+                group_totals[d][k] = group_totals[d].get(k, 0) + v
+        else:
+            report.append((rel, sizes))
+    write_json(COMPRESSED_MANIFEST_JSON, {"version": COMPRESSED_MANIFEST_VERSION, "files": manifest})
+
+    for d, label in GROUPED_DIRS.items():
+        if group_counts[d]:
+            report.append((f"{label}/*.json ({group_counts[d]} files)", group_totals[d]))
+
+    utils_metrics.phase("report")
+    print(f"{'file':45} {'raw':>10} {'gzip':>10} {'brotli':>10} {'gz %':>6}")
+    totals = {"raw": 0, "gz": 0, "br": 0}
+    for name, sizes in report:
+        for k in totals:
+            totals[k] += sizes.get(k, 0)
+        gz = _fmt(sizes["gz"]) if "gz" in sizes else f"{'-':>10}"
+        br = _fmt(sizes["br"]) if "br" in sizes else f"{'-':>10}"
+        pct = f"{100.0 * sizes['gz'] / sizes['raw']:5.1f}%" if "gz" in sizes else f"{'-':>6}"
+        print(f"{name:45} {_fmt(sizes['raw'])} {gz} {br} {pct}")
+    br = _fmt(totals["br"]) if brotli is not None else f"{'-':>10}"
+    print(f"{'total':45} {_fmt(totals['raw'])} {_fmt(totals['gz'])} {br}")
+    print(f"[compress] orphans removed={removed}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_metrics.run_stage("build_compressed", main))
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vorverknüpfte Detail-Bundles: eine kleine JSON-Datei pro Modell, Flug und
+Postkarte mit allem, was die Detailseite braucht. Die Joins, die bisher
+im Browser über index.json, flights.json, postcards_*.json usw. liefen,
+passieren hier einmal beim Build.
+
+    docs/data/details/model/<id>.json     model.js
+        model               Modell-JSON (wie data/models/<id>.json)
+        nav                 prev/next/pos/total über die vorhandenen Modelle
+        same_type           index.json-Einträge + group_aircraft_types mit
+                            derselben aircraft_id (für "gleicher Typ")
+        photo_enriched      Eintrag aus aircraft_photos_enriched.json
+        postcards_enriched  Einträge aus postcards_enriched.json zu den Postkarten
+        family              Zeilen der Baureihe aus aircraft_families.json
+    docs/data/details/flight/<id>.json    flight.js
+        flight, first_badges ("Erstflug ..."), models (gleiche aircraft_id)
+    docs/data/details/postcard/<id>.json  postcard.js
+        base (postcards_index), enriched (postcards_enriched), nav
+
+Dateiname wie bei den Modell-JSONs: safe_filename(id), bei Postkarten
+in Großbuchstaben (so sucht postcard.js). Fehlt ein Bundle, laden die
+Seiten wie bisher die großen Dateien.
+"""
+from __future__ import annotations
+
+import calendar
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import utils_bundle
+import utils_json
+import utils_metrics
+from build_json import safe_filename
+from utils_dataset import Dataset
+from utils_output import ParallelWriter, dump_json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "docs", "data")
+
+INDEX_JSON = os.path.join(REPO_ROOT, "docs", "index.json")
+FLIGHTS_JSON = os.path.join(DATA_DIR, "flights.json")
+GROUP_TYPES_JSON = os.path.join(DATA_DIR, "group_aircraft_types.json")
+AIRCRAFT_FAMILIES_JSON = os.path.join(DATA_DIR, "aircraft_families.json")
+POSTCARDS_INDEX_JSON = os.path.join(DATA_DIR, "postcards_index.json")
+POSTCARDS_ENRICHED_JSON = os.path.join(DATA_DIR, "postcards_enriched.json")
+PHOTOS_ENRICHED_JSON = os.path.join(DATA_DIR, "aircraft_photos_enriched.json")
+
+DETAILS_DIR = os.path.join(DATA_DIR, "details")
+MODEL_DETAILS_DIR = os.path.join(DETAILS_DIR, "model")
+FLIGHT_DETAILS_DIR = os.path.join(DETAILS_DIR, "flight")
+POSTCARD_DETAILS_DIR = os.path.join(DETAILS_DIR, "postcard")
+
+GROUP_TYPE_FIELDS = ("airline_code", "airline", "airline_row", "aircraft_id", "aircraft_type")
+
+
+def load_json(path: str, default: Any) -> Any:
+    """Optionale Eingaben (z.B. die Enrichment-Dateien) dürfen fehlen."""
+    try:
+        return utils_json.read_json(path)
+    except (OSError, ValueError):
+        return default
+
+
+def as_text(v: Any) -> str:
+    # wie asText() in den Seiten
+    return "" if v is None else str(v).strip()
+
+
+def items_of(payload: Any) -> List[Dict[str, Any]]:
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    return [x for x in items if isinstance(x, dict)] if isinstance(items, list) else []
+
+
+def nav_neighbors(ids: List[str], current: str) -> Dict[str, Any]:
+    """wie navNeighbors() in model.js / postcard.js"""
+    cur = current.strip().upper()
+    upper = [as_text(x).upper() for x in ids]
+    if cur not in upper:
+        return {"prev": "", "next": "", "pos": 0, "total": len(ids)}
+    i = upper.index(cur)
+    return {
+        "prev": ids[i - 1] if i > 0 else "",
+        "next": ids[i + 1] if i < len(ids) - 1 else "",
+        "pos": i + 1,
+        "total": len(ids),
+    }
+
+
+def same_type_status(x: Dict[str, Any]) -> bool:
+    """Zählt im Block "gleicher Typ" mit (sameTypeNormalizeStatus in model.js)?"""
+    s = as_text(x.get("status")).lower()
+    return s in ("owned", "ordered", "wishlist") or x.get("wishlist") is True
+
+
+# =========================
+# Erstflug-Badges (wie computeFirstMaps / buildFirstBadges in flight.js)
+# =========================
+HHMM_RE = re.compile(r"^(\d{1,2}):(\d{2})(?::(\d{2}))?$")
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# was Number() in JS als endliche Dezimalzahl liest
+JS_NUMBER_RE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+
+def time_to_minutes(v: Any) -> int:
+    s = as_text(v)
+    m = HHMM_RE.match(s)
+    if m:
+        return int(m.group(1)) * 60 + int(m.group(2))
+    s = s.replace(",", ".", 1)
+    if s and JS_NUMBER_RE.match(s):
+        num = float(s)
+        if math.isfinite(num):
+            return math.floor(num * 24 * 60 + 0.5)  # Math.round
+    return 0
+
+
+def flight_stamp(f: Dict[str, Any]) -> int:
+    d = as_text(f.get("date"))
+    if not DATE_RE.match(d):
+        return MAX_SAFE_INTEGER
+    try:
+        ts = calendar.timegm((int(d[:4]), int(d[5:7]), int(d[8:10]), 0, 0, 0)) * 1000
+    except ValueError:
+        return MAX_SAFE_INTEGER
+    return ts + time_to_minutes(f.get("time")) * 60 * 1000
+
+
+def first_badges(flights: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """flight_id -> ["Erstflug Airline", ...] über alle Flüge (chronologisch)."""
+    first: Dict[Tuple[str, str], str] = {}
+    for f in sorted(flights, key=flight_stamp):
+        fid = as_text(f.get("flight_id"))
+        if not fid:
+            continue
+        a = as_text(f.get("logo_id")).upper()
+        t = as_text(f.get("aircraft_id")).upper()
+        r = as_text(f.get("registration")).upper()
+        for kind, key in (("airline", a), ("type", t), ("reg", r)):
+            if key:
+                first.setdefault((kind, key), fid)
+        if a and t:
+            first.setdefault(("airlineType", a + "|" + t), fid)
+        if a and r:
+            first.setdefault(("airlineReg", a + "|" + r), fid)
+
+    out: Dict[str, List[str]] = {}
+    for f in flights:
+        fid = as_text(f.get("flight_id"))
+        if not fid or fid in out:
+            continue
+        a = as_text(f.get("logo_id")).upper()
+        t = as_text(f.get("aircraft_id")).upper()
+        r = as_text(f.get("registration")).upper()
+        badges = []
+        if a and first.get(("airline", a)) == fid:
+            badges.append("Erstflug Airline")
+        if t and first.get(("type", t)) == fid:
+            badges.append("Erstflug Typ")
+        if r and first.get(("reg", r)) == fid:
+            badges.append("Erstflug Reg")
+        if a and t and first.get(("airlineType", a + "|" + t)) == fid:
+            badges.append("Erstflug Airline+Typ")
+        if a and r and first.get(("airlineReg", a + "|" + r)) == fid:
+            badges.append("Erstflug Airline+Reg")
+        out[fid] = badges
+    return out
+
+
+# =========================
+# Bundles
+# =========================
+def group_by(rows: Iterable[Dict[str, Any]], field: str) -> Dict[str, List[Dict[str, Any]]]:
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        key = as_text(r.get(field))
+        if key:
+            out.setdefault(key, []).append(r)
+    return out
+
+
+def model_details(index_items: List[Dict[str, Any]], writer: ParallelWriter) -> List[str]:
+    group_types = items_of(load_json(GROUP_TYPES_JSON, {}))
+    families = load_json(AIRCRAFT_FAMILIES_JSON, {}).get("families") or {}
+    photos = load_json(PHOTOS_ENRICHED_JSON, {})
+    pc_enriched = load_json(POSTCARDS_ENRICHED_JSON, {})
+
+    # Navigation nur über vorhandene Modelle, Reihenfolge aus index.json
+    nav_ids = [
+        as_text(it.get("model_id") if it.get("model_id") is not None else it.get("id"))
+        for it in index_items
+        if as_text(it.get("status")).lower() == "owned"
+    ]
+    nav_ids = [x for x in nav_ids if x]
+    nav_pos = {x.upper(): i for i, x in reversed(list(enumerate(nav_ids)))}
+
+    def nav(model_id: str) -> Dict[str, Any]:
+        i = nav_pos.get(model_id.upper())
+        if i is None:
+            return {"prev": "", "next": "", "pos": 0, "total": len(nav_ids)}
+        return {
+            "prev": nav_ids[i - 1] if i > 0 else "",
+            "next": nav_ids[i + 1] if i < len(nav_ids) - 1 else "",
+            "pos": i + 1,
+            "total": len(nav_ids),
+        }
+
+    index_by_type = group_by((x for x in index_items if same_type_status(x)), "aircraft_id")
+    # nur die Felder, die buildSameTypeOverviewRows() liest
+    groups_by_type = group_by(
+        ({k: gt.get(k) for k in GROUP_TYPE_FIELDS if k in gt} for gt in group_types), "aircraft_id"
+    )
+
+    written: List[str] = []
+    for fn, d in utils_bundle.iter_model_jsons():
+        if not isinstance(d, dict):
+            continue
+        utils_metrics.count("rows_read")
+        model_id = as_text(d.get("model_id")) or fn[:-5]
+        page_id = model_id.upper()  # model.js sucht mit der ID in Großbuchstaben
+        aircraft_id = as_text(d.get("aircraft_id"))
+        family = as_text((d.get("aircraft_full_v8") or {}).get("Baureihe"))
+        pc_ids = [as_text(pc.get("id")) for pc in d.get("postcards") or [] if isinstance(pc, dict)]
+
+        bundle = {
+            "model": d,
+            "nav": nav(page_id),
+            "same_type": {
+                "index_items": index_by_type.get(aircraft_id, []),
+                "group_types": groups_by_type.get(aircraft_id, []),
+            },
+            "photo_enriched": photos.get(page_id) if isinstance(photos, dict) else None,
+            "postcards_enriched": {i: pc_enriched[i] for i in pc_ids if i and i in pc_enriched},
+            "family": {"name": family, "rows": families.get(family) or []} if family else None,
+        }
+        writer.submit(os.path.join(MODEL_DETAILS_DIR, fn), dump_json(bundle))
+        written.append(fn)
+    return written
+
+
+def flight_details(index_items: List[Dict[str, Any]], flights: List[Dict[str, Any]], writer: ParallelWriter) -> List[str]:
+    badges = first_badges(flights)
+    models_by_type = group_by(index_items, "aircraft_id")
+
+    written: List[str] = []
+    seen = set()
+    for f in flights:
+        fid = as_text(f.get("flight_id"))
+        # flight.js nimmt den ersten Flug mit dieser ID
+        if not fid or fid in seen:
+            continue
+        seen.add(fid)
+        fn = safe_filename(fid) + ".json"
+        bundle = {
+            "flight": f,
+            "first_badges": badges.get(fid, []),
+            "models": models_by_type.get(as_text(f.get("aircraft_id")), []),
+        }
+        writer.submit(os.path.join(FLIGHT_DETAILS_DIR, fn), dump_json(bundle))
+        written.append(fn)
+    return written
+
+
+def postcard_details(writer: ParallelWriter) -> List[str]:
+    items = items_of(load_json(POSTCARDS_INDEX_JSON, {}))
+    enriched = load_json(POSTCARDS_ENRICHED_JSON, {})
+    if not isinstance(enriched, dict):
+        enriched = {}
+
+    nav_ids = [x for x in (as_text(it.get("id")) for it in items) if x]
+    base_by_id: Dict[str, Dict[str, Any]] = {}
+    for it in items:
+        base_by_id.setdefault(as_text(it.get("id")).upper(), it)
+
+    written: List[str] = []
+    for pc_id in sorted(set(base_by_id) | {as_text(k).upper() for k in enriched}):
+        base = base_by_id.get(pc_id)
+        e = enriched.get(pc_id)
+        if not pc_id or (base is None and e is None):
+            continue
+        fn = safe_filename(pc_id) + ".json"
+        bundle = {"base": base, "enriched": e, "nav": nav_neighbors(nav_ids, pc_id)}
+        writer.submit(os.path.join(POSTCARD_DETAILS_DIR, fn), dump_json(bundle))
+        written.append(fn)
+    return written
+
+
+def remove_stale(out_dir: str, keep: Iterable[str]) -> int:
+    keep = set(keep)
+    removed = 0
+    for fn in os.listdir(out_dir):
+        if fn.endswith(".json") and fn not in keep:
+            os.remove(os.path.join(out_dir, fn))
+            removed += 1
+    utils_metrics.count("files_removed", removed)
+    return removed
+
+
+def main(ds: Optional[Dataset] = None) -> int:
+    utils_metrics.phase("load")
+    outputs = ds.outputs if ds is not None else {}
+    index_items = items_of(load_json(INDEX_JSON, {}))
+    flights_payload = outputs.get("flights.json")
+    if flights_payload is None:
+        flights_payload = load_json(FLIGHTS_JSON, {})
+    flights = items_of(flights_payload)
+
+    for d in (MODEL_DETAILS_DIR, FLIGHT_DETAILS_DIR, POSTCARD_DETAILS_DIR):
+        os.makedirs(d, exist_ok=True)
+
+    counts: Dict[str, int] = {}
+    removed = 0
+    with ParallelWriter() as writer:
+        utils_metrics.phase("models")
+        models = model_details(index_items, writer)
+        utils_metrics.phase("flights")
+        flight_files = flight_details(index_items, flights, writer)
+        utils_metrics.phase("postcards")
+        postcard_files = postcard_details(writer)
+
+    utils_metrics.phase("cleanup")
+    for out_dir, files in ((MODEL_DETAILS_DIR, models), (FLIGHT_DETAILS_DIR, flight_files), (POSTCARD_DETAILS_DIR, postcard_files)):
+        counts[os.path.basename(out_dir)] = len(files)
+        removed += remove_stale(out_dir, files)
+
+    print(
+        f"[build_details] model={counts['model']} flight={counts['flight']} postcard={counts['postcard']} "
+        f"written={writer.written} identical={writer.unchanged} removed={removed}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_metrics.run_stage("build_details", main))
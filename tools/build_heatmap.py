@@ -1,10 +1,13 @@
 # tools/build_heatmap.py
 from __future__ import annotations
 
-import json
 from collections import Counter
 from pathlib import Path
+import utils_json
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import write_json
+from utils_dataset import Dataset
 
 ROOT = Path(__file__).resolve().parents[1]
 FLIGHTS_JSON = ROOT / "docs" / "data" / "flights.json"
@@ -42,17 +45,28 @@ def _extract_flights(payload) -> list[dict]:
     )
 
 
-def main() -> None:
-    if not FLIGHTS_JSON.exists():
-        raise FileNotFoundError(f"Missing input: {FLIGHTS_JSON}")
-    if not AIRPORTS_JSON.exists():
-        raise FileNotFoundError(
-            f"Missing input: {AIRPORTS_JSON} (run tools/build_airports.py first)"
-        )
-
-    flights_payload = json.loads(FLIGHTS_JSON.read_text(encoding="utf-8"))
-    airports: dict = json.loads(AIRPORTS_JSON.read_text(encoding="utf-8"))
+def main(ds: Dataset | None = None) -> None:
+    utils_metrics.phase("load")
+    # Im selben Prozess (build_all) liegen flights/airports schon im Speicher
+    outputs = ds.outputs if ds is not None else {}
+
+    flights_payload = outputs.get("flights.json")
+    if flights_payload is None:
+        if not FLIGHTS_JSON.exists():
+            raise FileNotFoundError(f"Missing input: {FLIGHTS_JSON}")
+        flights_payload = utils_json.read_json(FLIGHTS_JSON)
+
+    airports: dict | None = outputs.get("airports.json")
+    if airports is None:
+        if not AIRPORTS_JSON.exists():
+            raise FileNotFoundError(
+                f"Missing input: {AIRPORTS_JSON} (run tools/build_airports.py first)"
+            )
+        airports = utils_json.read_json(AIRPORTS_JSON)
     flights = _extract_flights(flights_payload)
+    utils_metrics.count("rows_read", len(flights))
+
+    utils_metrics.phase("aggregate")
 
     counts_airport: Counter[str] = Counter()
     missing: Counter[str] = Counter()
@@ -109,14 +123,13 @@ def main() -> None:
             }
         )
 
+    utils_metrics.phase("write")
     OUT_POINTS.parent.mkdir(parents=True, exist_ok=True)
-    OUT_POINTS.write_text(json.dumps(points, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    OUT_ROUTES.write_text(json.dumps(routes, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    write_json(OUT_POINTS, points, newline=True)
+    write_json(OUT_ROUTES, routes, newline=True)
 
     missing_list = [{"iata": k, "count": int(v)} for k, v in missing.most_common()]
-    OUT_MISSING.write_text(
-        json.dumps(missing_list, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-    )
+    write_json(OUT_MISSING, missing_list, newline=True)
 
     print(f"[build_heatmap] flights: {len(flights)}")
     print(f"[build_heatmap] points: {len(points)} -> {OUT_POINTS}")
@@ -125,4 +138,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    utils_metrics.run_stage("build_heatmap", main)
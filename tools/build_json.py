@@ -1,138 +1,78 @@
-import csv
+import hashlib
 import json
 import os
 import re
-from datetime import datetime, timedelta
+import sys
+from itertools import groupby
+import utils_bundle
+import utils_json
+import utils_metrics
 from utils_time import now_local_iso
-from typing import Any, Dict, Optional, List
+from utils_convert import (
+    excel_serial_to_iso,
+    excel_time_to_hhmm,
+    parse_price,
+    parse_scale_from_text,
+    to_bool_x,
+    to_float,
+)
+from utils_dataset import Dataset, get_dataset, resolve_status
+from utils_output import (
+    COMPACT,
+    VOLATILE_KEYS,
+    ParallelWriter,
+    dump_json,
+    json_workers,
+    serialize_many,
+    write_bytes_if_changed,
+    write_json,
+    write_json_stream,
+)
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-MODELS_CSV = os.path.join(REPO_ROOT, "models_export.csv")
-PAX_CSV = os.path.join(REPO_ROOT, "data", "passenger_aircraft_full.csv")
-LIV_CSV = os.path.join(REPO_ROOT, "data", "liveries.csv")
-AIRLINE_LOGOS_CSV = os.path.join(REPO_ROOT, "data", "airline_logos.csv")
-FLIGHTS_CSV = os.path.join(REPO_ROOT, "data", "flights_export.csv")
 OUT_FLIGHTS_JSON = os.path.join(REPO_ROOT, "docs", "data", "flights.json")
 OUT_AIRCRAFT_FAMILIES_JSON = os.path.join(REPO_ROOT, "docs", "data", "aircraft_families.json")
 OUT_DIR = os.path.join(REPO_ROOT, "docs", "data", "models")
 INDEX_JSON = os.path.join(REPO_ROOT, "docs", "index.json")
+MODELS_MANIFEST_JSON = os.path.join(REPO_ROOT, "docs", "data", "models_manifest.json")
+
+# index.json zusätzlich aufgeteilt nach airline_code (+ Manifest mit Größen/Hashes),
+# damit Seiten nur die Airlines laden, die sie brauchen; index.json bleibt wie bisher
+INDEX_SHARDS_DIR = os.path.join(REPO_ROOT, "docs", "data", "index")
+INDEX_SHARDS_MANIFEST_JSON = os.path.join(INDEX_SHARDS_DIR, "manifest.json")
+INDEX_SHARDS_VERSION = 1
+
+# Änderungen an diesen Dateien verändern die Modell-JSONs -> kompletter Neubau
+# (Aufbereitung, CSV-Parser + Parse-Cache, JSON-Kodierung/Ausgabe, Bundle)
+GENERATOR_SOURCES = (
+    "build_json.py",
+    "utils_convert.py",
+    "utils_csv.py",
+    "utils_cache.py",
+    "utils_dataset.py",
+    "utils_json.py",
+    "utils_output.py",
+    "utils_bundle.py",
+)
+MANIFEST_VERSION = 1
+
+# Kompletter Neubau statt inkrementell: FORCE_REBUILD=1 oder --full
+FORCE_REBUILD = os.environ.get("FORCE_REBUILD", "").strip() == "1" or "--full" in sys.argv
+
+SAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_-]")
     
-def read_csv(path: str) -> List[Dict[str, str]]:
-    if not os.path.exists(path):
-        return []
-
-    # Wir probieren mehrere Encodings, weil Excel-Exports oft CP1252/ANSI sind.
-    encodings = ["utf-8-sig", "utf-8", "cp1252", "latin-1"]
-
-    last_err: Exception | None = None
-    for enc in encodings:
-        try:
-            with open(path, "r", encoding=enc, newline="") as f:
-                reader = csv.DictReader(f, delimiter=";")
-                rows: List[Dict[str, str]] = []
-                for row in reader:
-                    # Normalize None -> ""
-                    rows.append({k: (v if v is not None else "") for k, v in row.items()})
-                return rows
-        except UnicodeDecodeError as e:
-            last_err = e
-            continue
-
-    # Wenn alles fehlschlägt, klarer Fehler
-    raise UnicodeDecodeError(
-        "read_csv",
-        b"",
-        0,
-        1,
-        f"Cannot decode CSV {path} with encodings {encodings}. Last error: {last_err}",
-    )
-
-
-def to_bool_x(v: str) -> Optional[bool]:
-    v = (v or "").strip().lower()
-    if v in ("x", "1", "true", "wahr", "yes", "ja"):
-        return True
-    if v in ("0", "false", "falsch", "no", "nein"):
-        return False
-    return None
-
-
-def to_float(v: str) -> Optional[float]:
-    v = (v or "").strip()
-    if not v:
-        return None
-    v = v.replace("€", "").replace(" ", "")
-    v = v.replace(",", ".")
-    try:
-        return float(v)
-    except ValueError:
-        return None
-
-def excel_serial_to_iso(v: str) -> Optional[str]:
-    """
-    Excel-Seriendatum (z.B. 45799) -> YYYY-MM-DD
-    """
-    v = (v or "").strip()
-    if not v:
-        return None
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", v):
-        return v
-    if re.match(r"^\d{1,2}\.\d{1,2}\.\d{4}$", v):
-        try:
-            d = datetime.strptime(v, "%d.%m.%Y").date()
-            return d.isoformat()
-        except ValueError:
-            pass
-    try:
-        n = int(float(v))
-        base = datetime(1899, 12, 30).date()
-        d = base + timedelta(days=n)
-        return d.isoformat()
-    except ValueError:
-        return None
-
-
 def safe_filename(model_id: str) -> str:
     model_id = model_id.strip()
-    model_id = re.sub(r"[^A-Za-z0-9_-]", "_", model_id)
+    model_id = SAFE_FILENAME_RE.sub("_", model_id)
     return model_id
 
 
-def index_by_key(rows: List[Dict[str, str]], key_field: str) -> Dict[str, Dict[str, str]]:
-    idx: Dict[str, Dict[str, str]] = {}
-    if not key_field:
-        return idx
-    for r in rows:
-        k = (r.get(key_field, "") or "").strip()
-        if k and k not in idx:
-            idx[k] = r
-    return idx
-
-
 def normalize_livery_code(v: str) -> str:
     return (v or "").strip()
 
 
-def parse_scale_from_text(text: str) -> Optional[str]:
-    """
-    Finds scale patterns like 1:400, 1 : 200, 1:87 in free text.
-    Also supports Excel-text marker prefix: '1:350
-    Returns normalized '1:XXX' or None.
-    """
-    t = (text or "").strip()
-    if not t:
-        return None
-
-    # Excel export: leading apostrophe to force text (e.g. '1:350)
-    if t.startswith("'"):
-        t = t[1:].strip()
-
-    m = re.search(r"\b1\s*:\s*(\d{2,4})\b", t)
-    if not m:
-        return None
-    return f"1:{m.group(1)}"
-
 def is_truthy(v: str) -> bool:
     s = (v or "").strip().lower()
     return s in {"1", "true", "wahr", "yes", "ja", "y", "x"}
@@ -157,455 +97,652 @@ def clean_generated_model_jsons() -> None:
             os.remove(path)
             removed += 1
 
+    utils_metrics.count("files_removed", removed)
     print(f"[build_json] cleanup model jsons: removed={removed}")
-    
-def main() -> int:
-    os.makedirs(OUT_DIR, exist_ok=True)
 
-    # Alte Modell-JSONs entfernen, damit umbenannte IDs keine verwaisten Dateien hinterlassen
-    clean_generated_model_jsons()
 
-    models = read_csv(MODELS_CSV)
-    pax_rows = read_csv(PAX_CSV)
-    liv_rows = read_csv(LIV_CSV)
-    logos_rows = read_csv(AIRLINE_LOGOS_CSV)
-    flights_rows = read_csv(FLIGHTS_CSV)
-    
-    print("DEBUG flights rows:", len(flights_rows))
-    if flights_rows:
-        print("DEBUG keys:", list(flights_rows[0].keys()))
-        print("DEBUG first row:", flights_rows[0])
-    
-    # Index nach logo_id (Primärschlüssel)
-    logos_idx = index_by_key(logos_rows, "logo_id")
+# =========================
+# Inkrementeller Build (Fingerprints je Modell-JSON)
+# =========================
+def generator_fingerprint(models_header: List[str]) -> str:
+    h = hashlib.sha1()
+    h.update(str(MANIFEST_VERSION).encode("ascii"))
+    for name in GENERATOR_SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            h.update(f.read())
+    h.update(json.dumps(list(models_header), ensure_ascii=False).encode("utf-8"))
+    # anderes Ausgabeformat (JSON_STYLE) -> alle Dateien neu schreiben
+    h.update(b"compact" if COMPACT else b"pretty")
+    return h.hexdigest()
 
-    pax_idx = index_by_key(pax_rows, "aircraft_id")
 
+def load_manifest(generator: str) -> Dict[str, str]:
+    """
+    Fingerprints des letzten Builds (Dateiname -> sha1). Leer, wenn es keinen
+    passenden Manifest gibt -> alle Modell-JSONs werden neu geschrieben.
+    """
+    if FORCE_REBUILD or not os.path.exists(MODELS_MANIFEST_JSON):
+        return {}
+    try:
+        manifest = utils_json.read_json(MODELS_MANIFEST_JSON)
+    except (OSError, ValueError) as e:
+        print(f"[build_json] ignoring unreadable manifest: {e}")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("generator") != generator:
+        print("[build_json] generator changed -> full rebuild")
+        return {}
+    return manifest.get("models") or {}
+
+
+def write_manifest(generator: str, fingerprints: Dict[str, str]) -> None:
+    payload = {
+        "version": MANIFEST_VERSION,
+        "generator": generator,
+        "models": dict(sorted(fingerprints.items())),
+    }
+    # bleibt eingerückt, damit Diffs im Repo lesbar sind
+    write_json(MODELS_MANIFEST_JSON, payload, compact=False)
 
-    # In liveries kann der Schlüssel unterschiedlich heißen; wir versuchen mehrere typische
-    liv_key = None
-    if liv_rows:
-        header_keys = list(liv_rows[0].keys())
-    
-        # case-insensitive lookup
-        def find_key_ci(candidates):
-            lower_map = {k.lower(): k for k in header_keys}
-            for c in candidates:
-                k = lower_map.get(c.lower())
-                if k:
-                    return k
-            return None
-    
-        liv_key = find_key_ci([
-            "Livery_ID", "livery_id",
-            "LiveryId", "liveryid",
-            "Livery_Code", "livery_code",
-            "Code", "code"
-        ])
-    
-    liv_idx = index_by_key(liv_rows, liv_key) if liv_key else {}
 
-    index_list = []
-    counts: Dict[str, int] = {}
+def model_fingerprints(ds: Dataset) -> Dict[str, str]:
+    """
+    Fingerprint je Ausgabedatei: Modellzeile + gejointe pax-, Livery- und Logo-Zeile.
+    Mehrere Zeilen mit demselben Dateinamen landen im selben Fingerprint.
+    """
+    pax_raw = ds.pax_raw_by_id
+    liv_raw = ds.liveries_raw_by_code
+    logos_idx = ds.logos_by_id
 
-    for r in models:
-        model_id = (r.get("model_id", "") or "").strip()
+    parts: Dict[str, List[Any]] = {}
+    for r in ds.models:
+        model_id = r.model_id
         if not model_id:
             continue
+        livery = normalize_livery_code(r.get("livery"))
+        logo_row = logos_idx.get(r.get("logo_id"))
+        parts.setdefault(safe_filename(model_id) + ".json", []).append([
+            list(r),
+            pax_raw.get(r.get("aircraft_id")),
+            liv_raw.get(livery) if livery else None,
+            list(logo_row) if logo_row else None,
+        ])
 
-        airline_code = (r.get("airline_code", "") or "").strip()
-        airline = (r.get("airline", "") or "").strip()
-        airline_row = (r.get("airline_row", "") or "").strip()
-        manufacturer = (r.get("manufacturer", "") or "").strip()
-        
-        aircraft_name = (r.get("aircraft_name", "") or "").strip()
-        livery_note = (r.get("livery_note", "") or "").strip()
-        extra_info = (r.get("extra_info", "") or "").strip()
-        model_extra = (r.get("model_extra", "") or "").strip()
-        
-        shop_url = (r.get("Shop_url", "") or "").strip()
+    return {
+        fn: hashlib.sha1(json.dumps(p, ensure_ascii=False).encode("utf-8")).hexdigest()
+        for fn, p in parts.items()
+    }
 
-        aircraft_id = (r.get("aircraft_id", "") or "").strip()
-        
-        # Wingtip (aus passenger_aircraft_full.csv) – robust initialisieren
-        wingtip = ""
-        has_wingtip = False
 
-        aircraft_full = pax_idx.get(aircraft_id) if aircraft_id else None
-        if aircraft_full:
-            wingtip = (aircraft_full.get("Wingtip", "") or "").strip().upper()
-            has_wingtip = (wingtip != "" and wingtip != "NONE")
+def remove_vanished_model_jsons(previous: Dict[str, str], current: Dict[str, str]) -> None:
+    """Löscht nur Modell-JSONs, deren ID seit dem letzten Build verschwunden ist."""
+    removed = 0
+    for fn in previous:
+        if fn in current:
+            continue
+        path = os.path.join(OUT_DIR, fn)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    utils_metrics.count("files_removed", removed)
+    print(f"[build_json] cleanup model jsons: removed={removed}")
+
 
-        aircraft_type = (r.get("aircraft_type", "") or "").strip()
-        registration = (r.get("registration", "") or "").strip()
+def parse_postcards_raw(model_id: str, postcards_raw: str, postcard_price: Optional[float]) -> List[Dict[str, Any]]:
+    """
+    postcards_raw ('I:Label|U:https://...|P:1,35||I:...') -> Postkarten-Liste.
+    Ohne P: bei genau einer Karte gilt Preis_Postkarte (postcard_price).
+    """
+    postcards: List[Dict[str, Any]] = []
+    cards = [c.strip() for c in postcards_raw.split("||") if c.strip()]
+    for idx, card in enumerate(cards, start=1):
+        label = ""
+        url = ""
+        pc_price = None
 
-        livery = normalize_livery_code(r.get("livery", ""))
-        parent_livery = normalize_livery_code(r.get("parent_livery", ""))
+        parts = [p.strip() for p in card.split("|") if p.strip()]
 
-        zusatzinfo = (r.get("Zusatzinfo", "") or "").strip()
-        special_note = (r.get("special_note", "") or "").strip()
+        for p in parts:
+            pp = p.strip()
 
-        shop = (r.get("Shop", "") or "").strip()
-        price = to_float(r.get("Preis", ""))
-        shipping = to_float(r.get("Versandkosten", ""))
-        eigenfluege = to_bool_x(r.get("Eigenfluege", ""))
+            if len(pp) >= 2 and pp[:2].upper() == "I:":
+                label = pp[2:].strip()
 
-        postcards_raw = (r.get("postcards_raw", "") or "").strip()
+            elif len(pp) >= 2 and pp[:2].upper() == "U:":
+                url = pp[2:].strip()
 
-        # legacy fallback
-        postcard_info = (r.get("postkarte_info", "") or "").strip()
-        postcard_url = (r.get("postkarte_url", "") or "").strip()
-        postcard_price = to_float(r.get("Preis_Postkarte", ""))
+            elif len(pp) >= 2 and pp[:2].upper() == "P:":
+                pc_price = parse_price(pp[2:].strip())
 
-        postcards: List[Dict[str, Any]] = []
-        postcard_price_total = 0.0
-        
-        def parse_price(val: str) -> float | None:
-            if not val:
-                return None
-            val = val.replace(",", ".").strip()
-            try:
-                return float(val)
-            except:
-                return None
-        
-        if postcards_raw:
-            cards = [c.strip() for c in postcards_raw.split("||") if c.strip()]
-            for idx, card in enumerate(cards, start=1):
-                label = ""
-                url = ""
-                pc_price = None
-        
-                parts = [p.strip() for p in card.split("|") if p.strip()]
-                
-                for p in parts:
-                    pp = p.strip()
-                
-                    if len(pp) >= 2 and pp[:2].upper() == "I:":
-                        label = pp[2:].strip()
-                
-                    elif len(pp) >= 2 and pp[:2].upper() == "U:":
-                        url = pp[2:].strip()
-                
-                    elif len(pp) >= 2 and pp[:2].upper() == "P:":
-                        pc_price = parse_price(pp[2:].strip())
-
-                if pc_price is None and len(cards) == 1 and postcard_price not in (None, 0.0):
-                    pc_price = postcard_price                
-        
-                if pc_price:
-                    postcard_price_total += pc_price
-        
-                postcards.append({
-                    "id": f"PC-{model_id}-{idx:02d}",
-                    "label": label,
-                    "url": url,
-                    "price": pc_price
-                })
-        
-        # fallback wenn kein postcards_raw vorhanden
-        elif postcard_info or postcard_url or postcard_price:
-            price_obj = postcard_price if postcard_price not in (None, 0.0) else None
-        
-            postcards.append({
-                "id": f"PC-{model_id}-01",
-                "label": postcard_info,
-                "url": postcard_url,
-                "price": price_obj
-            })
-   
-        photo = (r.get("Foto", "") or "").strip()
+        if pc_price is None and len(cards) == 1 and postcard_price not in (None, 0.0):
+            pc_price = postcard_price
 
-        # Aircraft photo (new structured columns)
-        photo_source_url = (r.get("Photo_Source_Url", "") or "").strip()
-        photo_image_url  = (r.get("Photo_Image_Url", "") or "").strip()
-        photo_credit     = (r.get("Photo_Credit", "") or "").strip()
-        # photo_thumb_url = derive_thumb_url(photo_image_url)
-        
-        # Transitional fallback: if Photo_Source_Url empty, use legacy "Foto"
-        photo_legacy = (r.get("Foto", "") or "").strip()
-        if not photo_source_url and photo_legacy:
-            photo_source_url = photo_legacy
-    
-        logo_id = (r.get("logo_id", "") or "").strip()
-        logo_row = logos_idx.get(logo_id) if logo_id else None
-        
-        logo_link = (logo_row.get("Logo_Link", "") or "").strip() if logo_row else ""
-        logo_name = (logo_row.get("full_name", "") or "").strip() if logo_row else ""
-        logo_airline = (logo_row.get("Airline", "") or "").strip() if logo_row else ""
-        logo_speaking = (logo_row.get("logo_speaking", "") or "").strip() if logo_row else ""
-        
-        angekommen_raw = (r.get("angekommen", "") or "").strip()
-        angekommen_iso = excel_serial_to_iso(angekommen_raw)
-        
-        bestellt_raw = (r.get("bestellt_am", "") or "").strip()
-        bestellt_iso = excel_serial_to_iso(bestellt_raw)
+        postcards.append({
+            "id": f"PC-{model_id}-{idx:02d}",
+            "label": label,
+            "url": url,
+            "price": pc_price
+        })
+    return postcards
+
+
+# =========================
+# index.json-Shards
+# =========================
+def index_shard_filename(airline_code: str) -> str:
+    return (safe_filename(airline_code) or "_none") + ".json"
+
+
+def write_index_shard(airline_code: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Schreibt data/index/<airline_code>.json, liefert den Manifest-Eintrag."""
+    fn = index_shard_filename(airline_code)
+    path = os.path.join(INDEX_SHARDS_DIR, fn)
+    # ohne generated_at (steht im Manifest): gleiche Einträge -> gleiche Bytes,
+    # Größe/Hash im Manifest ändern sich also nur mit dem Inhalt
+    data = dump_json({
+        "airline_code": airline_code,
+        "count": len(items),
+        "items": items,
+    })
+    write_bytes_if_changed(path, data)
+    return {
+        "file": f"data/index/{fn}",
+        "count": len(items),
+        "bytes": len(data),
+        "sha1": hashlib.sha1(data).hexdigest(),
+    }
 
-        wunsch_raw = (r.get("Wunsch", "") or "").strip()
-        wishlist = to_bool_x(wunsch_raw) is True
 
-        wunsch_prio_raw = (r.get("Wunsch_Prio", "") or "").strip()
-        wishlist_prio = int(wunsch_prio_raw) if wunsch_prio_raw.isdigit() else None
-        
-        vorhanden_raw = (r.get("vorhanden", "") or "").strip().lower()
-        present_flag = (vorhanden_raw in ("wahr", "true", "1", "x", "ja", "yes"))
-        
-        # present: entweder Flag ODER angekommen-Datum
-        present = present_flag or bool(angekommen_iso)
-        
-        # ordered: bestellt_am vorhanden, aber NICHT present
-        ordered = bool(bestellt_iso) and not present
-        
-        # wishlist nur wenn weder present noch ordered
-        wishlist = wishlist and not present and not ordered
-        
-        # finaler Status
-        if present:
-            status = "owned"
-        elif ordered:
-            status = "ordered"
-        elif wishlist:
-            status = "wishlist"
-        else:
-            status = "none"
-
-        source_sheet = (r.get("source_sheet", "") or "").strip()
-        source_row = (r.get("source_row", "") or "").strip()
-
-        # Scale precedence:
-        # 1) explicit CSV column "scale" (falls du sie später exportierst)
-        # 2) parse from special_note (Sondermodell; z.B. '1:350)
-        # 3) default 1:400
-        scale_csv = (r.get("scale", "") or "").strip()
-        if scale_csv.startswith("'"):
-            scale_csv = scale_csv[1:].strip()
-        scale_text = parse_scale_from_text(special_note)
-        scale_final = scale_csv or scale_text or "1:400"
-
-        # Enrichment: passenger_aircraft_full by aircraft_id
-        aircraft_full = pax_idx.get(aircraft_id) if aircraft_id else None
-
-        # Enrichment: liveries by livery code (if possible)
-        livery_full = liv_idx.get(livery) if livery and livery in liv_idx else None
-
-        out: Dict[str, Any] = {
-            "model_id": model_id,
-            "airline_code": airline_code,
-            "airline": airline,
-            "airline_row": airline_row,
-            "manufacturer": manufacturer,
-            "aircraft_name": aircraft_name,
-            "livery_note": livery_note,
-            "extra_info": extra_info,
-            "shop_url": shop_url,
+def write_index_shards_manifest(shards: Dict[str, Dict[str, Any]], count: int) -> None:
+    keep = {os.path.basename(s["file"]) for s in shards.values()}
+    removed = 0
+    for fn in os.listdir(INDEX_SHARDS_DIR):
+        if fn.endswith(".json") and fn != os.path.basename(INDEX_SHARDS_MANIFEST_JSON) and fn not in keep:
+            os.remove(os.path.join(INDEX_SHARDS_DIR, fn))
+            removed += 1
+    utils_metrics.count("files_removed", removed)
+
+    write_json(INDEX_SHARDS_MANIFEST_JSON, {
+        "generated_at": now_local_iso(),
+        "version": INDEX_SHARDS_VERSION,
+        "count": count,
+        "bytes": sum(s["bytes"] for s in shards.values()),
+        "shards": shards,
+    }, volatile=VOLATILE_KEYS)
+    print(f"[build_json] index shards: {len(shards)} (removed={removed}) -> {INDEX_SHARDS_MANIFEST_JSON}")
+
+
+# =========================
+# Abgeleitete Werte einer Modellzeile (Modell-JSON und index.json gemeinsam)
+# =========================
+def model_wingtip(aircraft_full) -> Tuple[str, bool]:
+    """Wingtip aus passenger_aircraft_full.csv -> (Code, has_wingtip)."""
+    if not aircraft_full:
+        return "", False
+    wingtip = aircraft_full.get("Wingtip").upper()
+    return wingtip, (wingtip != "" and wingtip != "NONE")
+
+
+def model_photo(r) -> Tuple[str, str, str]:
+    """(photo_source_url, photo_image_url, photo_credit)"""
+    # Transitional fallback: if Photo_Source_Url empty, use legacy "Foto"
+    return (r.get("Photo_Source_Url") or r.get("Foto")), r.get("Photo_Image_Url"), r.get("Photo_Credit")
+
+
+def model_scale(r) -> str:
+    """
+    Scale precedence:
+    1) explicit CSV column "scale" (falls du sie später exportierst)
+    2) parse from special_note (Sondermodell; z.B. '1:350)
+    3) default 1:400
+    """
+    scale_csv = r.get("scale")  # optionale Spalte
+    if scale_csv.startswith("'"):
+        scale_csv = scale_csv[1:].strip()
+    return scale_csv or parse_scale_from_text(r.get("special_note")) or "1:400"
+
+
+def model_prices(r) -> Tuple[Optional[float], Optional[float]]:
+    """(price, shipping_allocated)"""
+    return to_float(r.get("Preis")), to_float(r.get("Versandkosten"))
+
+
+def model_status(r) -> Tuple[str, str, bool, bool, bool, str, Optional[int]]:
+    """(arrived, ordered_at, present, ordered, wishlist, status, wishlist_prio)"""
+    angekommen_iso = excel_serial_to_iso(r.get("angekommen"))
+    bestellt_iso = excel_serial_to_iso(r.get("bestellt_am"))
+    wishlist = to_bool_x(r.get("Wunsch")) is True
+    wunsch_prio_raw = r.get("Wunsch_Prio")
+    wishlist_prio = int(wunsch_prio_raw) if wunsch_prio_raw.isdigit() else None
+    present, ordered, wishlist, status = resolve_status(r, angekommen_iso, bestellt_iso, wishlist)
+    return angekommen_iso, bestellt_iso, present, ordered, wishlist, status, wishlist_prio
+
+
+def model_refs(ds: Dataset, r) -> Tuple[Any, str, Any, Any]:
+    """Stammdaten zur Zeile: (aircraft_full, Livery-Code, livery_full, logo_row)."""
+    aircraft_id = r.get("aircraft_id")
+    aircraft_full = ds.pax_by_id.get(aircraft_id) if aircraft_id else None
+    livery = normalize_livery_code(r.get("livery"))
+    # In liveries kann der Schlüssel unterschiedlich heißen (siehe utils_dataset)
+    livery_full = ds.liveries_by_code.get(livery) if livery else None
+    logo_id = r.get("logo_id")
+    logo_row = ds.logos_by_id.get(logo_id) if logo_id else None
+    return aircraft_full, livery, livery_full, logo_row
+
+
+def build_model_record(ds: Dataset, r) -> Dict[str, Any]:
+    """
+    Eine Zeile aus models_export.csv -> Modell-JSON (docs/data/models/<id>.json).
+    Den Eintrag für index.json baut build_index_entry.
+    """
+    model_id = r.model_id
+
+    airline_code = r.get("airline_code")
+    airline = r.get("airline")
+    airline_row = r.get("airline_row")
+    manufacturer = r.get("manufacturer")
+
+    aircraft_name = r.get("aircraft_name")
+    livery_note = r.get("livery_note")
+    extra_info = r.get("extra_info")
+    model_extra = r.get("model_extra")
+
+    shop_url = r.get("Shop_url")
+
+    aircraft_id = r.get("aircraft_id")
+    aircraft_full, livery, livery_full, logo_row = model_refs(ds, r)
+    wingtip, has_wingtip = model_wingtip(aircraft_full)
+
+    aircraft_type = r.get("aircraft_type")
+    registration = r.get("registration")
+
+    parent_livery = normalize_livery_code(r.get("parent_livery"))
+
+    zusatzinfo = r.get("Zusatzinfo")
+    special_note = r.get("special_note")
+
+    shop = r.get("Shop")
+    price, shipping = model_prices(r)
+    eigenfluege = to_bool_x(r.get("Eigenfluege"))
+
+    postcards_raw = r.get("postcards_raw")
+
+    # legacy fallback
+    postcard_info = r.get("postkarte_info")
+    postcard_url = r.get("postkarte_url")
+    postcard_price = to_float(r.get("Preis_Postkarte"))
+
+    postcards: List[Dict[str, Any]] = []
+
+    if postcards_raw:
+        postcards = parse_postcards_raw(model_id, postcards_raw, postcard_price)
+
+    # fallback wenn kein postcards_raw vorhanden
+    elif postcard_info or postcard_url or postcard_price:
+        price_obj = postcard_price if postcard_price not in (None, 0.0) else None
+    
+        postcards.append({
+            "id": f"PC-{model_id}-01",
+            "label": postcard_info,
+            "url": postcard_url,
+            "price": price_obj
+        })
+   
+    photo = r.get("Foto")
+    photo_source_url, photo_image_url, photo_credit = model_photo(r)
+    # photo_thumb_url = derive_thumb_url(photo_image_url)
+
+    logo_id = r.get("logo_id")
+    logo_link = logo_row.get("Logo_Link") if logo_row else ""
+    logo_name = logo_row.get("full_name") if logo_row else ""
+    logo_airline = logo_row.get("Airline") if logo_row else ""
+    logo_speaking = logo_row.get("logo_speaking") if logo_row else ""
+
+    angekommen_raw = r.get("angekommen")
+    angekommen_iso, bestellt_iso, present, ordered, wishlist, status, wishlist_prio = model_status(r)
+
+    source_sheet = r.get("source_sheet")
+    source_row = r.get("source_row")
+
+    scale_final = model_scale(r)
+
+    out: Dict[str, Any] = {
+        "model_id": model_id,
+        "airline_code": airline_code,
+        "airline": airline,
+        "airline_row": airline_row,
+        "manufacturer": manufacturer,
+        "aircraft_name": aircraft_name,
+        "livery_note": livery_note,
+        "extra_info": extra_info,
+        "shop_url": shop_url,
+        "aircraft_id": aircraft_id,
+        "aircraft_type": aircraft_type,
+        "registration": registration,
+        "livery_name": livery,
+        "parent_livery": parent_livery,
+        "zusatzinfo": zusatzinfo,
+        "model_extra": model_extra,
+        "special_note": special_note,
+        "shop": shop,
+        "price": price,
+        "shipping_allocated": shipping,
+        "flown": eigenfluege,
+        "postcards_raw": postcards_raw,
+        "postcard_info": postcard_info,
+        "postcard_url": postcard_url,
+        "postcard_price": postcard_price,
+        "postcards": postcards,
+        "photo": photo,
+        "photo_source_url": photo_source_url,
+        "photo_image_url": photo_image_url,
+        # "photo_thumb_url": photo_thumb_url,
+        "photo_credit": photo_credit,
+        "arrived_excel": angekommen_raw,            
+        "arrived_excel": angekommen_raw,
+        "arrived": angekommen_iso,
+        "ordered_at": bestellt_iso,
+        "ordered": ordered,
+        "wishlist": wishlist,
+        "wishlist_prio": wishlist_prio,
+        "status": status,
+        "source": {"sheet": source_sheet, "row": source_row},
+        "aircraft": {
             "aircraft_id": aircraft_id,
-            "aircraft_type": aircraft_type,
+            "type": aircraft_type,
             "registration": registration,
-            "livery_name": livery,
-            "parent_livery": parent_livery,
-            "zusatzinfo": zusatzinfo,
-            "model_extra": model_extra,
-            "special_note": special_note,
+            "wingtip": wingtip,
+            "has_wingtip": has_wingtip,                
+        },
+        "livery": {
+            "code": livery,
+            "parent": parent_livery,
+            "notes_raw": zusatzinfo,
+            "note": livery_note,
+        },
+        "model": {
+            "scale": scale_final,
+            "manufacturer": manufacturer,
+            "model_number": r.get("model_number"),
             "shop": shop,
             "price": price,
             "shipping_allocated": shipping,
-            "flown": eigenfluege,
-            "postcards_raw": postcards_raw,
-            "postcard_info": postcard_info,
-            "postcard_url": postcard_url,
-            "postcard_price": postcard_price,
-            "postcards": postcards,
-            "photo": photo,
-            "photo_source_url": photo_source_url,
-            "photo_image_url": photo_image_url,
-            # "photo_thumb_url": photo_thumb_url,
-            "photo_credit": photo_credit,
-            "arrived_excel": angekommen_raw,            
-            "arrived_excel": angekommen_raw,
             "arrived": angekommen_iso,
             "ordered_at": bestellt_iso,
             "ordered": ordered,
+            "present": present,
             "wishlist": wishlist,
             "wishlist_prio": wishlist_prio,
             "status": status,
-            "source": {"sheet": source_sheet, "row": source_row},
-            "aircraft": {
-                "aircraft_id": aircraft_id,
-                "type": aircraft_type,
-                "registration": registration,
-                "wingtip": wingtip,
-                "has_wingtip": has_wingtip,                
-            },
-            "livery": {
-                "code": livery,
-                "parent": parent_livery,
-                "notes_raw": zusatzinfo,
-                "note": livery_note,
-            },
-            "model": {
-                "scale": scale_final,
-                "manufacturer": manufacturer,
-                "model_number": (r.get("model_number", "") or "").strip(),
-                "shop": shop,
-                "price": price,
-                "shipping_allocated": shipping,
-                "arrived": angekommen_iso,
-                "ordered_at": bestellt_iso,
-                "ordered": ordered,
-                "present": present,
-                "wishlist": wishlist,
-                "wishlist_prio": wishlist_prio,
-                "status": status,
-                "flown": eigenfluege,
-                "special_note": special_note,
-                "model_extra": model_extra,
-            },
-            "links": {
-                "postcards_raw": postcards_raw,                
-                "postcard_url": postcard_url,
-                "photo": photo,
-                "shop": shop,
-                "shop_url": shop_url,
-            },
+            "flown": eigenfluege,
+            "special_note": special_note,
+            "model_extra": model_extra,
+        },
+        "links": {
+            "postcards_raw": postcards_raw,                
+            "postcard_url": postcard_url,
+            "photo": photo,
+            "shop": shop,
+            "shop_url": shop_url,
+        },
+    }
+
+    # Logo-Infos (airline_logos.csv)
+    if logo_id or logo_link:
+        out["logo"] = {
+            "id": logo_id,
+            "link": logo_link,
+            "name": logo_name,
+            "airline": logo_airline,
+            "logo_speaking": logo_speaking,
         }
+        
+    # ungestrippte Originalzeilen wie in der CSV
+    if aircraft_full:
+        out["aircraft_full_v8"] = ds.pax_raw_by_id[aircraft_id]
 
-        # Logo-Infos (airline_logos.csv)
-        if logo_id or logo_link:
-            out["logo"] = {
-                "id": logo_id,
-                "link": logo_link,
-                "name": logo_name,
-                "airline": logo_airline,
-                "logo_speaking": logo_speaking,
-            }
-            
-        if aircraft_full:
-            out["aircraft_full_v8"] = aircraft_full
+    if livery_full:
+        out["livery_full"] = ds.liveries_raw_by_code[livery]
 
-        if livery_full:
-            out["livery_full"] = livery_full
+    return out
 
-        fn = safe_filename(model_id) + ".json"
-        with open(os.path.join(OUT_DIR, fn), "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
-
-        livery_pretty = ""
-        if livery_full:
-            livery_pretty = (livery_full.get("Livery_Name", "") or "").strip()
-        wingtip = ""
-        has_wingtip = False
-        if aircraft_full:
-            wingtip = (aircraft_full.get("Wingtip", "") or "").strip().upper()
-            has_wingtip = (wingtip != "" and wingtip != "NONE")
-            
-        
-        index_list.append({
-            "model_id": model_id,
-            "airline_code": airline_code,
-            "airline": airline,
-            "airline_row": (r.get("airline_row", "") or "").strip(),
+
+def build_index_entry(ds: Dataset, r) -> Dict[str, Any]:
+    """
+    Eine Zeile aus models_export.csv -> Eintrag für index.json (und die
+    Airline-Shards). Rechnet nur die Felder des Eintrags, nicht das ganze
+    Modell-JSON; abgeleitete Werte über dieselben model_*-Helfer wie
+    build_model_record.
+    """
+    model_id = r.model_id
+    airline_code = r.get("airline_code")
+    airline = r.get("airline")
+    aircraft_id = r.get("aircraft_id")
+    aircraft_type = r.get("aircraft_type")
+    registration = r.get("registration")
+
+    aircraft_full, livery, livery_full, logo_row = model_refs(ds, r)
+    wingtip, has_wingtip = model_wingtip(aircraft_full)
+    livery_pretty = livery_full.get("Livery_Name") if livery_full else ""
+
+    price, shipping = model_prices(r)
+    eigenfluege = to_bool_x(r.get("Eigenfluege"))
+    photo_source_url, photo_image_url, photo_credit = model_photo(r)
+
+    logo_id = r.get("logo_id")
+    logo_speaking = logo_row.get("logo_speaking") if logo_row else ""
+
+    angekommen_iso, bestellt_iso, present, ordered, wishlist, status, wishlist_prio = model_status(r)
+    scale_final = model_scale(r)
+
+    entry = {
+        "model_id": model_id,
+        "airline_code": airline_code,
+        "airline": airline,
+        "airline_row": r.get("airline_row"),
+    
+        "aircraft_id": aircraft_id,
+        "aircraft_type": aircraft_type,
+        "registration": registration,
+    
+        "manufacturer": r.get("manufacturer"),
+        "aircraft_name": r.get("aircraft_name"),
+        "livery_note": r.get("livery_note"),
+        "extra_info": r.get("extra_info"),
         
-            "aircraft_id": aircraft_id,
-            "aircraft_type": aircraft_type,
-            "registration": registration,
+        "wingtip": wingtip,
+        "has_wingtip": has_wingtip,
+  
+        "livery_name": livery,                      # Code behalten (für Debug/Referenz)
+        "livery_display": livery_pretty or livery,   # Anzeige
+        "arrived": angekommen_iso,
+        "scale": scale_final,
+        "flown": eigenfluege,
+        "logo_id": logo_id,
+        "logo_speaking": logo_speaking,
+    
+        "shop": r.get("Shop"),
+        "shop_url": r.get("Shop_url"),
+        "ordered_at": bestellt_iso,
+        "ordered": ordered,
+        "present": present,
+        "wishlist": wishlist,
+        "wishlist_prio": wishlist_prio,
+        "status": status,
+
+        "photo_image_url": photo_image_url,
+        "photo_source_url": photo_source_url,
+        "photo_credit": photo_credit,
         
-            "manufacturer": (r.get("manufacturer", "") or "").strip(),
-            "aircraft_name": (r.get("aircraft_name", "") or "").strip(),
-            "livery_note": (r.get("livery_note", "") or "").strip(),
-            "extra_info": (r.get("extra_info", "") or "").strip(),
-            
-            "wingtip": wingtip,
-            "has_wingtip": has_wingtip,
-      
-            "livery_name": livery,                      # Code behalten (für Debug/Referenz)
-            "livery_display": livery_pretty or livery,   # Anzeige
-            "arrived": angekommen_iso,
-            "scale": scale_final,
-            "flown": eigenfluege,
-            "logo_id": logo_id,
-            "logo_speaking": logo_speaking,
+        # Optionale technische Felder für models_overview
+        "role": (aircraft_full.get("Role") if aircraft_full else ""),
+        "fuselage": (aircraft_full.get("Rumpf") if aircraft_full else ""),
+        "market_segment": (aircraft_full.get("MarketSegment") if aircraft_full else ""),
+        "aircraft_kind": (aircraft_full.get("Flugzeugtyp") if aircraft_full else ""),
+        "aircraft_status": (aircraft_full.get("Status") if aircraft_full else ""),
+        "first_flight": (aircraft_full.get("Erstflug") if aircraft_full else ""),
+        "propulsion": (aircraft_full.get("Antrieb") if aircraft_full else ""),
+        "engines": (aircraft_full.get("Triebwerke") if aircraft_full else ""),
+        "range_class": (aircraft_full.get("Reichweite") if aircraft_full else ""),
+        "passengers": (aircraft_full.get("Passengers") if aircraft_full else ""),
+        "length_m": (aircraft_full.get("Length") if aircraft_full else ""),
+        "wingspan_m": (aircraft_full.get("Wingspan") if aircraft_full else ""),
+        "height_m": (aircraft_full.get("Height") if aircraft_full else ""),
         
-            "shop": (r.get("Shop", "") if r else "").strip(),
-            "shop_url": (r.get("Shop_url", "") or "").strip(),
-            "ordered_at": bestellt_iso,
-            "ordered": ordered,
-            "present": present,
-            "wishlist": wishlist,
-            "wishlist_prio": wishlist_prio,
-            "status": status,
+        # zusätliches optionale Felder für airlines_overview
+        "price": price,
+        "shipping_allocated": shipping,
+    }
 
-            "photo_image_url": photo_image_url,
-            "photo_source_url": photo_source_url,
-            "photo_credit": photo_credit,
-            
-            # Optionale technische Felder für models_overview
-            "role": (aircraft_full.get("Role", "") if aircraft_full else "").strip(),
-            "fuselage": (aircraft_full.get("Rumpf", "") if aircraft_full else "").strip(),
-            "market_segment": (aircraft_full.get("MarketSegment", "") if aircraft_full else "").strip(),
-            "aircraft_kind": (aircraft_full.get("Flugzeugtyp", "") if aircraft_full else "").strip(),
-            "aircraft_status": (aircraft_full.get("Status", "") if aircraft_full else "").strip(),
-            "first_flight": (aircraft_full.get("Erstflug", "") if aircraft_full else "").strip(),
-            "propulsion": (aircraft_full.get("Antrieb", "") if aircraft_full else "").strip(),
-            "engines": (aircraft_full.get("Triebwerke", "") if aircraft_full else "").strip(),
-            "range_class": (aircraft_full.get("Reichweite", "") if aircraft_full else "").strip(),
-            "passengers": (aircraft_full.get("Passengers", "") if aircraft_full else "").strip(),
-            "length_m": (aircraft_full.get("Length", "") if aircraft_full else "").strip(),
-            "wingspan_m": (aircraft_full.get("Wingspan", "") if aircraft_full else "").strip(),
-            "height_m": (aircraft_full.get("Height", "") if aircraft_full else "").strip(),
-            
-            # zusätliches optionale Felder für airlines_overview
-            "price": price,
-            "shipping_allocated": shipping,
-        })
+    return entry
+
+
+def main(ds: Optional[Dataset] = None) -> int:
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    if ds is None:
+        ds = get_dataset()
+
+    utils_metrics.phase("load_models")
+    models = ds.models
+
+    utils_metrics.phase("fingerprints")
+    generator = generator_fingerprint(models.header)
+    previous = load_manifest(generator)
+    fingerprints = model_fingerprints(ds)
+
+    if previous:
+        # Nur verschwundene IDs löschen, unveränderte Dateien bleiben liegen
+        remove_vanished_model_jsons(previous, fingerprints)
+    else:
+        # Alte Modell-JSONs entfernen, damit umbenannte IDs keine verwaisten Dateien hinterlassen
+        clean_generated_model_jsons()
+
+    dirty = {
+        fn for fn, fp in fingerprints.items()
+        if previous.get(fn) != fp or not os.path.isfile(os.path.join(OUT_DIR, fn))
+    }
+    print(f"[build_json] model jsons: changed={len(dirty)} unchanged={len(fingerprints) - len(dirty)}")
+    utils_metrics.phase("load_flights")
+    pax_rows = ds.pax
+    flights_rows = ds.flights
+
+    utils_metrics.phase("models")
+    # Modell-JSONs: Aufbereitung hier im Loop, Schreiben über den Threadpool.
+    # Mit JSON_WORKERS>1 wird nach dem Loop im Prozesspool serialisiert.
+    writer = ParallelWriter()
+    serialize_later = json_workers() > 1
+    # optional zusätzlich alles in einer Datei mit Offset-Index (utils_bundle)
+    bundle = utils_bundle.BundleWriter(generator, rebuild=not previous) if utils_bundle.ENABLED else None
+    pending_models: List[Any] = []
+
+    # index.json wird nicht als Liste gesammelt: hier nur Sortierschlüssel,
+    # die Einträge (build_index_entry) entstehen beim Schreiben in sortierter Reihenfolge.
+    sort_keys: List[Tuple[str, str, int]] = []
+    counts: Dict[str, int] = {}
+
+    for pos, r in enumerate(models):
+        model_id = r.model_id
+        if not model_id:
+            continue
+
+        out = build_model_record(ds, r)
+
+        fn = safe_filename(model_id) + ".json"
+        if fn in dirty:
+            if serialize_later:
+                pending_models.append((os.path.join(OUT_DIR, fn), out))
+            else:
+                writer.submit(os.path.join(OUT_DIR, fn), dump_json(out))
+        if bundle is not None and bundle.needs(fn[:-5], fn in dirty):
+            bundle.add(fn[:-5], out)
+
+        airline_code = r.get("airline_code")
+        sort_keys.append((airline_code or "", model_id, pos))
         counts[airline_code] = counts.get(airline_code, 0) + 1
 
+    if pending_models:
+        blobs = serialize_many([o for _, o in pending_models])
+        for (path, _), data in zip(pending_models, blobs):
+            writer.submit(path, data)
+    writer.close()
+    print(f"[build_json] model jsons written={writer.written} identical={writer.unchanged} threads={writer.threads}")
+    if bundle is not None:
+        b = bundle.close(fn[:-5] for fn in fingerprints)
+        print(
+            f"[build_json] model bundle: records={b['records']} added={b['added']} "
+            f"bytes={b['bytes']}{' (rewritten)' if b['compacted'] else ''}"
+        )
+    else:
+        utils_bundle.remove_bundle()
+
+    # erst nach dem Schreiben aller Dateien, sonst fehlen sie beim nächsten Lauf
+    write_manifest(generator, fingerprints)
+
+    utils_metrics.phase("index")
+    # pos als letzter Schlüssel = stabile Sortierung wie bisher mit sorted()
+    sort_keys.sort()
+
+    # pro airline_code: Einträge einmal bauen, als Shard schreiben und in index.json streamen
+    # (im Speicher liegt immer nur eine Airline)
+    os.makedirs(INDEX_SHARDS_DIR, exist_ok=True)
+    shards: Dict[str, Dict[str, Any]] = {}
+
+    def iter_index_items() -> Iterator[Dict[str, Any]]:
+        for code, keys in groupby(sort_keys, key=lambda k: k[0]):
+            items = [build_index_entry(ds, models[pos]) for _code, _model_id, pos in keys]
+            shards[code] = write_index_shard(code, items)
+            yield from items
+
     index_payload = {
         "generated_at": now_local_iso(),
-        "count": len(index_list),
+        "count": len(sort_keys),
         "counts_by_airline_code": counts,
-        "items": sorted(index_list, key=lambda x: (x.get("airline_code") or "", x.get("model_id") or "")),
+        "items": iter_index_items(),
     }
-    with open(INDEX_JSON, "w", encoding="utf-8") as f:
-        json.dump(index_payload, f, ensure_ascii=False, indent=2)
+    write_json_stream(INDEX_JSON, index_payload, volatile=VOLATILE_KEYS)
+    write_index_shards_manifest(shards, len(sort_keys))
 
     # =========================
     # Flights -> docs/data/flights.json
     # =========================
+    utils_metrics.phase("flights")
     def parse_dt_key(fr: Dict[str, str]) -> str:
-        d = (fr.get("date", "") or "").strip()   # YYYY-MM-DD
-        t = (fr.get("time", "") or "").strip()   # HH:MM (oder leer)
-        if t and len(t) >= 5:
-            return f"{d}T{t[:5]}"
-        return f"{d}T00:00"
+        d = fr.get("date", "")   # YYYY-MM-DD (bereits gestrippt)
+        # time ist im Export ein Excel-Tagesanteil (0,5868...) oder HH:MM
+        t = excel_time_to_hhmm(fr.get("time", ""))
+        return f"{d}T{t or '00:00'}"
+
+    logos_idx = ds.logos_by_id
+    pax_idx = ds.pax_by_id
 
     flights_items = []
     for fr in flights_rows:
-        flight_id = (fr.get("flight_id", "") or "").strip()
+        flight_id = fr.flight_id
         if not flight_id:
             continue
 
-        logo_id = (fr.get("logo_id", "") or "").strip()
-        aircraft_id = (fr.get("aircraft_id", "") or "").strip()
-        reg = (fr.get("registration", "") or "").strip()
+        logo_id = fr.get("logo_id")
+        aircraft_id = fr.get("aircraft_id")
+        reg = fr.get("registration")
 
         logo_row = logos_idx.get(logo_id) if logo_id else None
-        airline_name = ((logo_row.get("Airline", "") if logo_row else "") or "").strip()
+        airline_name = (logo_row.get("Airline") if logo_row else "")
 
         pax_row = pax_idx.get(aircraft_id) if aircraft_id else None
-        typ_anzeige = ((pax_row.get("Typ_anzeige", "") if pax_row else "") or "").strip()
-        hersteller = ((pax_row.get("Hersteller", "") if pax_row else "") or "").strip()
-        wingtip = ((pax_row.get("Wingtip", "") if pax_row else "") or "").strip()
+        typ_anzeige = (pax_row.get("Typ_anzeige") if pax_row else "")
+        hersteller = (pax_row.get("Hersteller") if pax_row else "")
+        wingtip = (pax_row.get("Wingtip") if pax_row else "")
 
         reg_url = f"https://airport-data.com/aircraft/{reg}.html" if reg else ""
 
         flights_items.append({
             "flight_id": flight_id,
-            "date": (fr.get("date", "") or "").strip(),
-            "time": (fr.get("time", "") or "").strip(),
-            "from": (fr.get("from", "") or "").strip(),
-            "to": (fr.get("to", "") or "").strip(),
-            "flight_no": (fr.get("flight_no", "") or "").strip(),
-            "callsign": (fr.get("callsign", "") or "").strip(),
+            "date": fr.get("date"),
+            "time": fr.get("time"),
+            "from": fr.get("from"),
+            "to": fr.get("to"),
+            "flight_no": fr.get("flight_no"),
+            "callsign": fr.get("callsign"),
 
             "logo_id": logo_id,
             "airline_row": airline_name,
@@ -619,10 +756,10 @@ def main() -> int:
             "reg_url": reg_url,
 
             # optional detail fields (für spätere Detailansicht)
-            "travel_class": (fr.get("travel_class", "") or "").strip(),
-            "seat": (fr.get("seat", "") or "").strip(),
-            "notes": (fr.get("notes", "") or "").strip(),
-            "lounge": (fr.get("lounge", "") or "").strip(),
+            "travel_class": fr.get("travel_class"),
+            "seat": fr.get("seat"),
+            "notes": fr.get("notes"),
+            "lounge": fr.get("lounge"),
         })
 
     flights_items.sort(key=lambda x: parse_dt_key(x), reverse=True)
@@ -634,12 +771,13 @@ def main() -> int:
         "items": flights_items,
     }
 
-    with open(OUT_FLIGHTS_JSON, "w", encoding="utf-8") as f:
-        json.dump(flights_payload, f, ensure_ascii=False, indent=2)
+    write_json(OUT_FLIGHTS_JSON, flights_payload, volatile=VOLATILE_KEYS)
+    ds.outputs["flights.json"] = flights_payload
 
     # ------------------------------------------------------------
     # Build aircraft families overview (for model compare modal)
     # ------------------------------------------------------------
+    utils_metrics.phase("families")
     aircraft_status: Dict[str, str] = {}
 
     def is_truthy(val: Any) -> bool:
@@ -647,15 +785,15 @@ def main() -> int:
         return s in ("1", "true", "wahr", "yes", "ja", "x")
 
     for r2 in models:
-        aid = (r2.get("aircraft_id", "") or "").strip()
+        aid = r2.get("aircraft_id")
         if not aid:
             continue
 
-        vorhanden2 = is_truthy(r2.get("vorhanden", ""))
-        bestellt2 = bool((r2.get("bestellt_am", "") or "").strip())
+        vorhanden2 = is_truthy(r2.get("vorhanden"))
+        bestellt2 = bool(r2.get("bestellt_am"))
 
         # optional future field(s)
-        wunsch2 = is_truthy(r2.get("Wunsch", "")) or is_truthy(r2.get("wishlist", ""))
+        wunsch2 = is_truthy(r2.get("Wunsch")) or is_truthy(r2.get("wishlist"))
 
         # priority: vorhanden > bestellt > Wunsch
         new_status = ""
@@ -674,20 +812,20 @@ def main() -> int:
             
     pax_type_by_id: Dict[str, str] = {}
     for pr2 in pax_rows:
-        aid2 = (pr2.get("aircraft_id", "") or "").strip()
-        typ2 = (pr2.get("Typ_anzeige", "") or "").strip()
+        aid2 = pr2.aircraft_id
+        typ2 = pr2.get("Typ_anzeige")
         if aid2 and typ2 and aid2 not in pax_type_by_id:
             pax_type_by_id[aid2] = typ2
             
     families: Dict[str, List[Dict[str, Any]]] = {}
 
     for pr in pax_rows:
-        baureihe = (pr.get("Baureihe", "") or "").strip()
-        aircraft_id_p = (pr.get("aircraft_id", "") or "").strip()
-        typ_anzeige = (pr.get("Typ_anzeige", "") or "").strip()
-        wingtip_p = (pr.get("Wingtip", "") or "").strip().upper()
-        hersteller_p = (pr.get("Hersteller", "") or "").strip()
-        parent_aircraft_id_p = (pr.get("parent_aircraft_id", "") or "").strip()
+        baureihe = pr.get("Baureihe")
+        aircraft_id_p = pr.aircraft_id
+        typ_anzeige = pr.get("Typ_anzeige")
+        wingtip_p = pr.get("Wingtip").upper()
+        hersteller_p = pr.get("Hersteller")
+        parent_aircraft_id_p = pr.get("parent_aircraft_id")
         parent_type_p = pax_type_by_id.get(parent_aircraft_id_p, "")
 
         if not baureihe or not aircraft_id_p or not typ_anzeige:
@@ -698,9 +836,9 @@ def main() -> int:
             "type": typ_anzeige,
             "parent_aircraft_id": parent_aircraft_id_p,
             "parent_type": parent_type_p,
-            "length": to_float(pr.get("Length", "")),
-            "wingspan": to_float(pr.get("Wingspan", "")),
-            "height": to_float(pr.get("Height", "")),
+            "length": to_float(pr.get("Length")),
+            "wingspan": to_float(pr.get("Wingspan")),
+            "height": to_float(pr.get("Height")),
             "wingtip": wingtip_p,
             "status": aircraft_status.get(aircraft_id_p, "missing"),
             "manufacturer": hersteller_p,
@@ -723,14 +861,13 @@ def main() -> int:
         "families": families,
     }
 
-    with open(OUT_AIRCRAFT_FAMILIES_JSON, "w", encoding="utf-8") as f:
-        json.dump(families_out, f, ensure_ascii=False, indent=2)
+    write_json(OUT_AIRCRAFT_FAMILIES_JSON, families_out, volatile=VOLATILE_KEYS)
 
     print("[build_json] wrote index:", INDEX_JSON, "bytes=", os.path.getsize(INDEX_JSON))
     print("[build_json] started:", now_local_iso())
-    print(f"Generated {len(index_list)} JSON files into {OUT_DIR}")
+    print(f"Generated {len(sort_keys)} JSON files into {OUT_DIR}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(utils_metrics.run_stage("build_json", main))
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import html
-import json
 import os
+import sys
 from pathlib import Path
 from typing import Any
 
 import qrcode
 
+import utils_bundle
+import utils_json
+import utils_metrics
+from build_json import safe_filename
+
 
 ROOT = Path(__file__).resolve().parents[1]
 MODELS_DIR = ROOT / "docs" / "data" / "models"
@@ -19,6 +24,9 @@ OUT_CSS = OUT_DIR / "labels.css"
 QR_DIR = ROOT / "docs" / "labels" / "qr"
 
 PUBLIC_BASE_URL = "https://ugnet90.github.io/aircraft-labels/model_public.html?id="
+# statische Seiten aus build_public_pages.py (docs/m/<id>.html): kein JS, ein Request pro Scan
+STATIC_PAGES_BASE_URL = "https://ugnet90.github.io/aircraft-labels/m/"
+STATIC_PAGES = os.environ.get("LABELS_STATIC_PAGES", "").strip() == "1" or "--static-pages" in sys.argv
 
 PAGE_MARGIN_MM = 8
 LABEL_W_MM = 48
@@ -29,7 +37,7 @@ ROW_GAP_MM = 4
 def load_config() -> dict[str, Any]:
     if not CONFIG_PATH.exists():
         raise FileNotFoundError(f"Config-Datei fehlt: {CONFIG_PATH}")
-    return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+    return utils_json.read_json(CONFIG_PATH)
 
 
 def parse_selected_ids(values: list[Any]) -> set[str]:
@@ -63,10 +71,12 @@ def first(*vals: Any) -> str:
 def load_models(mode: str, selected_ids: set[str]) -> list[dict[str, Any]]:
     items: list[dict[str, Any]] = []
 
-    for path in sorted(MODELS_DIR.glob("*.json")):
-        d = json.loads(path.read_text(encoding="utf-8"))
+    # aus docs/data/models/*.json oder dem Bundle (utils_bundle), falls gebaut;
+    # strict: ein kaputtes Modell-JSON bricht ab statt still ein Label zu verlieren
+    for fn, d in utils_bundle.iter_model_jsons(str(MODELS_DIR), strict=True):
+        utils_metrics.count("rows_read")
 
-        model_id = first(d.get("model_id"), path.stem)
+        model_id = first(d.get("model_id"), fn[:-5])
 
         # bestellte / alte Relikte nicht als Label erzeugen
         if model_id.upper().startswith("ORD-"):
@@ -83,7 +93,10 @@ def load_models(mode: str, selected_ids: set[str]) -> list[dict[str, Any]]:
         logo = d.get("logo", {}).get("link")
         flown = d.get("model", {}).get("flown") or d.get("flown")
         
-        url = f"{PUBLIC_BASE_URL}{model_id}"
+        if STATIC_PAGES:
+            url = f"{STATIC_PAGES_BASE_URL}{safe_filename(model_id)}.html"
+        else:
+            url = f"{PUBLIC_BASE_URL}{model_id}"
 
         items.append({
             "model_id": model_id,
@@ -113,6 +126,7 @@ def build_qr(url: str, out: Path) -> None:
     img = qr.make_image(fill_color="black", back_color="white")
     out.parent.mkdir(parents=True, exist_ok=True)
     img.save(out)
+    utils_metrics.count_file_written(str(out))
 
 
 def write_css(
@@ -346,6 +360,7 @@ body {{
   }}
 }}
 """, encoding="utf-8")
+    utils_metrics.count_file_written(str(OUT_CSS))
 
 def label_html(it: dict[str, Any], show_cut_marks: bool, show_logo: bool) -> str:
     cut_html = """
@@ -442,11 +457,13 @@ def write_html(
 """,
         encoding="utf-8",
     )
+    utils_metrics.count_file_written(str(OUT_HTML))
 
 def main() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     QR_DIR.mkdir(parents=True, exist_ok=True)
 
+    utils_metrics.phase("load")
     config = load_config()
 
     template_name = config.get("template", "standard")
@@ -484,12 +501,15 @@ def main() -> None:
     # alte QR-Dateien entfernen
     for old in QR_DIR.glob("*.png"):
         old.unlink()
+        utils_metrics.count("files_removed")
 
     items = load_models(mode, selected_ids)
 
+    utils_metrics.phase("qr")
     for it in items:
         build_qr(it["url"], QR_DIR / f"{it['model_id']}.png")
 
+    utils_metrics.phase("html")
     write_css(
         page_margin_mm=page_margin_mm,
         label_w_mm=label_w_mm,
@@ -518,4 +538,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    utils_metrics.run_stage("build_labels", main)
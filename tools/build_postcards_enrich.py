@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import os
-import re
 import time
+import utils_bundle
+import utils_json
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import write_json
+from utils_convert import norm_space, parse_size_mm, parse_year
 from typing import Any, Dict, List, Tuple, Optional
 from urllib.parse import urlparse, urljoin
 
@@ -53,14 +56,12 @@ IGNORE_LABELS = {
 ALL_DETAIL_LABELS = set(LABEL_MAP.keys()) | set(IGNORE_LABELS)
 
 def load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    d = utils_json.read_json(path)
+    return d
 
 
 def save_json(path: str, obj: Any) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    write_json(path, obj)
 
 def load_postcards_index_by_id() -> dict:
     """
@@ -175,27 +176,6 @@ def is_jjpostcards_url(url: str) -> bool:
         return False
 
 
-def norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
-
-
-def parse_year(val: str) -> Optional[int]:
-    m = re.search(r"\b(19\d{2}|20\d{2})\b", val or "")
-    if not m:
-        return None
-    try:
-        return int(m.group(1))
-    except Exception:
-        return None
-
-
-def parse_size_mm(val: str) -> Optional[Dict[str, int]]:
-    v = norm_space(val)
-    m = re.search(r"(\d{2,3})\s*[x×]\s*(\d{2,3})\s*mm", v, flags=re.IGNORECASE)
-    if not m:
-        return None
-    return {"w": int(m.group(1)), "h": int(m.group(2))}
-
 def extract_artikeldetails_pairs(html: str) -> Dict[str, str]:
     """
     Parse 'Artikeldetails' as line-based label/value pairs.
@@ -272,6 +252,8 @@ def scrape_one(url: str) -> Dict[str, Any]:
         },
     )
     res.raise_for_status()
+    utils_metrics.count("http_requests")
+    utils_metrics.count("http_bytes_read", len(res.content))
 
     soup = BeautifulSoup(res.text, "html.parser")
     pairs = extract_artikeldetails_pairs(res.text)
@@ -309,22 +291,10 @@ def collect_postcards_from_models() -> List[Tuple[str, str, str]]:
     """
     items: List[Tuple[str, str, str]] = []
 
-    if not os.path.isdir(MODELS_DIR):
-        return items
-
-    for fn in os.listdir(MODELS_DIR):
-        if not fn.lower().endswith(".json"):
-            continue
+    for fn, d in utils_bundle.iter_model_jsons(MODELS_DIR):
         if fn in ("index.json", "stats.json", "flights.json", "flight_routes.json", "airports_missing.json", "postcards_enriched.json"):
             continue
 
-        path = os.path.join(MODELS_DIR, fn)
-        try:
-            d = load_json(path)
-            
-        except Exception:
-            continue
-        
         if not isinstance(d, dict):
             print(f"[postcards_enrich] skip non-dict json: {fn}")
             continue
@@ -367,6 +337,7 @@ def load_existing_enriched(path: str) -> dict:
     return {}
 
 def main() -> int:
+    utils_metrics.phase("load")
     existing: Dict[str, Any] = load_existing_enriched(OUT_PATH)
     
     postcards = collect_postcards()  # dict keyed by postcard_id
@@ -388,6 +359,7 @@ def main() -> int:
     
     print(f"[postcards_enrich] found postcards: {len(postcards)} ; existing: {len(existing)} ; to fetch: {len(to_fetch)}")
     
+    utils_metrics.phase("fetch")
     for n, pc_id in enumerate(to_fetch, start=1):
         base = postcards.get(pc_id, {}) if isinstance(postcards, dict) else {}
         model_id = str(base.get("model_id") or "").strip()
@@ -424,10 +396,11 @@ def main() -> int:
 
         time.sleep(SLEEP_SECONDS)
 
+    utils_metrics.phase("write")
     save_json(OUT_PATH, existing)
     print(f"[postcards_enrich] wrote: {OUT_PATH} entries={len(existing)}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(utils_metrics.run_stage("build_postcards_enrich", main))
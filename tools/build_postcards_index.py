@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import os
 from datetime import datetime, timezone
+import utils_bundle
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import VOLATILE_KEYS, write_json
 from typing import Any, Dict, List, Tuple
 
 
@@ -13,15 +15,8 @@ REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELS_DIR = os.path.join(REPO_ROOT, "docs", "data", "models")
 OUT_PATH = os.path.join(REPO_ROOT, "docs", "data", "postcards_index.json")
 
-def load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def save_json(path: str, obj: Any) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    write_json(path, obj, volatile=VOLATILE_KEYS)
 
 
 def norm(s: Any) -> str:
@@ -32,18 +27,8 @@ def collect_from_models() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any
     items: List[Dict[str, Any]] = []
     by_id: Dict[str, Dict[str, Any]] = {}
 
-    if not os.path.isdir(MODELS_DIR):
-        return items, by_id
-
-    for fn in sorted(os.listdir(MODELS_DIR)):
-        if not fn.lower().endswith(".json"):
-            continue
-
-        path = os.path.join(MODELS_DIR, fn)
-        try:
-            d = load_json(path)
-        except Exception:
-            continue
+    for _fn, d in utils_bundle.iter_model_jsons(MODELS_DIR):
+        utils_metrics.count("rows_read")
         if not isinstance(d, dict):
             continue
 
@@ -85,8 +70,10 @@ def collect_from_models() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any
 
 
 def main() -> int:
+    utils_metrics.phase("collect")
     items, by_id = collect_from_models()
 
+    utils_metrics.phase("write")
     out = {
         "generated_at": now_local_iso(),
         "count_total": len(items),
@@ -101,4 +88,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(utils_metrics.run_stage("build_postcards_index", main))
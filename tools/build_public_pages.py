@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statische öffentliche Modellseiten: docs/m/<id>.html, eine fertig
+gerenderte Seite pro Modell mit demselben Inhalt wie
+model_public.html?id=<id> (siehe docs/js/model_public.js), aber ohne
+JavaScript und ohne Nachladen von index.json / Modell-JSON.
+
+- CSS inline: aus css/style.css + css/model-public.css nur die Regeln,
+  deren Klassen/IDs auf der Seite vorkommen (@media-Blöcke entsprechend)
+- Bilder mit Größenangaben (Logo: Höhe, Foto: Seitenverhältnis), damit
+  beim Laden nichts springt; Foto-Klick öffnet die Quelle statt Lightbox
+- Navigation (← / →) über die Modelle derselben Airline wie auf der
+  dynamischen Seite, Ziel sind wieder die statischen Seiten
+
+Dateiname: safe_filename(model_id) wie bei den Modell-JSONs. Die Label-
+QR-Codes zeigen mit build_labels.py --static-pages (bzw.
+LABELS_STATIC_PAGES=1) hierher, ein Scan ist dann ein einziger Request.
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote, urlparse
+
+import utils_bundle
+import utils_json
+import utils_metrics
+from build_json import safe_filename
+from utils_dataset import Dataset
+from utils_output import ParallelWriter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_DIR = os.path.join(REPO_ROOT, "docs")
+INDEX_JSON = os.path.join(DOCS_DIR, "index.json")
+CSS_FILES = (os.path.join(DOCS_DIR, "css", "style.css"), os.path.join(DOCS_DIR, "css", "model-public.css"))
+OUT_DIR = os.path.join(DOCS_DIR, "m")
+
+# Platzhalter-Seitenverhältnis fürs Foto (Originalgröße ist beim Build nicht
+# bekannt); width/height-Attribute reservieren nur die Fläche, die echte
+# Größe kommt weiter aus dem CSS (width:100%; height:auto)
+PHOTO_BOX = (600, 400)
+LOGO_HEIGHT = 46
+
+
+# =========================
+# JS-Semantik (wie in model_public.js)
+# =========================
+JS_NUMBER_RE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+
+def js_str(v: Any) -> str:
+    """String(v ?? "")"""
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float):
+        if v.is_integer() and abs(v) < 1e21:
+            return str(int(v))
+        return repr(v)
+    if isinstance(v, list):
+        return ",".join(js_str(x) for x in v)
+    if isinstance(v, dict):
+        return "[object Object]"
+    return str(v)
+
+
+def as_text(v: Any) -> str:
+    return js_str(v).strip()
+
+
+def js_number(s: str) -> float:
+    """Number(s) für Dezimalzahlen; alles andere -> NaN."""
+    s = s.strip()
+    if not s:
+        return 0.0
+    if s in ("Infinity", "+Infinity", "-Infinity"):
+        return float(s.replace("Infinity", "inf"))
+    return float(s) if JS_NUMBER_RE.match(s) else math.nan
+
+
+def to_fixed(x: float, digits: int) -> str:
+    """Number.prototype.toFixed (Gleichstand rundet auf, wie JS)."""
+    q = Decimal(x).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP)
+    return f"{q:.{digits}f}"
+
+
+def esc(s: Any) -> str:
+    return (
+        js_str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        .replace('"', "&quot;").replace("'", "&#39;")
+    )
+
+
+def encode_uri_component(s: str) -> str:
+    return quote(s, safe="-_.!~*'()")
+
+
+def _get(d: Any, *path: str) -> Any:
+    for k in path:
+        d = d.get(k) if isinstance(d, dict) else None
+    return d
+
+
+def first_truthy(*vals: Any) -> Any:
+    """a || b || ... mit JS-Wahrheitswerten (leere Listen/Objekte sind wahr)."""
+    for v in vals:
+        if v is not None and v is not False and v != "" and v != 0 or isinstance(v, (list, dict)):
+            return v
+    return vals[-1] if vals else None
+
+
+def bool_de(v: Any) -> bool:
+    return as_text(v).lower() in ("wahr", "true", "1", "ja", "yes", "x")
+
+
+def host_from_url(u: Any) -> str:
+    s = as_text(u)
+    p = urlparse(s) if s else None
+    if not p or not p.scheme or not p.netloc:
+        return ""
+    return re.sub(r"^www\.", "", p.hostname or "")
+
+
+def host_label(u: Any) -> str:
+    s = as_text(u)
+    if not s:
+        return ""
+    p = urlparse(s)
+    if not p.scheme:
+        return "Foto"
+    return re.sub(r"^www\.", "", p.hostname or "")
+
+
+def photo_copyright(credit: str, source_url: str, image_url: str) -> str:
+    c = credit.strip()
+    host = host_from_url(source_url) or host_from_url(image_url)
+    if c and host:
+        return f"© {c} / {host}"
+    if c:
+        return f"© {c}"
+    return host
+
+
+def logo_src(d: Dict[str, Any]) -> str:
+    logo = d.get("logo")
+    if not logo:
+        return ""
+    link = js_str(_get(logo, "link")).strip()
+    if re.match(r"^https?://", link, re.I):
+        return link
+    logo_id = js_str(_get(logo, "id")).strip()
+    return f"../assets/logos/{encode_uri_component(logo_id)}.png" if logo_id else ""
+
+
+def format_number_de(v: Any, digits: int = 2) -> str:
+    s = js_str(v).strip()
+    if not s:
+        return ""
+    n = js_number(s.replace(",", ".", 1))
+    if not math.isfinite(n):
+        return s
+    return to_fixed(n, digits).replace(".", ",")
+
+
+def calc_model_size_cm(real_meters: Any, scale: str) -> str:
+    m = js_number(js_str(real_meters).replace(",", ".", 1))
+    if not math.isfinite(m) or not scale:
+        return ""
+    n = js_number(scale.replace("1:", "", 1))
+    if not math.isfinite(n) or n <= 0:
+        return ""
+    return to_fixed(m * 100 / n, 1).replace(".", ",")
+
+
+# =========================
+# Rendern
+# =========================
+def row_html(k: str, v_html: str) -> str:
+    if not v_html:
+        return ""
+    return (
+        f'<div class="kvInlineRow"><span class="kvInlineLabel">{esc(k)}:</span>'
+        f'<span class="kvInlineValue">{v_html}</span></div>'
+    )
+
+
+def row(k: str, v: Any) -> str:
+    if v is None or v == "":
+        return ""
+    return row_html(k, esc(v))
+
+
+def render_v8_groups(obj: Any) -> str:
+    if not isinstance(obj, dict):
+        return ""
+
+    def val(k: str) -> str:
+        return esc(js_str(obj.get(k) or "").strip())
+
+    def translate(v: Any, mapping: Dict[str, str], upper: bool, fallback: Any) -> str:
+        x = js_str(v).strip()
+        return mapping.get(x.upper() if upper else x) or esc(fallback)
+
+    def cell_wiki(url: Any) -> str:
+        u = js_str(url).strip()
+        return f'<a href="{esc(u)}" target="_blank" rel="noopener">Wikipedia</a>' if u else ""
+
+    def meters(k: str) -> str:
+        s = format_number_de(obj.get(k), 2)
+        return f"{s} m" if s else ""
+
+    rumpf = js_str(obj.get("Rumpf")).strip()
+    groups = [
+        ("Typ", [
+            ("Flugzeugtyp", val("Typ_anzeige")),
+            ("Hersteller", val("Hersteller")),
+            ("Baureihe", val("Baureihe")),
+            ("Unterserie", val("Unterserie")),
+            ("ICAO-Typcode", val("ICAO")),
+            ("IATA-Typcode", val("IATA")),
+            ("Wikipedia", cell_wiki(obj.get("Wiki"))),
+        ]),
+        ("Abmessungen", [
+            ("Länge", meters("Length")),
+            ("Spannweite", meters("Wingspan")),
+            ("Höhe", meters("Height")),
+        ]),
+        ("Betrieb", [
+            ("Rolle", translate(obj.get("Role"), {"PAX": "Passagierflugzeug (PAX)", "CARGO": "Frachtflugzeug (Cargo)"}, True, obj.get("Role"))),
+            ("Segment", val("MarketSegment")),
+            ("Rumpf", translate(rumpf, {"SingleAisle": "Schmalrumpf (Single Aisle)", "TwinAisle": "Großraum (Twin Aisle)"}, False, rumpf)),
+            ("Wingtip", translate(obj.get("Wingtip"), {"NONE": "Keine", "SL": "Sharklets", "WL": "Winglets", "RW": "Raked Wingtips"}, True, obj.get("Wingtip"))),
+            ("Erstflug", val("Erstflug")),
+            ("Status", val("Status")),
+            ("Antrieb", val("Antrieb")),
+            ("Triebwerke", val("Triebwerke")),
+            ("Reichweite", val("Reichweite")),
+            ("Passagiere", val("Passengers")),
+        ]),
+    ]
+
+    out = []
+    for title, rows in groups:
+        body = "".join(row_html(label, v) for label, v in rows)
+        if body:
+            out.append(
+                f'<section class="publicGroup"><h3 class="publicGroupTitle">{esc(title)}</h3>'
+                f'<div class="publicGroupGrid">{body}</div></section>'
+            )
+    return "".join(out)
+
+
+def _upper(v: Any) -> str:
+    return js_str(v).strip().upper()
+
+
+class SameAirline:
+    """
+    Navigation je Airline wie loadSameAirlineIndexIds() in model_public.js,
+    aber einmal vorbereitet statt pro Seite über ganz index.json:
+    Einträge einmal normalisiert (mid, code, row, airline), nach Schlüssel
+    in Buckets, pro (code, row, airline) des Modells Ergebnis gemerkt.
+
+    Regeln pro Eintrag (in dieser Reihenfolge, erste passende entscheidet):
+      beide mit code -> code gleich; beide mit row -> row gleich;
+      beide mit airline -> airline gleich; Modell mit code -> mid beginnt
+      mit code; sonst nicht.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.rows: List[Tuple[str, str, str, str]] = []
+        for it in items:
+            mid = js_str(it.get("model_id") if it.get("model_id") is not None else it.get("id")).strip()
+            if mid:
+                self.rows.append((mid, _upper(it.get("airline_code")), _upper(it.get("airline_row")), _upper(it.get("airline"))))
+        self.by_code: Dict[str, List[int]] = {}
+        # Einträge ohne code (für Modelle mit code) bzw. alle (für Modelle ohne code)
+        self.groups = {True: self._buckets(lambda c: not c), False: self._buckets(lambda c: True)}
+        for i, (_mid, code, _row, _airline) in enumerate(self.rows):
+            if code:
+                self.by_code.setdefault(code, []).append(i)
+        self._memo: Dict[Tuple[str, str, str], Tuple[List[str], Dict[str, int]]] = {}
+
+    def _buckets(self, take: Any) -> Dict[str, Any]:
+        b: Dict[str, Any] = {
+            "row": {}, "airline": {}, "airline_norow": {},
+            # Einträge, bei denen nur noch die Präfix-Regel greifen kann
+            "norow_noairline": [], "norow": [], "noairline": [], "all": [],
+        }
+        for i, (_mid, code, row, airline) in enumerate(self.rows):
+            if not take(code):
+                continue
+            b["all"].append(i)
+            if row:
+                b["row"].setdefault(row, []).append(i)
+            else:
+                b["norow"].append(i)
+                if airline:
+                    b["airline_norow"].setdefault(airline, []).append(i)
+                else:
+                    b["norow_noairline"].append(i)
+            if airline:
+                b["airline"].setdefault(airline, []).append(i)
+            else:
+                b["noairline"].append(i)
+        return b
+
+    def _positions(self, code: str, row: str, airline: str) -> List[int]:
+        b = self.groups[bool(code)]
+        hits = list(self.by_code.get(code, ())) if code else []
+        if row:
+            hits += b["row"].get(row, ())
+            if airline:
+                hits += b["airline_norow"].get(airline, ())
+                rest = b["norow_noairline"]
+            else:
+                rest = b["norow"]
+        elif airline:
+            hits += b["airline"].get(airline, ())
+            rest = b["noairline"]
+        else:
+            rest = b["all"]
+        if code:
+            hits += [i for i in rest if self.rows[i][0].upper().startswith(code)]
+        return sorted(hits)
+
+    def ids(self, d: Dict[str, Any]) -> Tuple[List[str], Dict[str, int]]:
+        """(IDs in index.json-Reihenfolge, Position je ID in Großbuchstaben)"""
+        key = (_upper(d.get("airline_code")), _upper(d.get("airline_row")), _upper(d.get("airline")))
+        hit = self._memo.get(key)
+        if hit is None:
+            ids = [self.rows[i][0] for i in self._positions(*key)]
+            pos: Dict[str, int] = {}
+            for n, x in enumerate(ids):
+                pos.setdefault(x.strip().upper(), n)  # wie indexOf: erstes Vorkommen
+            hit = self._memo[key] = (ids, pos)
+        return hit
+
+
+def nav_html(ids: List[str], pos: Dict[str, int], current: str) -> str:
+    i = pos.get(current.strip().upper())
+    if i is None:
+        return ""
+    prev_id = ids[i - 1] if i > 0 else ""
+    next_id = ids[i + 1] if i < len(ids) - 1 else ""
+    if not prev_id and not next_id:
+        return ""
+
+    def btn(target: str, arrow: str, title: str) -> str:
+        if not target:
+            return f'<a class="navBtn disabled" title="{title}">{arrow}</a>'
+        return f'<a class="navBtn " href="{esc(safe_filename(target))}.html" title="{title}">{arrow}</a>'
+
+    return (
+        f'<div class="navWrap">{btn(prev_id, "←", "Vorheriges Modell")}'
+        f'<div class="navPos">{i + 1}/{len(ids)}</div>{btn(next_id, "→", "Nächstes Modell")}</div>'
+    )
+
+
+def render_body(d: Dict[str, Any], page_id: str, nav: str) -> Tuple[str, str]:
+    """(title, Inhalt von <main>)"""
+    airline = as_text(d.get("airline_row")) or as_text(d.get("airline")) or as_text(d.get("airline_code"))
+    typ = as_text(d.get("aircraft_type")) or as_text(_get(d, "aircraft", "type"))
+    reg = as_text(d.get("registration")) or as_text(_get(d, "aircraft", "registration"))
+
+    speaking_raw = (
+        as_text(d.get("logo_speaking")) or as_text(_get(d, "logo", "logo_speaking"))
+        or as_text(_get(d, "logo", "speaking")) or as_text(d.get("logoSpeaking"))
+    )
+    show_airline = not (bool_de(speaking_raw) if speaking_raw else True)
+
+    name = d.get("aircraft_name")
+    title_main = " · ".join(x for x in (typ, reg, f"„{js_str(name)}“" if name else "") if x) or page_id
+    title = f"{airline} · {title_main}" if show_airline and airline else title_main
+
+    logo = logo_src(d)
+    logo_html = (
+        f'<img class="airlineLogo" src="{esc(logo)}" alt="Logo" height="{LOGO_HEIGHT}" decoding="async">'
+        if logo else ""
+    )
+    header = (
+        f'<div class="headerWrap"><div class="headerLeft">{logo_html}<div class="headerTxt">'
+        + (f'<div class="hAir">{esc(airline)}</div>' if show_airline and airline else "")
+        + f'<div class="hTyp">{esc(typ or page_id)}</div><div class="hMeta">'
+        + (f'<span class="hReg">{esc(reg)}</span>' if reg else "")
+        + (f'<span class="hName">„{esc(name)}“</span>' if name else "")
+        + "</div></div></div></div>"
+    )
+
+    photo_source = as_text(d.get("photo_source_url")) or as_text(d.get("photo"))
+    photo_img = as_text(d.get("photo_image_url"))
+    credit = as_text(d.get("photo_credit"))
+    photo_href = photo_source or photo_img
+    copyright_ = photo_copyright(credit, photo_source, photo_img) if credit else ""
+    credit_html = f'<div class="air-credit">{esc(copyright_)}</div>' if copyright_ else ""
+    if photo_img:
+        w, h = PHOTO_BOX
+        photo_html = (
+            f'<div class="air-photo"><a href="{esc(photo_href or photo_img)}" target="_blank" rel="noopener">'
+            f'<img class="air-thumb" src="{esc(photo_img)}" alt="Aircraft photo" width="{w}" height="{h}" '
+            f'loading="lazy" decoding="async" fetchpriority="low"></a>{credit_html}</div>'
+        )
+    elif photo_source:
+        photo_html = (
+            f'<a href="{esc(photo_source)}" target="_blank" rel="noopener">{esc(host_label(photo_source))}</a>'
+            + credit_html
+        )
+    else:
+        photo_html = ""
+
+    scale = as_text(first_truthy(_get(d, "model", "scale"), d.get("scale")))
+    manufacturer = as_text(first_truthy(_get(d, "model", "manufacturer"), d.get("manufacturer")))
+    v8 = d.get("aircraft_full_v8")
+
+    def size(k: str) -> str:
+        cm = calc_model_size_cm(_get(v8, k), scale)
+        return f"{cm} cm" if cm else ""
+
+    model_block = (
+        f'<div class="card"><div class="k k-nav"><span>Sammelmodell</span>{nav}</div>'
+        '<div class="publicModelRow">'
+        + "".join(
+            f'<div class="modelInline">{row(label, v)}</div>'
+            for label, v in (
+                ("Hersteller", manufacturer),
+                ("Maßstab", scale),
+                ("Länge", size("Length")),
+                ("Spannweite", size("Wingspan")),
+                ("Höhe", size("Height")),
+            )
+        )
+        + "</div></div>"
+    )
+
+    livery_full = d.get("livery_full") if isinstance(d.get("livery_full"), dict) else {}
+    livery_name = js_str(livery_full.get("Livery_Name") or "").strip()
+    livery_type = js_str(livery_full.get("Livery_Type") or "").strip()
+    livery_notes = js_str(livery_full.get("Notes") or "").strip()
+    livery_note = d.get("livery_note") or ""
+    if livery_name or livery_type or livery_notes or livery_note:
+        livery_html = (
+            '<div class="publicLiveryRows">'
+            + (row("Hinweis", livery_note) if livery_note else "")
+            + (row("Bezeichnung", livery_name) if livery_name else "")
+            + (row("Typ", livery_type) if livery_type else "")
+            + (
+                '<div class="kvInlineRow kvInlineRow--stack"><span class="kvInlineLabel">Erläuterung:</span>'
+                f'<span class="kvInlineValue">{esc(livery_notes)}</span></div>'
+                if livery_notes else ""
+            )
+            + "</div>"
+        )
+    else:
+        livery_html = '<div class="publicEmpty">Keine Angaben</div>'
+
+    aircraft_block = (
+        '<div class="card"><div class="k">Original-Flugzeug</div><div class="publicAircraftTop">'
+        '<section class="publicSubgroup"><h3 class="publicGroupTitle">Foto</h3>'
+        f'<div class="air-photo-only">{photo_html}</div></section>'
+        '<section class="publicSubgroup"><h3 class="publicGroupTitle">Bemalung</h3>'
+        f"{livery_html}</section></div></div>"
+    )
+
+    v8_html = render_v8_groups(v8)
+    tech_block = (
+        f'<div class="card"><div class="k">Technische Daten</div><div style="margin-top:10px">{v8_html}</div></div>'
+        if v8_html else ""
+    )
+
+    main = (
+        f'<div class="publicTop"><h1 id="title">{header}</h1><div class="publicSub" id="subtitle"></div></div>'
+        f'<div id="content"><div class="stack"><div class="stackItem">{model_block}</div>'
+        f'<div class="stackItem">{aircraft_block}</div>'
+        + (f'<div class="stackItem">{tech_block}</div>' if tech_block else "")
+        + "</div></div>"
+    )
+    return title, main
+
+
+# =========================
+# Critical CSS
+# =========================
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+CLASS_ATTR_RE = re.compile(r'\bclass="([^"]*)"')
+ID_ATTR_RE = re.compile(r'\bid="([^"]*)"')
+TAG_RE = re.compile(r"<([a-zA-Z][\w-]*)")
+SELECTOR_TOKEN_RE = re.compile(r"([.#])(-?[_a-zA-Z][\w-]*)")
+SELECTOR_TAG_RE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+# Pseudoklassen/-elemente (samt Argument) und Attribut-Selektoren zählen nicht
+SELECTOR_IGNORE_RE = re.compile(r"::?[\w-]+(\([^)]*\))?|\[[^\]]*\]")
+
+
+def parse_css(css: str) -> List[Tuple[str, Any]]:
+    """[(Prelude, Deklarationen | verschachtelte Regeln)] auf oberster Ebene."""
+    rules: List[Tuple[str, Any]] = []
+    i, n = 0, len(css)
+    while i < n:
+        j = css.find("{", i)
+        if j == -1:
+            break
+        prelude = css[i:j].strip()
+        depth, k = 1, j + 1
+        while k < n and depth:
+            depth += {"{": 1, "}": -1}.get(css[k], 0)
+            k += 1
+        body = css[j + 1:k - 1]
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            rules.append((prelude, parse_css(body)))
+        else:
+            rules.append((prelude, " ".join(body.split())))
+        i = k
+    return rules
+
+
+def _selector_used(selector: str, tags: Set[str], classes: Set[str], ids: Set[str]) -> bool:
+    """Kommen alle Elemente, Klassen und IDs des Selektors auf der Seite vor?"""
+    selector = SELECTOR_IGNORE_RE.sub("", selector).strip()
+    for kind, name in SELECTOR_TOKEN_RE.findall(selector):
+        if name not in (classes if kind == "." else ids):
+            return False
+    return all(t.lower() in tags for t in SELECTOR_TAG_RE.findall(selector))
+
+
+def critical_css(rules: List[Tuple[str, Any]], html: str) -> str:
+    tags = {t.lower() for t in TAG_RE.findall(html)} | {"html", "head", "body", "main"}
+    classes = {"publicPage", "publicWrap"} | {c for attr in CLASS_ATTR_RE.findall(html) for c in attr.split()}
+    ids = set(ID_ATTR_RE.findall(html))
+
+    def emit(rs: List[Tuple[str, Any]]) -> str:
+        out = []
+        for prelude, body in rs:
+            if isinstance(body, list):
+                inner = emit(body)
+                if inner:
+                    out.append(f"{prelude}{{{inner}}}")
+            elif prelude.startswith("@") or any(_selector_used(s, tags, classes, ids) for s in prelude.split(",")):
+                out.append(f"{' '.join(prelude.split())}{{{body}}}")
+        return "".join(out)
+
+    return emit(rules)
+
+
+def load_css() -> List[Tuple[str, Any]]:
+    rules: List[Tuple[str, Any]] = []
+    for path in CSS_FILES:
+        with open(path, "r", encoding="utf-8") as f:
+            css = f.read()
+        utils_metrics.count("bytes_read", len(css.encode("utf-8")))
+        rules.extend(parse_css(CSS_COMMENT_RE.sub("", css)))
+    return rules
+
+
+PAGE_TEMPLATE = """<!doctype html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>{title}</title>
+<link rel="icon" type="image/x-icon" href="../assets/favicon/favicon.ico">
+<link rel="icon" type="image/png" sizes="32x32" href="../assets/favicon/favicon-32x32.png">
+<style>{css}</style>
+</head>
+<body class="publicPage">
+<main class="publicWrap">{main}</main>
+</body>
+</html>
+"""
+
+
+def render_page(d: Dict[str, Any], same_airline: SameAirline, css_rules: List[Tuple[str, Any]]) -> str:
+    model_id = as_text(d.get("model_id"))
+    page_id = model_id.upper()
+    title, main = render_body(d, page_id, nav_html(*same_airline.ids(d), page_id))
+    return PAGE_TEMPLATE.format(title=esc(title), css=critical_css(css_rules, main), main=main)
+
+
+def remove_stale(keep: Iterable[str]) -> int:
+    keep = set(keep)
+    removed = 0
+    for fn in os.listdir(OUT_DIR):
+        if fn.endswith(".html") and fn not in keep:
+            os.remove(os.path.join(OUT_DIR, fn))
+            removed += 1
+    utils_metrics.count("files_removed", removed)
+    return removed
+
+
+def main(ds: Optional[Dataset] = None) -> int:
+    utils_metrics.phase("load")
+    try:
+        index = utils_json.read_json(INDEX_JSON)
+    except (OSError, ValueError):
+        index = {}
+    index_items = [x for x in (index.get("items") or []) if isinstance(x, dict)] if isinstance(index, dict) else []
+    same_airline = SameAirline(index_items)
+    css_rules = load_css()
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    utils_metrics.phase("render")
+    written: List[str] = []
+    with ParallelWriter() as writer:
+        for fn, d in utils_bundle.iter_model_jsons():
+            if not isinstance(d, dict) or not as_text(d.get("model_id")):
+                continue
+            utils_metrics.count("rows_read")
+            page = fn[:-5] + ".html"
+            writer.submit(os.path.join(OUT_DIR, page), render_page(d, same_airline, css_rules).encode("utf-8"))
+            written.append(page)
+
+    utils_metrics.phase("cleanup")
+    removed = remove_stale(written)
+    print(
+        f"[build_public_pages] pages={len(written)} written={writer.written} "
+        f"identical={writer.unchanged} removed={removed} -> {os.path.relpath(OUT_DIR, REPO_ROOT)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_metrics.run_stage("build_public_pages", main))
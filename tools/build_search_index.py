@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Globaler Suchindex (Format und Abfrage: siehe utils_search) über
+
+    model     index.json: model_id, Registrierung, Airline, Typ, Bemalung, Name
+    flight    flights.json: Flugnummer, Callsign, Registrierung, Airline, Typ, Route
+    postcard  postcards_index.json + postcards_enriched.json: ID, Modell,
+              Verlag, Airline, Registrierung, Typ
+    type      passenger_aircraft_full.csv: aircraft_id, Typ_anzeige, Hersteller, ICAO/IATA
+    livery    liveries.csv: Livery_ID, Livery_Name, Airline/Operator, Typ, Notes
+
+-> docs/data/search/{manifest,docs,t_<c>}.json. Die Übersichtsseiten
+filtern weiter über ihre eigenen Arrays (dort zählen auch Status, Shop
+usw.); der Index ist für die seitenübergreifende Suche (helper.js:
+searchGlobal), die nur die Shards der getippten Anfangszeichen lädt.
+Unter den Suchfeldern von Modell-, Postkarten- und Typenübersicht zeigt
+searchSuggest die Treffer der jeweils anderen Arten (u.a. Bemalungen).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import utils_json
+import utils_metrics
+import utils_search
+from utils_dataset import Dataset, get_dataset
+from utils_output import VOLATILE_KEYS, ParallelWriter, dump_json, write_json
+from utils_time import now_local_iso
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "docs", "data")
+INDEX_JSON = os.path.join(REPO_ROOT, "docs", "index.json")
+FLIGHTS_JSON = os.path.join(DATA_DIR, "flights.json")
+POSTCARDS_INDEX_JSON = os.path.join(DATA_DIR, "postcards_index.json")
+POSTCARDS_ENRICHED_JSON = os.path.join(DATA_DIR, "postcards_enriched.json")
+SEARCH_DIR = utils_search.SEARCH_DIR
+
+# (kind, id, label, url) + die indizierten Texte
+Doc = Tuple[str, str, str, str, List[Any]]
+
+
+def load_json(path: str, default: Any) -> Any:
+    try:
+        return utils_json.read_json(path)
+    except (OSError, ValueError):
+        return default
+
+
+def as_text(v: Any) -> str:
+    return "" if v is None else str(v).strip()
+
+
+def items_of(payload: Any) -> List[Dict[str, Any]]:
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    return [x for x in items if isinstance(x, dict)] if isinstance(items, list) else []
+
+
+def label_of(*parts: Any) -> str:
+    return " · ".join(p for p in (as_text(x) for x in parts) if p)
+
+
+# =========================
+# Dokumente
+# =========================
+def model_docs(index_items: List[Dict[str, Any]]) -> List[Doc]:
+    out = []
+    for it in index_items:
+        mid = as_text(it.get("model_id"))
+        if not mid:
+            continue
+        airline = as_text(it.get("airline_row")) or as_text(it.get("airline"))
+        out.append(("model", mid, label_of(mid, airline, it.get("aircraft_type"), it.get("registration")),
+                    f"model.html?id={quote(mid)}", [
+                        mid, it.get("registration"), it.get("airline"), it.get("airline_row"),
+                        it.get("aircraft_type"), it.get("livery_name"), it.get("aircraft_name"),
+                    ]))
+    return out
+
+
+def flight_docs(flights: List[Dict[str, Any]]) -> List[Doc]:
+    out = []
+    for f in flights:
+        fid = as_text(f.get("flight_id"))
+        if not fid:
+            continue
+        route = " → ".join(x for x in (as_text(f.get("from")), as_text(f.get("to"))) if x)
+        out.append(("flight", fid, label_of(f.get("flight_no") or fid, f.get("date"), route),
+                    f"flight.html?id={quote(fid)}", [
+                        f.get("flight_no"), f.get("callsign"), f.get("registration"), f.get("airline_row"),
+                        f.get("typ_anzeige"), f.get("from"), f.get("to"),
+                    ]))
+    return out
+
+
+def postcard_docs(index_items: List[Dict[str, Any]], enriched: Dict[str, Any]) -> List[Doc]:
+    out = []
+    for it in index_items:
+        pid = as_text(it.get("id"))
+        if not pid:
+            continue
+        e = enriched.get(pid) if isinstance(enriched.get(pid), dict) else {}
+        publisher = as_text(e.get("publisher_norm")) or as_text(e.get("publisher"))
+        out.append(("postcard", pid, label_of(pid, publisher, e.get("airline"), e.get("registration")),
+                    f"postcard.html?id={quote(pid)}", [
+                        pid, it.get("model_id"), it.get("label"), publisher, e.get("publisher"),
+                        e.get("airline"), e.get("registration"), e.get("aircraft_type"),
+                        e.get("aircraft_type_exact"),
+                    ]))
+    return out
+
+
+def type_docs(ds: Dataset) -> List[Doc]:
+    out = []
+    for r in ds.pax:
+        aid = r.get("aircraft_id")
+        if not aid:
+            continue
+        typ = r.get("Typ_anzeige") or aid
+        out.append(("type", aid, typ, f"models_overview.html?aircraft_id={quote(aid)}", [
+            aid, r.get("Typ_anzeige"), r.get("Hersteller"), r.get("ICAO"), r.get("IATA"),
+        ]))
+    return out
+
+
+def livery_docs(ds: Dataset) -> List[Doc]:
+    out = []
+    for r in ds.liveries:
+        lid = r.get("Livery_ID")
+        name = r.get("Livery_Name")
+        if not lid and not name:
+            continue
+        airline = r.get("Airline") or r.get("Operator")
+        out.append(("livery", lid or name, label_of(name or lid, airline, r.get("Livery_Type")),
+                    f"models_overview.html?q={quote(name or lid)}", [
+                        lid, name, r.get("Airline"), r.get("Operator"), r.get("Livery_Type"), r.get("Notes"),
+                    ]))
+    return out
+
+
+def collect_docs(ds: Dataset) -> List[Doc]:
+    outputs = ds.outputs
+    flights_payload = outputs.get("flights.json")
+    if flights_payload is None:
+        flights_payload = load_json(FLIGHTS_JSON, {})
+    enriched = load_json(POSTCARDS_ENRICHED_JSON, {})
+
+    docs = (
+        model_docs(items_of(load_json(INDEX_JSON, {})))
+        + flight_docs(items_of(flights_payload))
+        + postcard_docs(items_of(load_json(POSTCARDS_INDEX_JSON, {})), enriched if isinstance(enriched, dict) else {})
+        + type_docs(ds)
+        + livery_docs(ds)
+    )
+    order = {k: i for i, k in enumerate(utils_search.KINDS)}
+    docs.sort(key=lambda d: (order[d[0]], d[1]))
+    utils_metrics.count("rows_read", len(docs))
+    return docs
+
+
+# =========================
+# Schreiben
+# =========================
+def remove_stale(keep: List[str]) -> int:
+    keep_set = set(keep) | {"manifest.json", "docs.json"}
+    removed = 0
+    for fn in os.listdir(SEARCH_DIR):
+        if fn.endswith(".json") and fn not in keep_set:
+            os.remove(os.path.join(SEARCH_DIR, fn))
+            removed += 1
+    utils_metrics.count("files_removed", removed)
+    return removed
+
+
+def main(ds: Optional[Dataset] = None) -> int:
+    if ds is None:
+        ds = get_dataset()
+
+    utils_metrics.phase("load")
+    docs = collect_docs(ds)
+
+    utils_metrics.phase("index")
+    shards = utils_search.build_postings([d[4] for d in docs])
+
+    utils_metrics.phase("write")
+    os.makedirs(SEARCH_DIR, exist_ok=True)
+    meta: Dict[str, Dict[str, Any]] = {}
+    with ParallelWriter() as writer:
+        docs_data = dump_json({"docs": [list(d[:4]) for d in docs]}, compact=True)
+        writer.submit(utils_search.SEARCH_DOCS_JSON, docs_data)
+        for key, postings in shards.items():
+            data = dump_json(postings, compact=True)
+            meta[key] = utils_search.manifest_entry(key, data, len(postings))
+            writer.submit(os.path.join(SEARCH_DIR, utils_search.shard_filename(key)), data)
+    removed = remove_stale([m["file"] for m in meta.values()])
+
+    counts = {k: 0 for k in utils_search.KINDS}
+    for d in docs:
+        counts[d[0]] += 1
+    terms = sum(m["terms"] for m in meta.values())
+    size = sum(m["bytes"] for m in meta.values())
+    write_json(utils_search.SEARCH_MANIFEST_JSON, {
+        "generated_at": now_local_iso(),
+        "version": utils_search.SEARCH_VERSION,
+        "count": len(docs),
+        "counts": counts,
+        "docs": {"file": "docs.json", "bytes": len(docs_data), "sha1": hashlib.sha1(docs_data).hexdigest()},
+        "terms": terms,
+        "bytes": size,
+        "shards": meta,
+    }, volatile=VOLATILE_KEYS)
+
+    print(
+        f"[build_search_index] docs={len(docs)} ({', '.join(f'{k}={n}' for k, n in counts.items())}) "
+        f"shards={len(meta)} terms={terms} bytes={size} written={writer.written} removed={removed}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(utils_metrics.run_stage("build_search_index", main))
@@ -1,14 +1,12 @@
-import csv
-import json
 from pathlib import Path
 from collections import defaultdict
+from typing import Optional
+import utils_metrics
 from utils_time import now_local_iso
+from utils_output import write_json, write_json_stream
+from utils_dataset import Dataset, get_dataset, is_present, is_ordered, is_wishlist
 
 ROOT = Path(__file__).resolve().parents[1]
-MODELS_CSV = ROOT / "models_export.csv"
-PASSENGER_CSV = ROOT / "data" / "passenger_aircraft_full.csv"
-GROUP_TYPES_CSV = ROOT / "data" / "group_aircraft_types.csv"
-
 OUT_DIR = ROOT / "docs" / "data"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -18,86 +16,68 @@ OUT_TYPES = OUT_DIR / "types_overview.json"
 OUT_GROUP_TYPES = OUT_DIR / "group_aircraft_types.json"
 
 
-def read_csv(path: Path, delimiter=";"):
-    if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-        return list(csv.DictReader(f, delimiter=delimiter))
-
-
-def norm(s) -> str:
-    return (s or "").strip()
-
-
-def is_present(row) -> bool:
-    v = (row.get("vorhanden", "") or "").strip().lower()
-    return v in ("wahr", "true", "1", "x", "ja", "yes")
-
-
-def is_ordered(row) -> bool:
-    """
-    Bestellt = bestellt_am gesetzt UND noch nicht angekommen UND NICHT vorhanden
-    """
-    bestellt = norm(row.get("bestellt_am"))
-    angekommen = norm(row.get("angekommen"))
-    present = is_present(row)
-    return (not present) and bool(bestellt) and (not angekommen)
-
-def is_wishlist(row) -> bool:
-    """
-    Wunschmodell = explizit als Wunsch markiert,
-    aber nicht vorhanden und nicht bestellt.
-    Unterstützt mehrere mögliche Spaltennamen.
-    """
-    v = (
-        row.get("Wunsch")
-        or row.get("wunsch")
-        or row.get("wishlist")
-        or row.get("wish")
-        or ""
-    ).strip().lower()
-
-    return (
-        v in ("wahr", "true", "1", "x", "ja", "yes")
-        and not is_present(row)
-        and not is_ordered(row)
-    )
-    
-def main():
-    models = read_csv(MODELS_CSV, delimiter=";")
-    pax = read_csv(PASSENGER_CSV, delimiter=";")
-    group_types = read_csv(GROUP_TYPES_CSV, delimiter=";")
+def main(ds: Optional[Dataset] = None):
+    if ds is None:
+        ds = get_dataset()
+
+    utils_metrics.phase("load")
+    # Spaltenspeicher mit internierten Werten statt Listen von dicts
+    models = ds.models_columns
+    pax = ds.pax_columns
+    group_types = ds.group_types_columns
 
     def first_value(row, *keys):
         for key in keys:
-            v = norm(row.get(key))
+            v = row.get(key)
             if v:
                 return v
         return ""
-    
-    
-    aircraft_master_by_id = {}
-    
-    for r in pax:
-        aid = norm(r.get("aircraft_id"))
-        if aid:
-            aircraft_master_by_id[aid] = r    
+
+    # Zeilennummer im Typen-Master je aircraft_id (Duplikate: letzte Zeile gewinnt)
+    pax_pos = pax.positions_by("aircraft_id")
+
+    utils_metrics.phase("model_status")
+    # Modellstatus einmal je Zeile bestimmen:
+    # "present" > "ordered" > "wishlist" > ""
+    m_aid = models.getter("aircraft_id")
+    m_airline = models.getter("airline")
+    m_airline_code = models.getter("airline_code")
+    m_airline_row = models.getter("airline_row")
+    model_status = []
+    for r in models:
+        if is_present(r):
+            model_status.append("present")
+        elif is_ordered(r):
+            model_status.append("ordered")
+        elif is_wishlist(r):
+            model_status.append("wishlist")
+        else:
+            model_status.append("")
 
     # =========================
     # Group aircraft types JSON
     # Quelle für "fehlt" in models_overview.html
     # =========================
+    utils_metrics.phase("group_types")
     group_type_seen = set()
     group_type_items = []
 
-    for r in group_types:
-        airline_code = norm(r.get("airline_code"))
-        airline = norm(r.get("airline"))
-        airline_row = norm(r.get("airline_row")) or airline
-        aircraft_id = norm(r.get("aircraft_id"))
-        aircraft_type = norm(r.get("aircraft_type"))
-        source_sheet = norm(r.get("source_sheet"))
-        source_row = norm(r.get("source_row"))
+    g_airline_code = group_types.getter("airline_code")
+    g_airline = group_types.getter("airline")
+    g_airline_row = group_types.getter("airline_row")
+    g_aid = group_types.getter("aircraft_id")
+    g_type = group_types.getter("aircraft_type")
+    g_source_sheet = group_types.getter("source_sheet")
+    g_source_row = group_types.getter("source_row")
+
+    for i in range(len(group_types)):
+        airline_code = g_airline_code(i)
+        airline = g_airline(i)
+        airline_row = g_airline_row(i) or airline
+        aircraft_id = g_aid(i)
+        aircraft_type = g_type(i)
+        source_sheet = g_source_sheet(i)
+        source_row = g_source_row(i)
 
         if not airline or not aircraft_id:
             continue
@@ -109,7 +89,8 @@ def main():
 
         group_type_seen.add(key)
 
-        m = aircraft_master_by_id.get(aircraft_id, {})
+        pos = pax_pos.get(aircraft_id)
+        m = pax.row(pos) if pos is not None else {}
         
         group_type_items.append({
             "airline_code": airline_code,
@@ -146,47 +127,47 @@ def main():
         )
     )
 
-    OUT_GROUP_TYPES.write_text(
-        json.dumps({
-            "schema": "aviation-database.group_aircraft_types.v1",
-            "count": len(group_type_items),
-            "items": group_type_items,
-        }, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    write_json(OUT_GROUP_TYPES, {
+        "schema": "aviation-database.group_aircraft_types.v1",
+        "count": len(group_type_items),
+        "items": group_type_items,
+    })
 
     
     # =========================
     # Missing types (stable by aircraft_id; display Typ_anzeige)
     # =========================
+    utils_metrics.phase("missing_types")
     present_ids = set()
     ordered_ids = set()
 
-    for r in models:
-        aid = norm(r.get("aircraft_id"))
+    for i, st in enumerate(model_status):
+        aid = m_aid(i)
         if not aid:
             continue
-        if is_present(r):
+        if st == "present":
             present_ids.add(aid)
-        if is_ordered(r):
+        elif st == "ordered":
             ordered_ids.add(aid)
 
-    id_to_label = {}
-    id_to_manu = {}
-    master_ids = set()
+    # Beschriftung/Hersteller direkt aus den Spalten des Typen-Masters
+    p_label = pax.getter("Typ_anzeige")
+    p_manu = pax.getter("Hersteller")
+    master_ids = set(pax_pos)
+
+    def id_to_label(aid: str, default: str) -> str:
+        pos = pax_pos.get(aid)
+        if pos is None:
+            return default
+        return p_label(pos) or aid
 
-    for r in pax:
-        aid = norm(r.get("aircraft_id"))
-        label = norm(r.get("Typ_anzeige")) or aid
-        manu = norm(r.get("Hersteller"))
-        if aid:
-            master_ids.add(aid)
-            id_to_label[aid] = label
-            id_to_manu[aid] = manu
+    def id_to_manu(aid: str) -> str:
+        pos = pax_pos.get(aid)
+        return p_manu(pos) if pos is not None else ""
 
     warning = ""
     if not master_ids:
-        warning = f"Keine aircraft_id aus {PASSENGER_CSV.name} gefunden."
+        warning = f"Keine aircraft_id aus {Path(pax.path).name} gefunden."
         missing_ids = []
         present_in_master = set()
         ordered_missing_ids = []
@@ -203,8 +184,8 @@ def main():
         [
             {
                 "aircraft_id": aid,
-                "Typ_anzeige": id_to_label.get(aid, aid),
-                "manufacturer": id_to_manu.get(aid, ""),
+                "Typ_anzeige": id_to_label(aid, aid),
+                "manufacturer": id_to_manu(aid),
                 "status": "missing",
             }
             for aid in missing_ids
@@ -212,8 +193,8 @@ def main():
         + [
             {
                 "aircraft_id": aid,
-                "Typ_anzeige": id_to_label.get(aid, aid),
-                "manufacturer": id_to_manu.get(aid, ""),
+                "Typ_anzeige": id_to_label(aid, aid),
+                "manufacturer": id_to_manu(aid),
                 "status": "ordered",
             }
             for aid in ordered_missing_ids
@@ -232,9 +213,7 @@ def main():
         },
         "missing_types": missing_types,
     }
-    OUT_MISSING.write_text(
-        json.dumps(payload_missing, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    write_json(OUT_MISSING, payload_missing)
 
     # =========================
     # Matrix: Gruppen (airline = Sheet/Gruppe) x Typen
@@ -243,6 +222,7 @@ def main():
     # - wishlist_matrix: Wunschmodelle
     # - relevant_matrix: Typ ist laut group_aircraft_types.csv für diese Airline-Gruppe relevant
     # =========================
+    utils_metrics.phase("matrix")
     present_counts = defaultdict(lambda: defaultdict(int))
     ordered_counts = defaultdict(lambda: defaultdict(int))
     wishlist_counts = defaultdict(lambda: defaultdict(int))
@@ -251,10 +231,10 @@ def main():
     relevant_pairs = set()
     group_type_labels = {}
 
-    for r in group_types:
-        group = norm(r.get("airline"))
-        aid = norm(r.get("aircraft_id"))
-        typ = norm(r.get("aircraft_type"))
+    for i in range(len(group_types)):
+        group = g_airline(i)
+        aid = g_aid(i)
+        typ = g_type(i)
 
         if not group or not aid:
             continue
@@ -268,19 +248,19 @@ def main():
 
     seen_types = set()
 
-    for r in models:
-        group = norm(r.get("airline")) or norm(r.get("airline_code"))
-        t = norm(r.get("aircraft_id"))
+    for i, st in enumerate(model_status):
+        group = m_airline(i) or m_airline_code(i)
+        t = m_aid(i)
         if not group or not t:
             continue
 
         seen_types.add(t)
 
-        if is_present(r):
+        if st == "present":
             present_counts[group][t] += 1
-        elif is_ordered(r):
+        elif st == "ordered":
             ordered_counts[group][t] += 1
-        elif is_wishlist(r):
+        elif st == "wishlist":
             wishlist_counts[group][t] += 1
 
     # Gruppen aus Modellen und aus Typenliste
@@ -301,37 +281,25 @@ def main():
     types = sorted(
         matrix_type_ids,
         key=lambda aid: (
-            id_to_label.get(aid, group_type_labels.get(aid, aid)).lower(),
+            id_to_label(aid, group_type_labels.get(aid, aid)).lower(),
             aid
         )
     )
 
     type_labels = [
-        id_to_label.get(t, group_type_labels.get(t, t))
+        id_to_label(t, group_type_labels.get(t, t))
         for t in types
     ]
 
-    present_matrix = []
-    ordered_matrix = []
-    wishlist_matrix = []
-    relevant_matrix = []
-
-    for g in groups:
-        prow = []
-        orow = []
-        wrow = []
-        rrow = []
-
-        for t in types:
-            prow.append(present_counts[g].get(t, 0))
-            orow.append(ordered_counts[g].get(t, 0))
-            wrow.append(wishlist_counts[g].get(t, 0))
-            rrow.append(1 if (g, t) in relevant_pairs else 0)
+    # Matrix-Zeilen entstehen erst beim Schreiben (eine Zeile gleichzeitig im Speicher)
+    def count_rows(counts):
+        for g in groups:
+            row_counts = counts.get(g) or {}
+            yield [row_counts.get(t, 0) for t in types]
 
-        present_matrix.append(prow)
-        ordered_matrix.append(orow)
-        wishlist_matrix.append(wrow)
-        relevant_matrix.append(rrow)
+    def relevant_rows():
+        for g in groups:
+            yield [1 if (g, t) in relevant_pairs else 0 for t in types]
 
     payload_matrix = {
         "schema": "aviation-database.matrix.v4",
@@ -345,15 +313,13 @@ def main():
         "groups": groups,
         "types": types,
         "type_labels": type_labels,
-        "present_matrix": present_matrix,
-        "ordered_matrix": ordered_matrix,
-        "wishlist_matrix": wishlist_matrix,
-        "relevant_matrix": relevant_matrix,
+        "present_matrix": count_rows(present_counts),
+        "ordered_matrix": count_rows(ordered_counts),
+        "wishlist_matrix": count_rows(wishlist_counts),
+        "relevant_matrix": relevant_rows(),
     }
 
-    OUT_MATRIX.write_text(
-        json.dumps(payload_matrix, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    write_json_stream(OUT_MATRIX, payload_matrix)
 
     # =========================
     # Types overview (master from passenger_aircraft_full)
@@ -362,43 +328,17 @@ def main():
     # - drilldown: group + airlines
     # - wingtip: has_wingtip = Wingtip != NONE
     # =========================
-    pax_by_id = {}
+    utils_metrics.phase("types_overview")
+    # Zeilenansichten statt Kopie jeder Master-Zeile in ein eigenes dict
+    p_wingtip = pax.getter("Wingtip")
     manufacturers_set = set()
-    wingtip_values = set()
 
-    for r in pax:
-        aid = norm(r.get("aircraft_id"))
-        if not aid:
-            continue
-        typ = norm(r.get("Typ_anzeige")) or aid
-        manu = norm(r.get("Hersteller"))
-        wingtip = norm(r.get("Wingtip")).upper()
-        pax_by_id[aid] = {
-            "aircraft_id": aid,
-            "typ_anzeige": typ,
-            "manufacturer": manu,
-            "wingtip": wingtip,
-            "has_wingtip": (wingtip != "" and wingtip != "NONE"),
-
-            # optionale technische Felder für types_overview
-            "role": norm(r.get("Role")),
-            "fuselage": norm(r.get("Rumpf")),
-            "market_segment": norm(r.get("MarketSegment")),
-            "aircraft_kind": norm(r.get("Flugzeugtyp")),
-            "aircraft_status": norm(r.get("Status")),
-            "first_flight": norm(r.get("Erstflug")),
-            "propulsion": norm(r.get("Antrieb")),
-            "engines": norm(r.get("Triebwerke")),
-            "range_class": norm(r.get("Reichweite")),
-            "passengers": norm(r.get("Passengers")),
-            "length_m": norm(r.get("Length")),
-            "wingspan_m": norm(r.get("Wingspan")),
-            "height_m": norm(r.get("Height")),
-        }
+    # alle Master-Zeilen mit aircraft_id, auch Duplikate (wie bisher)
+    p_aid = pax.getter("aircraft_id")
+    for pos in range(len(pax)):
+        manu = p_manu(pos) if p_aid(pos) else ""
         if manu:
             manufacturers_set.add(manu)
-        if wingtip:
-            wingtip_values.add(wingtip)
 
     # counts per aircraft_id -> group -> airline_row
     owned_by_type = defaultdict(int)
@@ -406,18 +346,18 @@ def main():
 
     group_airline_counts = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: {"owned": 0, "ordered": 0})))
 
-    for r in models:
-        aid = norm(r.get("aircraft_id"))
+    for i, st in enumerate(model_status):
+        aid = m_aid(i)
         if not aid:
             continue
 
-        group = norm(r.get("airline")) or norm(r.get("airline_code"))
-        airline_row = norm(r.get("airline_row")) or group
+        group = m_airline(i) or m_airline_code(i)
+        airline_row = m_airline_row(i) or group
 
-        if is_present(r):
+        if st == "present":
             owned_by_type[aid] += 1
             group_airline_counts[aid][group][airline_row]["owned"] += 1
-        elif is_ordered(r):
+        elif st == "ordered":
             ordered_by_type[aid] += 1
             group_airline_counts[aid][group][airline_row]["ordered"] += 1
 
@@ -431,58 +371,59 @@ def main():
             return "owned"
         return "ordered"
 
-    items = []
     master_ids_sorted = sorted(
-        pax_by_id.keys(),
-        key=lambda x: (pax_by_id[x].get("typ_anzeige", "").lower(), x),
+        pax_pos.keys(),
+        key=lambda x: (id_to_label(x, x).lower(), x),
     )
 
-    for aid in master_ids_sorted:
-        base = pax_by_id[aid]
-        owned = owned_by_type.get(aid, 0)
-        ordered = ordered_by_type.get(aid, 0)
-        total = owned + ordered
-
-        # build drilldown list
-        group_list = []
-        for g in sorted(group_airline_counts[aid].keys(), key=lambda s: s.lower()):
-            airlines_map = group_airline_counts[aid][g]
-            airlines_list = []
-            g_owned = 0
-            g_ordered = 0
-
-            for al in sorted(airlines_map.keys(), key=lambda s: s.lower()):
-                o = airlines_map[al]["owned"]
-                od = airlines_map[al]["ordered"]
-                airlines_list.append(
+    def iter_type_items():
+        for aid in master_ids_sorted:
+            base = pax.row(pax_pos[aid])
+            typ = id_to_label(aid, aid)
+            wingtip = p_wingtip(pax_pos[aid]).upper()
+            owned = owned_by_type.get(aid, 0)
+            ordered = ordered_by_type.get(aid, 0)
+            total = owned + ordered
+
+            # build drilldown list
+            group_list = []
+            for g in sorted(group_airline_counts[aid].keys(), key=lambda s: s.lower()):
+                airlines_map = group_airline_counts[aid][g]
+                airlines_list = []
+                g_owned = 0
+                g_ordered = 0
+
+                for al in sorted(airlines_map.keys(), key=lambda s: s.lower()):
+                    o = airlines_map[al]["owned"]
+                    od = airlines_map[al]["ordered"]
+                    airlines_list.append(
+                        {
+                            "airline": al,
+                            "owned": o,
+                            "ordered": od,
+                            "total": o + od,
+                        }
+                    )
+                    g_owned += o
+                    g_ordered += od
+
+                group_list.append(
                     {
-                        "airline": al,
-                        "owned": o,
-                        "ordered": od,
-                        "total": o + od,
+                        "group": g,
+                        "owned": g_owned,
+                        "ordered": g_ordered,
+                        "total": g_owned + g_ordered,
+                        "airlines": airlines_list,
                     }
                 )
-                g_owned += o
-                g_ordered += od
-
-            group_list.append(
-                {
-                    "group": g,
-                    "owned": g_owned,
-                    "ordered": g_ordered,
-                    "total": g_owned + g_ordered,
-                    "airlines": airlines_list,
-                }
-            )
-
-        items.append(
-            {
+
+            yield {
                 "aircraft_id": aid,
-                "typ_anzeige": base.get("typ_anzeige", aid),
-                "type_key": (base.get("typ_anzeige", aid) or aid).lower(),
-                "manufacturer": base.get("manufacturer", ""),
-                "wingtip": base.get("wingtip", ""),
-                "has_wingtip": bool(base.get("has_wingtip", False)),
+                "typ_anzeige": typ,
+                "type_key": typ.lower(),
+                "manufacturer": base.get("Hersteller"),
+                "wingtip": wingtip,
+                "has_wingtip": (wingtip != "" and wingtip != "NONE"),
                 "status": type_status(owned, ordered),
                 "owned_count": owned,
                 "ordered_count": ordered,
@@ -490,28 +431,30 @@ def main():
                 "airline_group_counts": group_list,
 
                 # optionale technische Felder für types_overview
-                "role": base.get("role", ""),
-                "fuselage": base.get("fuselage", ""),
-                "market_segment": base.get("market_segment", ""),
-                "aircraft_kind": base.get("aircraft_kind", ""),
-                "aircraft_status": base.get("aircraft_status", ""),
-                "first_flight": base.get("first_flight", ""),
-                "propulsion": base.get("propulsion", ""),
-                "engines": base.get("engines", ""),
-                "range_class": base.get("range_class", ""),
-                "passengers": base.get("passengers", ""),
-                "length_m": base.get("length_m", ""),
-                "wingspan_m": base.get("wingspan_m", ""),
-                "height_m": base.get("height_m", ""),
+                "role": base.get("Role"),
+                "fuselage": base.get("Rumpf"),
+                "market_segment": base.get("MarketSegment"),
+                "aircraft_kind": base.get("Flugzeugtyp"),
+                "aircraft_status": base.get("Status"),
+                "first_flight": base.get("Erstflug"),
+                "propulsion": base.get("Antrieb"),
+                "engines": base.get("Triebwerke"),
+                "range_class": base.get("Reichweite"),
+                "passengers": base.get("Passengers"),
+                "length_m": base.get("Length"),
+                "wingspan_m": base.get("Wingspan"),
+                "height_m": base.get("Height"),
             }
-        )
+
+    # vorab aus den Zählern, die items werden erst beim Schreiben erzeugt
+    with_any_models = sum(1 for aid in pax_pos if owned_by_type.get(aid, 0) + ordered_by_type.get(aid, 0) > 0)
 
     payload_types = {
         "schema": "aircraft-labels.types-overview.v1",
         "generated_at": "",  # optional; UI zeigt es nicht zwingend
-        "master_count": len(pax_by_id),
-        "with_any_models": sum(1 for x in items if (x.get("total_count", 0) or 0) > 0),
-        "missing": sum(1 for x in items if (x.get("total_count", 0) or 0) == 0),
+        "master_count": len(pax_pos),
+        "with_any_models": with_any_models,
+        "missing": len(pax_pos) - with_any_models,
         "filters": {
             "manufacturers": sorted(manufacturers_set, key=lambda s: s.lower()),
             "statuses": ["all", "missing", "owned", "ordered", "mixed"],
@@ -519,13 +462,11 @@ def main():
         },
         "default_sort": "type_az",
         "sort_modes": ["type_az", "owned_desc", "ordered_desc", "manufacturer_az"],
-        "items": items,
+        "items": iter_type_items(),
     }
 
-    OUT_TYPES.write_text(
-        json.dumps(payload_types, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    write_json_stream(OUT_TYPES, payload_types)
 
 
 if __name__ == "__main__":
-    main()
+    utils_metrics.run_stage("build_stats", main)
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 import os
 import sys
 from typing import Any
 
+import utils_json
+import utils_profile
+
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(REPO_ROOT, "docs", "data")
 
@@ -21,14 +23,16 @@ KEEP_FILES = {
     "types_overview.json",
     "postcards_enriched.json",
     "stats.json",
+    "models_manifest.json",
+    "outputs_manifest.json",
+    "compressed_manifest.json",
 }
 
 DRY_RUN = "--apply" not in sys.argv  # default = dry run
 
 
 def load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return utils_json.read_json(path)
 
 
 def is_old_model_json(path: str) -> bool:
@@ -91,4 +95,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(utils_profile.run("cleanup_old_model_jsons", main))
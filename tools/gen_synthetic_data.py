@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Erzeugt einen synthetischen Datensatz in beliebiger Größe aus den echten
+CSVs als Vorlage (für bench_scale.py und zum Ausprobieren großer Sammlungen).
+
+    python tools/gen_synthetic_data.py --out .cache/synthetic --models 100000
+        [--flights N] [--types N] [--groups N] [--liveries N] [--seed 1]
+
+--out ist ein eigener Repo-Root: models_export.csv und data/*.csv werden
+dort angelegt (airline_logos.csv und airports.csv unverändert kopiert).
+
+Die Querbezüge bleiben wie in den echten Daten gültig:
+- models.aircraft_id / flights.aircraft_id -> passenger_aircraft_full
+- models.airline / airline_row / airline_code -> group_aircraft_types
+  (ein Modell hat immer einen Typ, der für seine Gruppe relevant ist)
+- models.livery / parent_livery -> liveries.Livery_ID
+- models.logo_id / flights.logo_id -> airline_logos
+- flights.from / to -> IATA-Codes aus airports.csv
+
+Alle übrigen Felder (Status, Preise, Postkarten, Fotos, ...) stammen aus
+reihum gewählten Vorlagezeilen, die Verteilungen bleiben also realistisch.
+Ohne Angabe wachsen Typen und Gruppen mit (Skalierung) ** 0.25, Liveries
+und Flüge proportional zu den Modellen.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import random
+import shutil
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from build_airports import parse_airports
+from utils_dataset import (
+    AIRLINE_LOGOS_CSV,
+    AIRPORTS_CSV,
+    FLIGHTS_CSV,
+    GROUP_TYPES_CSV,
+    LIV_CSV,
+    MODELS_CSV,
+    PAX_CSV,
+    REPO_ROOT,
+    Dataset,
+)
+from utils_csv import Table
+
+# Bei Änderungen an der Erzeugung erhöhen (bench_scale erzeugt dann neu)
+GENERATOR_VERSION = 1
+
+FLIGHT_DATE_FROM = date(2000, 1, 1)
+FLIGHT_DATE_DAYS = 26 * 365
+
+
+def _arg(name: str, default: Optional[int] = None) -> Optional[int]:
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def _rel_out(root: str, default: str) -> str:
+    return os.path.join(root, os.path.relpath(default, REPO_ROOT))
+
+
+def _write_csv(path: str, header: Sequence[str], rows) -> int:
+    """Wie die Excel-Exporte: UTF-8 mit BOM, Semikolon."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    n = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=";", lineterminator="\n")
+        w.writerow(header)
+        for row in rows:
+            w.writerow(row)
+            n += 1
+    return n
+
+
+def _scaled(real: int, scale: float, exponent: float) -> int:
+    return max(real, int(round(real * scale ** exponent))) if scale > 1 else real
+
+
+class _Row:
+    """Veränderbare Kopie einer Vorlagezeile."""
+
+    def __init__(self, table: Table, rec) -> None:
+        self._pos = table.index
+        self.values = list(rec) + [""] * (len(table.header) - len(rec))
+
+    def __getitem__(self, name: str) -> str:
+        i = self._pos.get(name)
+        return self.values[i] if i is not None else ""
+
+    def __setitem__(self, name: str, value: str) -> None:
+        i = self._pos.get(name)
+        if i is not None:
+            self.values[i] = value
+
+
+def gen_types(ds: Dataset, rng: random.Random, n_types: int) -> Tuple[List[List[str]], Dict[str, str]]:
+    """Typen-Master: echte Zeilen + Ableger (parent_aircraft_id zeigt auf den echten Typ)."""
+    pax = ds.pax
+    rows = [list(r) for r in pax]
+    labels = {r.aircraft_id: r.get("Typ_anzeige") for r in pax if r.aircraft_id}
+    real = [r for r in pax if r.aircraft_id]
+    for i in range(n_types - len(rows)):
+        tpl = _Row(pax, rng.choice(real))
+        aid = f"{tpl['aircraft_id']}-S{i}"
+        tpl["parent_aircraft_id"] = tpl["aircraft_id"]
+        tpl["aircraft_id"] = aid
+        tpl["Typ_anzeige"] = f"{tpl['Typ_anzeige']} S{i}"
+        labels[aid] = tpl["Typ_anzeige"]
+        rows.append(tpl.values)
+    return rows, labels
+
+
+def gen_group_types(
+    ds: Dataset, rng: random.Random, n_groups: int, type_ids: List[str], labels: Dict[str, str]
+) -> List[List[str]]:
+    """Echte Gruppen + Kopien unter neuem Namen; Kopien bekommen anteilig synthetische Typen."""
+    gt = ds.group_types
+    rows = [list(r) for r in gt]
+    by_group: Dict[Tuple[str, str], List] = {}
+    for r in gt:
+        if r.get("airline") and r.aircraft_id:
+            by_group.setdefault((r.get("airline_code"), r.get("airline")), []).append(r)
+    templates = sorted(by_group)
+    synthetic_share = 1.0 - len(ds.pax) / max(1, len(type_ids))
+
+    for j in range(n_groups - len(templates)):
+        code, airline = templates[j % len(templates)]
+        suffix = f" S{j}"
+        for r in by_group[(code, airline)]:
+            row = _Row(gt, r)
+            row["airline_code"] = f"{code}S{j}"
+            row["airline"] = airline + suffix
+            row["airline_row"] = (r.get("airline_row") or airline) + suffix
+            if rng.random() < synthetic_share:
+                aid = rng.choice(type_ids)
+                row["aircraft_id"] = aid
+                row["aircraft_type"] = labels.get(aid, aid)
+            rows.append(row.values)
+    return rows
+
+
+def gen_liveries(ds: Dataset, rng: random.Random, n_liveries: int) -> Tuple[List[List[str]], List[str]]:
+    liv = ds.liveries
+    key = ds.livery_key or "Livery_ID"
+    rows = [list(r) for r in liv]
+    ids = [r.get(key) for r in liv if r.get(key)]
+    real = list(liv)
+    for k in range(n_liveries - len(rows)):
+        row = _Row(liv, rng.choice(real))
+        parent = row[key]
+        row[key] = f"{parent}-S{k}"
+        row["Parent_Livery_ID"] = row["Parent_Livery_ID"] or parent
+        ids.append(row[key])
+        rows.append(row.values)
+    return rows, ids
+
+
+def _registration(tpl_reg: str, k: int) -> str:
+    prefix = tpl_reg.split("-", 1)[0] if "-" in tpl_reg else "D"
+    digits = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    s = ""
+    while True:
+        k, r = divmod(k, 26)
+        s = digits[r] + s
+        if not k:
+            break
+    return f"{prefix}-{s.rjust(4, 'A')}"
+
+
+def gen_models(
+    ds: Dataset,
+    rng: random.Random,
+    n_models: int,
+    group_rows: List[List[str]],
+    gt_header: List[str],
+    labels: Dict[str, str],
+    livery_ids: List[str],
+) -> List[List[str]]:
+    models = ds.models
+    gt_pos = {c: i for i, c in enumerate(gt_header)}
+    g_code, g_airline, g_row, g_aid = (gt_pos[c] for c in ("airline_code", "airline", "airline_row", "aircraft_id"))
+    relevant = [g for g in group_rows if g[g_airline] and g[g_aid]]
+    logo_ids = [r.logo_id for r in ds.logos if r.logo_id]
+
+    out: List[List[str]] = []
+    for k in range(n_models):
+        tpl = models[k % len(models)]
+        row = _Row(models, tpl)
+        g = rng.choice(relevant)
+        code = g[g_code] or "XX"
+        row["airline_code"] = code
+        row["airline"] = g[g_airline]
+        row["airline_row"] = g[g_row] or g[g_airline]
+        row["aircraft_id"] = g[g_aid]
+        row["aircraft_type"] = labels.get(g[g_aid], g[g_aid])
+
+        prefix = next((p for p in ("WIS-", "ORD-") if tpl.model_id.startswith(p)), "")
+        row["model_id"] = f"{prefix}{code}-{k}" if prefix else f"{code}{k:06d}"
+        if tpl.get("registration"):
+            row["registration"] = _registration(tpl.get("registration"), k)
+        if tpl.get("livery"):
+            row["livery"] = rng.choice(livery_ids)
+        if tpl.get("parent_livery"):
+            row["parent_livery"] = rng.choice(livery_ids)
+        if tpl.logo_id and logo_ids:
+            row["logo_id"] = rng.choice(logo_ids)
+        row["source_sheet"] = g[g_airline]
+        row["source_row"] = str(k + 2)
+        out.append(row.values)
+    return out
+
+
+def gen_flights(
+    ds: Dataset, rng: random.Random, n_flights: int, type_ids: List[str], labels: Dict[str, str]
+) -> List[List[str]]:
+    flights = ds.flights
+    airports = sorted(parse_airports(ds.airports)) if os.path.isfile(ds.input_path(AIRPORTS_CSV)) else []
+    if not airports:
+        airports = sorted({c for r in flights for c in (r.get("from"), r.get("to")) if c})
+    logo_ids = [r.logo_id for r in ds.logos if r.logo_id]
+
+    rows: List[Tuple[str, List[str]]] = []
+    for k in range(n_flights):
+        tpl = flights[k % len(flights)]
+        row = _Row(flights, tpl)
+        day = FLIGHT_DATE_FROM + timedelta(days=rng.randrange(FLIGHT_DATE_DAYS))
+        a, b = rng.sample(airports, 2) if len(airports) > 1 else (tpl.get("from"), tpl.get("to"))
+        aid = rng.choice(type_ids)
+        row["flight_id"] = f"FL-{day:%Y%m%d}-{k:06d}"
+        row["date"] = day.isoformat()
+        # Excel-Tagesanteil mit Dezimalkomma wie im Export
+        row["time"] = f"{rng.random():.15f}".replace(".", ",")
+        row["from"] = a
+        row["to"] = b
+        row["aircraft_id"] = aid
+        row["type"] = labels.get(aid, aid)
+        if logo_ids:
+            row["logo_id"] = rng.choice(logo_ids)
+        if tpl.get("registration"):
+            row["registration"] = _registration(tpl.get("registration"), k)
+        row["source_row"] = str(k + 2)
+        rows.append((row["date"], row.values))
+    # wie der Export: chronologisch
+    rows.sort(key=lambda x: x[0])
+    return [r for _, r in rows]
+
+
+def generate(
+    out_root: str,
+    models: int,
+    flights: Optional[int] = None,
+    types: Optional[int] = None,
+    groups: Optional[int] = None,
+    liveries: Optional[int] = None,
+    seed: int = 1,
+    ds: Optional[Dataset] = None,
+) -> Dict[str, int]:
+    """Schreibt den Datensatz nach out_root, liefert die Zeilenzahlen je Datei."""
+    ds = ds or Dataset()
+    rng = random.Random(seed)
+    scale = models / max(1, len(ds.models))
+
+    n_groups_real = len({(r.get("airline_code"), r.get("airline")) for r in ds.group_types if r.get("airline") and r.aircraft_id})
+    flights = models if flights is None else flights
+    types = types or _scaled(len(ds.pax), scale, 0.25)
+    groups = groups or _scaled(n_groups_real, scale, 0.25)
+    liveries = liveries or max(len(ds.liveries), int(len(ds.liveries) * scale))
+
+    type_rows, labels = gen_types(ds, rng, types)
+    type_ids = list(labels)
+    group_rows = gen_group_types(ds, rng, groups, type_ids, labels)
+    livery_rows, livery_ids = gen_liveries(ds, rng, liveries)
+    model_rows = gen_models(ds, rng, models, group_rows, ds.group_types.header, labels, livery_ids)
+    flight_rows = gen_flights(ds, rng, flights, type_ids, labels)
+
+    counts = {
+        "models_export.csv": _write_csv(_rel_out(out_root, MODELS_CSV), ds.models.header, model_rows),
+        "flights_export.csv": _write_csv(_rel_out(out_root, FLIGHTS_CSV), ds.flights.header, flight_rows),
+        "passenger_aircraft_full.csv": _write_csv(_rel_out(out_root, PAX_CSV), ds.pax.header, type_rows),
+        "group_aircraft_types.csv": _write_csv(_rel_out(out_root, GROUP_TYPES_CSV), ds.group_types.header, group_rows),
+        "liveries.csv": _write_csv(_rel_out(out_root, LIV_CSV), ds.liveries.header, livery_rows),
+    }
+    for src in (AIRLINE_LOGOS_CSV, AIRPORTS_CSV):
+        path = ds.input_path(src)
+        if os.path.isfile(path):
+            shutil.copyfile(path, _rel_out(out_root, src))
+    return counts
+
+
+def main() -> int:
+    if "--out" not in sys.argv or "--models" not in sys.argv:
+        print(__doc__)
+        return 2
+    out_root = os.path.abspath(sys.argv[sys.argv.index("--out") + 1])
+    counts = generate(
+        out_root,
+        models=_arg("--models"),
+        flights=_arg("--flights"),
+        types=_arg("--types"),
+        groups=_arg("--groups"),
+        liveries=_arg("--liveries"),
+        seed=_arg("--seed", 1),
+    )
+    for fn, n in counts.items():
+        print(f"[synthetic] {fn}: {n} rows")
+    print(f"[synthetic] wrote {out_root}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
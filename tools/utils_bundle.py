@@ -0,0 +1,275 @@
+# tools/utils_bundle.py
+"""
+Optionales gepacktes Format der Modell-JSONs: alle Datensätze in einer
+Datei (docs/data/models.bundle.jsonl, ein kompaktes JSON pro Zeile) plus
+ein Index Schlüssel -> [Offset, Länge] (docs/data/models.bundle.idx.json).
+Schlüssel ist der Dateiname ohne .json (safe_filename(model_id)), wie bei
+docs/data/models/<schlüssel>.json.
+
+Eingeschaltet mit MODELS_BUNDLE=1 oder --bundle (build_json schreibt das
+Bundle dann zusätzlich zu den Einzeldateien; ohne wird es entfernt, damit
+es nie veraltet herumliegt).
+
+    w = BundleWriter(generator, rebuild=False)
+    for ...:
+        if w.needs(key, changed):
+            w.add(key, obj)
+    w.close(alle_schlüssel)
+
+Geänderte Datensätze werden angehängt, der Index zeigt auf die neue Kopie.
+Übersteigt der tote Anteil COMPACT_RATIO (oder rebuild=True, Generator
+geändert, Index passt nicht zur Datei), wird die Datei sortiert neu
+geschrieben. Der Index wird erst nach den Daten ersetzt; bricht der Lauf
+dazwischen ab, passt die Größe nicht mehr und der nächste Lauf baut neu.
+
+Lesen über mmap, einzelne Datensätze ohne die ganze Datei zu parsen:
+
+    with open_bundle() as b:       # None, wenn kein (gültiges) Bundle da ist
+        d = b.get("AB123")
+
+iter_model_jsons() liefert (Dateiname, Inhalt) aller Modelle in der
+Reihenfolge von sorted(os.listdir(models/)) - aus dem Bundle, falls
+vorhanden, sonst aus den Einzeldateien; kaputte Einträge werden gemeldet
+und übersprungen (strict=True: Abbruch). Das Frontend liest einzelne
+Datensätze per HTTP-Range (docs/js/helper.js: loadModelRecord).
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import utils_json
+import utils_metrics
+from utils_output import atomic_write_bytes
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(REPO_ROOT, "docs", "data", "models")
+BUNDLE_PATH = os.path.join(REPO_ROOT, "docs", "data", "models.bundle.jsonl")
+BUNDLE_INDEX_JSON = os.path.join(REPO_ROOT, "docs", "data", "models.bundle.idx.json")
+BUNDLE_VERSION = 1
+
+ENABLED = os.environ.get("MODELS_BUNDLE", "").strip() == "1" or "--bundle" in sys.argv
+
+# Anteil toter Bytes (ersetzte/entfernte Datensätze), ab dem neu geschrieben wird
+COMPACT_RATIO = 0.5
+
+
+def _sort_key(key: str) -> str:
+    # gleiche Reihenfolge wie sorted() über die Dateinamen
+    return key + ".json"
+
+
+def load_index() -> Optional[Dict[str, Any]]:
+    """Index, wenn er zur Bundle-Datei passt (Version, Größe), sonst None."""
+    try:
+        with open(BUNDLE_INDEX_JSON, "rb") as f:
+            idx = utils_json.loads(f.read())
+        size = os.path.getsize(BUNDLE_PATH)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(idx, dict) or idx.get("version") != BUNDLE_VERSION or idx.get("size") != size:
+        return None
+    if not isinstance(idx.get("records"), dict):
+        return None
+    return idx
+
+
+def remove_bundle() -> None:
+    for path in (BUNDLE_INDEX_JSON, BUNDLE_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+            utils_metrics.count("files_removed")
+
+
+# =========================
+# Schreiben
+# =========================
+class BundleWriter:
+    def __init__(self, generator: str, rebuild: bool = False):
+        self.generator = generator
+        idx = None if rebuild else load_index()
+        if idx is not None and idx.get("generator") != generator:
+            idx = None
+        self.rebuild = idx is None
+        self.old: Dict[str, List[int]] = idx["records"] if idx else {}
+        self.old_size = int(idx["size"]) if idx else 0
+        # neue Datensätze erst in eine Temp-Datei (nicht im Speicher sammeln)
+        os.makedirs(os.path.dirname(BUNDLE_PATH), exist_ok=True)
+        self._new = tempfile.TemporaryFile(dir=os.path.dirname(BUNDLE_PATH), prefix=".tmp-bundle-")
+        self._new_pos: Dict[str, Tuple[int, int]] = {}
+        self._new_size = 0
+
+    def needs(self, key: str, changed: bool) -> bool:
+        return changed or self.rebuild or key not in self.old
+
+    def add(self, key: str, obj: Any) -> None:
+        data = utils_json.dumps(obj, compact=True)
+        self._new.write(data + b"\n")
+        self._new_pos[key] = (self._new_size, len(data))
+        self._new_size += len(data) + 1
+
+    def close(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Schreibt Daten und Index für genau keys; liefert Zahlen für die Ausgabe."""
+        keys = sorted(set(keys), key=_sort_key)
+        missing = [k for k in keys if k not in self._new_pos and k not in self.old]
+        if missing:
+            raise ValueError(f"bundle: no record for {missing[:5]}")
+
+        live = sum(self._new_pos[k][1] + 1 if k in self._new_pos else self.old[k][1] + 1 for k in keys)
+        total = self.old_size + self._new_size
+        compact = self.rebuild or (total and (total - live) / total > COMPACT_RATIO)
+        try:
+            records = self._write_compacted(keys) if compact else self._append(keys)
+        finally:
+            self._new.close()
+
+        size = os.path.getsize(BUNDLE_PATH)
+        atomic_write_bytes(BUNDLE_INDEX_JSON, utils_json.dumps({
+            "version": BUNDLE_VERSION,
+            "generator": self.generator,
+            "file": os.path.basename(BUNDLE_PATH),
+            "size": size,
+            "count": len(records),
+            "records": records,
+        }, compact=True))
+        return {"records": len(records), "added": len(self._new_pos), "bytes": size, "compacted": int(bool(compact))}
+
+    def _append(self, keys: List[str]) -> Dict[str, List[int]]:
+        self._new.seek(0)
+        with open(BUNDLE_PATH, "ab") as f:
+            shutil.copyfileobj(self._new, f)
+        utils_metrics.count("bytes_written", self._new_size)
+        records: Dict[str, List[int]] = {}
+        for k in keys:
+            if k in self._new_pos:
+                off, n = self._new_pos[k]
+                records[k] = [self.old_size + off, n]
+            else:
+                records[k] = self.old[k]
+        return records
+
+    def _write_compacted(self, keys: List[str]) -> Dict[str, List[int]]:
+        d = os.path.dirname(BUNDLE_PATH)
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=os.path.basename(BUNDLE_PATH))
+        records: Dict[str, List[int]] = {}
+        pos = 0
+        old = ModelBundle(BUNDLE_PATH, {"records": self.old}) if self.old and os.path.isfile(BUNDLE_PATH) else None
+        try:
+            self._new.seek(0)
+            new = self._new.read()
+            with os.fdopen(fd, "wb") as f:
+                for k in keys:
+                    if k in self._new_pos:
+                        off, n = self._new_pos[k]
+                        data = new[off:off + n]
+                    else:
+                        data = old.raw(k)
+                    f.write(data)
+                    f.write(b"\n")
+                    records[k] = [pos, len(data)]
+                    pos += len(data) + 1
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, BUNDLE_PATH)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            if old is not None:
+                old.close()
+        utils_metrics.count("bytes_written", pos)
+        utils_metrics.count("files_written")
+        return records
+
+
+# =========================
+# Lesen
+# =========================
+class ModelBundle:
+    def __init__(self, path: str, index: Dict[str, Any]):
+        self.records: Dict[str, List[int]] = index["records"]
+        self._f = open(path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        # mmap der Länge 0 geht nicht
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __enter__(self) -> "ModelBundle":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._f.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def keys(self) -> List[str]:
+        return sorted(self.records, key=_sort_key)
+
+    def raw(self, key: str) -> bytes:
+        off, n = self.records[key]
+        return self._mm[off:off + n]
+
+    def get(self, key: str) -> Any:
+        data = self.raw(key)
+        utils_metrics.count("bytes_read", len(data))
+        return utils_json.loads(data)
+
+
+def open_bundle() -> Optional[ModelBundle]:
+    idx = load_index()
+    return ModelBundle(BUNDLE_PATH, idx) if idx is not None else None
+
+
+def _model_json(fn: str, load: Callable[[], Any], strict: bool) -> Optional[Dict[str, Any]]:
+    try:
+        d = load()
+    except (OSError, ValueError) as e:
+        if strict:
+            raise ValueError(f"{fn}: {e}") from e
+        print(f"[bundle] skip unreadable model json: {fn} ({e})", file=sys.stderr)
+        return None
+    if not isinstance(d, dict):
+        if strict:
+            raise ValueError(f"{fn}: kein JSON-Objekt")
+        print(f"[bundle] skip non-dict model json: {fn}", file=sys.stderr)
+        return None
+    return d
+
+
+def iter_model_jsons(models_dir: str = MODELS_DIR, strict: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    (Dateiname, Inhalt) aller Modell-JSONs. Nicht lesbare Dateien und
+    Inhalte, die kein Objekt sind, werden mit Hinweis auf stderr
+    übersprungen; strict=True bricht stattdessen mit ValueError ab.
+    """
+    bundle = open_bundle() if os.path.abspath(models_dir) == MODELS_DIR else None
+    if bundle is not None:
+        with bundle:
+            for key in bundle.keys():
+                fn = _sort_key(key)
+                d = _model_json(fn, lambda: bundle.get(key), strict)
+                if d is not None:
+                    yield fn, d
+        return
+
+    if not os.path.isdir(models_dir):
+        return
+    for fn in sorted(os.listdir(models_dir)):
+        if not fn.lower().endswith(".json"):
+            continue
+        path = os.path.join(models_dir, fn)
+        d = _model_json(fn, lambda: utils_json.read_json(path), strict)
+        if d is not None:
+            yield fn, d
@@ -0,0 +1,121 @@
+# tools/utils_cache.py
+"""
+Persistenter Cache für geparste/normalisierte Eingaben unter .cache/parsed.
+
+Schlüssel = Art + Inhalts-Hash der Quelldatei + Parser-Version (+ Optionen),
+d.h. geänderte Dateien oder ein geänderter Parser erzeugen automatisch einen
+neuen Eintrag. Die Gesamtgröße ist begrenzt (älteste Einträge fliegen raus).
+
+Abschalten: --no-cache auf der Kommandozeile oder NO_CACHE=1.
+Größe: PARSED_CACHE_MAX_MB (Default 256).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Tuple
+
+import utils_metrics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "parsed")
+
+CACHE_MAX_BYTES = int(os.environ.get("PARSED_CACHE_MAX_MB", "256") or 256) * 1024 * 1024
+
+ENABLED = "--no-cache" not in sys.argv and os.environ.get("NO_CACHE", "").strip() != "1"
+
+# In-Prozess-Memo: (path, mtime_ns, size) -> sha1
+_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def set_enabled(enabled: bool) -> None:
+    global ENABLED
+    ENABLED = enabled
+
+
+def file_digest(path: str) -> str:
+    """sha1 des Dateiinhalts; pro Prozess nur einmal je (Pfad, mtime, Größe) berechnet."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    d = _DIGESTS.get(memo_key)
+    if d is None:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        d = h.hexdigest()
+        _DIGESTS[memo_key] = d
+    return d
+
+
+def _entry_path(kind: str, parts: Tuple[Any, ...]) -> str:
+    key = hashlib.sha1(repr((kind,) + tuple(parts)).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{kind}-{key}.pickle")
+
+
+def load_or_build(kind: str, parts: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+    """
+    Liefert den gecachten Wert für (kind, parts) oder baut ihn mit build()
+    und legt ihn ab. parts muss Inhalts-Hash und Versionsnummer enthalten.
+    """
+    if not ENABLED:
+        return build()
+
+    path = _entry_path(kind, parts)
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            utils_metrics.count_file_read(path)
+            os.utime(path)  # für die Verdrängung (zuletzt benutzt)
+            return value
+        except Exception as e:
+            print(f"[cache] ignoring unreadable entry {os.path.basename(path)}: {e}")
+
+    value = build()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # atomar schreiben, damit parallele Läufe keine halben Dateien sehen
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        evict()
+    except OSError as e:
+        print(f"[cache] could not store {kind}: {e}")
+    return value
+
+
+def evict(max_bytes: int | None = None) -> int:
+    """Löscht die am längsten nicht benutzten Einträge, bis das Limit passt."""
+    limit = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for fn in os.listdir(CACHE_DIR):
+        p = os.path.join(CACHE_DIR, fn)
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+        total += st.st_size
+
+    removed = 0
+    for _mtime, size, p in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(p)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        print(f"[cache] evicted {removed} entries (size now {total} bytes)")
+    return removed
@@ -0,0 +1,163 @@
+# tools/utils_convert.py
+"""
+Gemeinsame Typ-Konvertierungen für CSV-Zellen und gescrapte Texte.
+
+Alle Muster sind vorkompiliert. Konverter für Werte, die sich pro Zeile
+stark wiederholen (Datumsangaben, Preise, Flags, Maßstäbe), sind per
+lru_cache memoisiert; sie liefern nur unveränderliche Werte zurück.
+Kosten pro Aufruf: siehe tools/bench_convert.py.
+"""
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DE_DATE_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$")
+HHMM_RE = re.compile(r"^(\d{1,2}):(\d{2})(?::\d{2})?$")
+SCALE_RE = re.compile(r"\b1\s*:\s*(\d{2,4})\b")
+SPACE_RE = re.compile(r"\s+")
+YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+SIZE_MM_RE = re.compile(r"(\d{2,3})\s*[x×]\s*(\d{2,3})\s*mm", re.IGNORECASE)
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+TRUE_VALUES = frozenset(("x", "1", "true", "wahr", "yes", "ja"))
+FALSE_VALUES = frozenset(("0", "false", "falsch", "no", "nein"))
+
+# Genug für alle unterschiedlichen Werte einer großen Sammlung
+_MEMO = 65536
+
+
+@lru_cache(maxsize=_MEMO)
+def to_bool_x(v: str) -> Optional[bool]:
+    v = (v or "").strip().lower()
+    if v in TRUE_VALUES:
+        return True
+    if v in FALSE_VALUES:
+        return False
+    return None
+
+
+@lru_cache(maxsize=_MEMO)
+def to_float(v: str) -> Optional[float]:
+    v = (v or "").strip()
+    if not v:
+        return None
+    v = v.replace("€", "").replace(" ", "")
+    v = v.replace(",", ".")
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=_MEMO)
+def parse_price(v: str) -> Optional[float]:
+    """Preis aus postcards_raw ('P:1,35'): Komma als Dezimaltrenner, sonst unverändert."""
+    if not v:
+        return None
+    v = v.replace(",", ".").strip()
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=_MEMO)
+def excel_serial_to_iso(v: str) -> Optional[str]:
+    """
+    Excel-Seriendatum (z.B. 45799) -> YYYY-MM-DD
+    """
+    v = (v or "").strip()
+    if not v:
+        return None
+    if ISO_DATE_RE.match(v):
+        return v
+    m = DE_DATE_RE.match(v)
+    if m:
+        try:
+            return date(int(m.group(3)), int(m.group(2)), int(m.group(1))).isoformat()
+        except ValueError:
+            pass
+    try:
+        n = int(float(v))
+        return (EXCEL_EPOCH + timedelta(days=n)).isoformat()
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=_MEMO)
+def excel_time_to_hhmm(v: str) -> str:
+    """
+    Excel-Tagesanteil (z.B. '0,586805555555556') -> 'HH:MM'.
+    'HH:MM' / 'HH:MM:SS' bleibt (gekürzt auf HH:MM); wie formatTimeExcel in docs/js.
+    Nicht lesbare Werte -> "".
+    """
+    s = (v or "").strip()
+    if not s:
+        return ""
+    m = HHMM_RE.match(s)
+    if m:
+        return f"{int(m.group(1)):02d}:{m.group(2)}"
+    try:
+        num = float(s.replace(",", "."))
+    except ValueError:
+        return ""
+    if num != num or num in (float("inf"), float("-inf")):
+        return ""
+    total_seconds = round(num * 24 * 60 * 60)
+    hh = (total_seconds // 3600) % 24
+    mm = (total_seconds % 3600) // 60
+    return f"{hh:02d}:{mm:02d}"
+
+
+@lru_cache(maxsize=_MEMO)
+def parse_scale_from_text(text: str) -> Optional[str]:
+    """
+    Finds scale patterns like 1:400, 1 : 200, 1:87 in free text.
+    Also supports Excel-text marker prefix: '1:350
+    Returns normalized '1:XXX' or None.
+    """
+    t = (text or "").strip()
+    if not t:
+        return None
+
+    # Excel export: leading apostrophe to force text (e.g. '1:350)
+    if t.startswith("'"):
+        t = t[1:].strip()
+
+    m = SCALE_RE.search(t)
+    if not m:
+        return None
+    return f"1:{m.group(1)}"
+
+
+def norm_space(s: str) -> str:
+    return SPACE_RE.sub(" ", (s or "").strip())
+
+
+@lru_cache(maxsize=_MEMO)
+def parse_year(val: str) -> Optional[int]:
+    m = YEAR_RE.search(val or "")
+    if not m:
+        return None
+    return int(m.group(1))
+
+
+@lru_cache(maxsize=_MEMO)
+def _parse_size_mm(val: str) -> Optional[Tuple[int, int]]:
+    m = SIZE_MM_RE.search(norm_space(val))
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2))
+
+
+def parse_size_mm(val: str) -> Optional[Dict[str, int]]:
+    # dict wird pro Aufruf neu gebaut, damit kein gecachtes Objekt geteilt wird
+    wh = _parse_size_mm(val)
+    if wh is None:
+        return None
+    return {"w": wh[0], "h": wh[1]}
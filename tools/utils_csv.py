@@ -0,0 +1,482 @@
+# tools/utils_csv.py
+"""
+CSV-Einlesen für die build_*-Skripte.
+
+Die Datei wird einmal als Bytes gelesen, das Encoding aus den Bytes bestimmt
+(BOM + Prüfung der Nicht-ASCII-Abschnitte) und der Inhalt genau einmal
+dekodiert und geparst. Der Header wird einmal gelesen, jede Zeile wird ein
+schlankes Record-Tuple mit gestrippten Feldern.
+
+Für große Stammdaten gibt es zusätzlich eine spaltenorientierte Darstellung
+(ColumnTable): pro Spalte ein array mit Codes in die internierten Werte.
+
+Sehr große Exporte können mit CSV_WORKERS=<n>|auto blockweise in einem
+Prozess-Pool geparst werden; die Blöcke werden an Datensatzgrenzen
+(auch bei Zeilenumbrüchen in gequoteten Feldern) geschnitten und in
+Dateireihenfolge zusammengeführt.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import hashlib
+import io
+import keyword
+import os
+import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import utils_cache
+import utils_metrics
+
+# Bei Änderungen an Parser/Normalisierung erhöhen -> alte Cache-Einträge ungültig
+PARSER_VERSION = 1
+
+# Zusammenhängende Nicht-ASCII-Bytes. Eine UTF-8-Multibyte-Sequenz besteht nur
+# aus Bytes >= 0x80, daher ist die Datei genau dann gültiges UTF-8, wenn jeder
+# dieser Abschnitte für sich gültiges UTF-8 ist.
+_HIGH_RUN_RE = re.compile(rb"[\x80-\xff]+")
+
+# Bytes, die in CP1252 nicht belegt sind -> dann nur noch latin-1 möglich
+_CP1252_UNDEFINED = frozenset(b"\x81\x8d\x8f\x90\x9d")
+
+# Erkanntes Encoding pro Datei-Hash (sha1 der Rohbytes)
+_ENCODING_CACHE: Dict[str, str] = {}
+
+
+def file_hash(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def detect_encoding(raw: bytes) -> str:
+    """
+    Bestimmt das Encoding einer Excel/CSV-Datei aus den Rohbytes.
+    Returns one of utf-8-sig, utf-8, cp1252, latin-1.
+    """
+    has_bom = raw.startswith(codecs.BOM_UTF8)
+    body = raw[len(codecs.BOM_UTF8):] if has_bom else raw
+
+    if body.isascii():
+        return "utf-8-sig" if has_bom else "utf-8"
+
+    utf8_ok = True
+    cp1252_ok = True
+    for m in _HIGH_RUN_RE.finditer(body):
+        chunk = m.group(0)
+        if utf8_ok:
+            try:
+                chunk.decode("utf-8")
+            except UnicodeDecodeError:
+                utf8_ok = False
+        if cp1252_ok and not _CP1252_UNDEFINED.isdisjoint(chunk):
+            cp1252_ok = False
+        if not utf8_ok and not cp1252_ok:
+            break
+
+    if utf8_ok:
+        return "utf-8-sig" if has_bom else "utf-8"
+    # Wie bisher: ohne gültiges UTF-8 bleibt ein evtl. BOM als Text stehen
+    return "cp1252" if cp1252_ok else "latin-1"
+
+
+def read_text(path: str, digest: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Liest eine Datei einmal, erkennt das Encoding und dekodiert genau einmal.
+    Returns (text, encoding).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    utils_metrics.count("bytes_read", len(raw))
+
+    key = digest or file_hash(raw)
+    enc = _ENCODING_CACHE.get(key)
+    if enc is None:
+        enc = detect_encoding(raw)
+        _ENCODING_CACHE[key] = enc
+        print(f"[read_csv] {os.path.basename(path)}: encoding={enc} bytes={len(raw)}")
+
+    return raw.decode(enc), enc
+
+
+class Record(tuple):
+    """
+    Eine CSV-Zeile als Tuple mit bereits gestrippten Feldern.
+    Spalten sind als Attribute erreichbar (r.model_id); die Attribute werden
+    pro Header einmal als itemgetter-Properties kompiliert (make_record_type).
+    Spaltennamen, die mit Methoden (get, keys, count, index, ...) oder
+    Schlüsselwörtern (from) kollidieren, heißen als Attribut name_ (r.from_).
+    Spalten außerhalb des Headers -> AttributeError (Tippfehler fallen auf);
+    optionale Spalten über r.get("x") lesen, das liefert "".
+    """
+
+    __slots__ = ()
+    _index: Dict[str, int] = {}
+    _header: Tuple[str, ...] = ()
+
+    def get(self, name: str, default: str = "") -> str:
+        i = self._index.get(name)
+        return self[i] if i is not None else default
+
+    def keys(self) -> List[str]:
+        return list(self._index.keys())
+
+    def as_dict(self) -> Dict[str, str]:
+        return {k: self[i] for k, i in self._index.items()}
+
+    def __getattr__(self, name: str) -> str:
+        # nur für Namen ohne Property, d.h. Spalten, die es im Header nicht gibt
+        raise AttributeError(f"no column {name!r} (header: {', '.join(self._header)})")
+
+
+def attribute_name(column: str) -> Optional[str]:
+    """Attributname einer Spalte (None = nur über get() erreichbar)."""
+    if not column.isidentifier():
+        return None
+    if keyword.iskeyword(column) or hasattr(Record, column):
+        return column + "_"
+    return column
+
+
+def make_record_type(header: List[str]) -> type:
+    # bei doppelten Spaltennamen gewinnt wie bei csv.DictReader die letzte
+    index = {name: i for i, name in enumerate(header)}
+    ns: Dict[str, Any] = {"__slots__": (), "_index": index, "_header": tuple(header)}
+    for name, i in index.items():
+        attr = attribute_name(name)
+        # "count" und "count_" im selben Header: die echte Spalte gewinnt
+        if attr is not None and (attr == name or attr not in index):
+            ns[attr] = property(itemgetter(i))
+    return type("Record", (Record,), ns)
+
+
+def _empty(_row: Any) -> str:
+    return ""
+
+
+class Table:
+    """
+    Eine geparste CSV-Datei: Header plus Record-Zeilen (gestrippt).
+    Mit keep_raw=True bleiben zusätzlich die ungestrippten Werte erhalten,
+    z.B. für Tabellen, die 1:1 in die Modell-JSONs übernommen werden.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: List[str],
+        rows: List[Record],
+        raw_rows: Optional[List[Tuple[str, ...]]] = None,
+        encoding: str = "",
+    ):
+        self.path = path
+        self.header = header
+        self.index = {name: i for i, name in enumerate(header)}
+        self.rows = rows
+        self.raw_rows = raw_rows
+        self.encoding = encoding
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i: int) -> Record:
+        return self.rows[i]
+
+    def getter(self, name: str) -> Callable[[Record], str]:
+        """Kompilierter Zugriff auf eine Spalte; fehlende Spalten liefern ""."""
+        i = self.index.get(name)
+        return itemgetter(i) if i is not None else _empty
+
+    def find_column(self, candidates: List[str]) -> Optional[str]:
+        """Case-insensitive Suche nach der ersten vorhandenen Spalte."""
+        lower_map = {k.lower(): k for k in self.header}
+        for c in candidates:
+            k = lower_map.get(c.lower())
+            if k:
+                return k
+        return None
+
+    # Records sind dynamische Klassen -> für pickle als einfache Tupel ablegen
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["rows"] = [tuple(r) for r in self.rows]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        rec_type = make_record_type(state["header"])
+        state["rows"] = list(map(rec_type, state["rows"]))
+        self.__dict__.update(state)
+
+    def raw_by_key(self, key_field: str) -> Dict[str, Dict[str, str]]:
+        """Ungestrippte Zeilen als dict, indiziert nach key_field (erste Zeile gewinnt)."""
+        idx: Dict[str, Dict[str, str]] = {}
+        if not key_field or self.raw_rows is None:
+            return idx
+        get_key = self.getter(key_field)
+        for rec, raw in zip(self.rows, self.raw_rows):
+            k = get_key(rec)
+            if k and k not in idx:
+                idx[k] = dict(zip(self.header, raw))
+        return idx
+
+
+def csv_workers() -> int:
+    """
+    Anzahl Prozesse für das parallele Einlesen großer CSVs.
+    CSV_WORKERS=0/leer: seriell, CSV_WORKERS=auto: alle CPUs, sonst Zahl.
+    """
+    v = os.environ.get("CSV_WORKERS", "").strip().lower()
+    if v == "auto":
+        return os.cpu_count() or 1
+    return int(v) if v.isdigit() else 0
+
+
+def _next_record_end(text: str, pos: int, quotes: int, last: int) -> Tuple[int, int, int]:
+    """
+    Sucht ab pos das nächste Zeilenende, das nicht in einem gequoteten Feld
+    liegt (gerade Anzahl '"' davor; "" als Escape ändert die Parität nicht).
+    quotes/last: Anzahl '"' in text[:last], wird inkrementell fortgeschrieben.
+    Returns (Position nach dem Zeilenende, quotes, last).
+    """
+    while True:
+        nl = text.find("\n", pos)
+        if nl < 0:
+            return len(text), quotes, last
+        quotes += text.count('"', last, nl)
+        last = nl
+        if quotes % 2 == 0:
+            return nl + 1, quotes, last
+        pos = nl + 1
+
+
+def split_records(text: str, start: int, parts: int) -> List[Tuple[int, int]]:
+    """Teilt text[start:] in bis zu parts Bereiche, jeweils an Datensatzgrenzen."""
+    end = len(text)
+    bounds = [start]
+    quotes, last = text.count('"', 0, start), start
+    for k in range(1, parts):
+        target = start + (end - start) * k // parts
+        if target <= bounds[-1]:
+            continue
+        pos, quotes, last = _next_record_end(text, target, quotes + text.count('"', last, target), target)
+        if pos >= end:
+            break
+        bounds.append(pos)
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _rows(text: str, delimiter: str, n: int) -> Iterator[List[str]]:
+    for row in csv.reader(io.StringIO(text, newline=""), delimiter=delimiter):
+        # Leerzeilen überspringen (wie csv.DictReader)
+        if not row:
+            continue
+        if len(row) != n:
+            # fehlende Felder wie bisher als "", überzählige verwerfen
+            row = (row + [""] * n)[:n]
+        yield row
+
+
+def _parse_chunk(args: Tuple[str, str, int, bool]) -> Tuple[List[Tuple[str, ...]], Optional[List[Tuple[str, ...]]]]:
+    """Worker: parst einen Textblock zu gestrippten (und ggf. rohen) Tupeln."""
+    text, delimiter, n, keep_raw = args
+    strip = str.strip
+    rows: List[Tuple[str, ...]] = []
+    raws: Optional[List[Tuple[str, ...]]] = [] if keep_raw else None
+    for row in _rows(text, delimiter, n):
+        rows.append(tuple(map(strip, row)))
+        if raws is not None:
+            raws.append(tuple(row))
+    return rows, raws
+
+
+# Unterhalb dieser Größe lohnt der Prozess-Pool nicht
+PARALLEL_MIN_CHARS = 4 * 1024 * 1024
+
+
+def _parse(
+    text: str, delimiter: str, keep_raw: bool, workers: Optional[int]
+) -> Tuple[List[str], Iterator[Tuple[Any, Optional[Tuple[str, ...]]]]]:
+    """
+    Liest den Header und liefert die Datenzeilen als (gestrippt, roh) in
+    Dateireihenfolge - seriell oder blockweise in einem Prozess-Pool.
+    """
+    header_end, _q, _l = _next_record_end(text, 0, 0, 0)
+    header = next(csv.reader(io.StringIO(text[:header_end], newline=""), delimiter=delimiter), None) or []
+    n = len(header)
+    if workers is None:
+        workers = csv_workers()
+
+    def serial() -> Iterator[Tuple[Any, Optional[Tuple[str, ...]]]]:
+        strip = str.strip
+        for row in _rows(text[header_end:], delimiter, n):
+            yield map(strip, row), (tuple(row) if keep_raw else None)
+
+    def parallel() -> Iterator[Tuple[Any, Optional[Tuple[str, ...]]]]:
+        spans = split_records(text, header_end, workers * 4)
+        jobs = [(text[a:b], delimiter, n, keep_raw) for a, b in spans]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            # map() liefert die Blöcke in Eingabereihenfolge
+            for rows, raws in ex.map(_parse_chunk, jobs):
+                if raws is None:
+                    for r in rows:
+                        yield r, None
+                else:
+                    yield from zip(rows, raws)
+
+    if workers > 1 and len(text) - header_end >= PARALLEL_MIN_CHARS:
+        return header, parallel()
+    return header, serial()
+
+
+def read_table(
+    path: str, delimiter: str = ";", keep_raw: bool = False, workers: Optional[int] = None
+) -> Table:
+    if not os.path.exists(path):
+        return Table(path, [], [])
+
+    digest = utils_cache.file_digest(path)
+
+    def build() -> Table:
+        # Excel-Exports sind oft CP1252/ANSI statt UTF-8
+        text, enc = read_text(path, digest)
+
+        header, parsed = _parse(text, delimiter, keep_raw, workers)
+        rec_type = make_record_type(header)
+
+        rows: List[Record] = []
+        raw_rows: Optional[List[Tuple[str, ...]]] = [] if keep_raw else None
+        for values, raw in parsed:
+            rows.append(rec_type(values))
+            if raw_rows is not None:
+                raw_rows.append(raw)
+
+        return Table(path, header, rows, raw_rows=raw_rows, encoding=enc)
+
+    table = utils_cache.load_or_build("table", (digest, PARSER_VERSION, delimiter, keep_raw), build)
+    table.path = path
+    utils_metrics.count("rows_read", len(table))
+    return table
+
+
+class RowView:
+    """Zeilenansicht auf eine ColumnTable (ohne Kopie der Werte)."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "ColumnTable", i: int):
+        self._table = table
+        self._i = i
+
+    def get(self, name: str, default: str = "") -> str:
+        c = self._table.index.get(name)
+        if c is None:
+            return default
+        return self._table._values[c][self._table._codes[c][self._i]]
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class ColumnTable:
+    """
+    Spaltenorientierte, dictionary-kodierte Tabelle.
+    Jede Spalte ist ein array('I') mit Codes; die unterschiedlichen Werte
+    (Hersteller, Airline, Status, Rumpf, Reichweite, ...) liegen pro Spalte
+    genau einmal und interniert vor. Der Speicher wächst mit 4 Bytes pro
+    Zelle plus den unterschiedlichen Werten, nicht mit einem dict pro Zeile.
+    """
+
+    def __init__(self, path: str, header: List[str]):
+        self.path = path
+        self.header = header
+        self.index = {name: i for i, name in enumerate(header)}
+        self._values: List[List[str]] = [[] for _ in header]
+        self._lookup: List[Dict[str, int]] = [{} for _ in header]
+        self._codes: List[array] = [array("I") for _ in header]
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[RowView]:
+        for i in range(self._n):
+            yield RowView(self, i)
+
+    def row(self, i: int) -> RowView:
+        return RowView(self, i)
+
+    def append(self, row: Any) -> None:
+        """Fügt eine Zeile mit bereits gestrippten Werten hinzu (Länge = Header)."""
+        for c, v in enumerate(row):
+            lookup = self._lookup[c]
+            code = lookup.get(v)
+            if code is None:
+                code = len(self._values[c])
+                lookup[v] = code
+                self._values[c].append(sys.intern(v))
+            self._codes[c].append(code)
+        self._n += 1
+
+    def getter(self, name: str) -> Callable[[int], str]:
+        """Kompilierter Zugriff Zeilennummer -> Wert; fehlende Spalten liefern ""."""
+        c = self.index.get(name)
+        if c is None:
+            return _empty
+        codes = self._codes[c]
+        values = self._values[c]
+        return lambda i: values[codes[i]]
+
+    def distinct(self, name: str) -> List[str]:
+        """Alle unterschiedlichen Werte einer Spalte (in Reihenfolge des Auftretens)."""
+        c = self.index.get(name)
+        return list(self._values[c]) if c is not None else []
+
+    def positions_by(self, key_field: str) -> Dict[str, int]:
+        """
+        Zeilennummer nach key_field; bei Duplikaten gewinnt wie bei
+        {key: row for row in rows} die letzte Zeile (Reihenfolge der
+        Schlüssel: erstes Vorkommen).
+        """
+        idx: Dict[str, int] = {}
+        get_key = self.getter(key_field)
+        for i in range(self._n):
+            k = get_key(i)
+            if k:
+                idx[k] = i
+        return idx
+
+    @classmethod
+    def from_table(cls, table: Table) -> "ColumnTable":
+        ct = cls(table.path, table.header)
+        for r in table:
+            ct.append(r)
+        return ct
+
+
+def read_columns(path: str, delimiter: str = ";", workers: Optional[int] = None) -> ColumnTable:
+    """Wie read_table, baut aber direkt die ColumnTable ohne Record-Zwischenliste."""
+    if not os.path.exists(path):
+        return ColumnTable(path, [])
+
+    digest = utils_cache.file_digest(path)
+
+    def build() -> ColumnTable:
+        text, _enc = read_text(path, digest)
+
+        header, parsed = _parse(text, delimiter, False, workers)
+        ct = ColumnTable(path, header)
+        for values, _raw in parsed:
+            ct.append(values)
+        return ct
+
+    ct = utils_cache.load_or_build("columns", (digest, PARSER_VERSION, delimiter), build)
+    ct.path = path
+    utils_metrics.count("rows_read", len(ct))
+    return ct
@@ -0,0 +1,237 @@
+# tools/utils_dataset.py
+"""
+Gemeinsame Eingabeschicht für die build_*-Skripte.
+
+Jede CSV wird höchstens einmal pro Prozess gelesen und normalisiert, die
+Lookup-Indizes (aircraft_id, logo_id, Livery-Code) werden einmal gebaut.
+Die Skripte holen sich die Tabellen über get_dataset() bzw. bekommen ein
+Dataset als Argument an main(ds) übergeben, wenn sie im selben Prozess laufen.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+from utils_csv import ColumnTable, Record, Table, read_columns, read_table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODELS_CSV = os.path.join(REPO_ROOT, "models_export.csv")
+PAX_CSV = os.path.join(REPO_ROOT, "data", "passenger_aircraft_full.csv")
+LIV_CSV = os.path.join(REPO_ROOT, "data", "liveries.csv")
+AIRLINE_LOGOS_CSV = os.path.join(REPO_ROOT, "data", "airline_logos.csv")
+FLIGHTS_CSV = os.path.join(REPO_ROOT, "data", "flights_export.csv")
+GROUP_TYPES_CSV = os.path.join(REPO_ROOT, "data", "group_aircraft_types.csv")
+AIRPORTS_CSV = os.path.join(REPO_ROOT, "data", "airports.csv")
+
+TRUTHY = ("wahr", "true", "1", "x", "ja", "yes")
+
+# In liveries kann der Schlüssel unterschiedlich heißen; wir versuchen mehrere typische
+LIVERY_KEY_CANDIDATES = [
+    "Livery_ID", "livery_id",
+    "LiveryId", "liveryid",
+    "Livery_Code", "livery_code",
+    "Code", "code",
+]
+
+
+def index_by_key(table: Table, key_field: str) -> Dict[str, Record]:
+    """Index nach key_field; bei Duplikaten gewinnt die erste Zeile."""
+    idx: Dict[str, Record] = {}
+    if not key_field:
+        return idx
+    get_key = table.getter(key_field)
+    for r in table:
+        k = get_key(r)
+        if k and k not in idx:
+            idx[k] = r
+    return idx
+
+
+# =========================
+# Status-Logik (vorhanden / bestellt / Wunsch)
+# =========================
+def is_present(row) -> bool:
+    return row.get("vorhanden").lower() in TRUTHY
+
+
+def is_ordered(row) -> bool:
+    """
+    Bestellt = bestellt_am gesetzt UND noch nicht angekommen UND NICHT vorhanden
+    """
+    return (not is_present(row)) and bool(row.get("bestellt_am")) and (not row.get("angekommen"))
+
+
+def is_wishlist(row) -> bool:
+    """
+    Wunschmodell = explizit als Wunsch markiert,
+    aber nicht vorhanden und nicht bestellt.
+    Unterstützt mehrere mögliche Spaltennamen.
+    """
+    v = (
+        row.get("Wunsch")
+        or row.get("wunsch")
+        or row.get("wishlist")
+        or row.get("wish")
+        or ""
+    ).lower()
+
+    return v in TRUTHY and not is_present(row) and not is_ordered(row)
+
+
+def resolve_status(
+    row, arrived_iso: Optional[str], ordered_iso: Optional[str], wishlist_flag: bool
+) -> Tuple[bool, bool, bool, str]:
+    """
+    Status eines Modells für die Modell-JSONs und index.json.
+    Returns (present, ordered, wishlist, status).
+    """
+    # present: entweder Flag ODER angekommen-Datum
+    present = is_present(row) or bool(arrived_iso)
+
+    # ordered: bestellt_am vorhanden, aber NICHT present
+    ordered = bool(ordered_iso) and not present
+
+    # wishlist nur wenn weder present noch ordered
+    wishlist = wishlist_flag and not present and not ordered
+
+    # finaler Status
+    if present:
+        status = "owned"
+    elif ordered:
+        status = "ordered"
+    elif wishlist:
+        status = "wishlist"
+    else:
+        status = "none"
+    return present, ordered, wishlist, status
+
+
+class locked_cached_property(cached_property):
+    """
+    cached_property, das unter dem Lock der Instanz (_lazy_lock) berechnet.
+    functools.cached_property sperrt seit Python 3.12 nicht mehr; build_all
+    teilt ein Dataset zwischen den Stufen-Threads, ohne Lock würde eine
+    Tabelle dann ggf. mehrfach geparst. RLock, weil Indizes ihre Tabellen
+    lazy nachladen. Nach dem ersten Zugriff liegt der Wert in __dict__ und
+    der Deskriptor (und damit der Lock) wird nicht mehr gefragt.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._lazy_lock:
+            cache = instance.__dict__
+            if self.attrname in cache:
+                return cache[self.attrname]
+            return super().__get__(instance, owner)
+
+
+class Dataset:
+    """
+    Alle Eingabetabellen des Builds. Jede Tabelle und jeder Index wird beim
+    ersten Zugriff geladen und danach wiederverwendet (auch aus mehreren
+    Threads, siehe locked_cached_property).
+    """
+
+    def __init__(self, root: str = REPO_ROOT):
+        self.root = root
+        self._lazy_lock = threading.RLock()
+        # Ergebnisse früherer Stufen im selben Prozess (z.B. "flights.json" -> Payload),
+        # damit build_all die Daten nicht über die Platte weiterreichen muss
+        self.outputs: Dict[str, Any] = {}
+
+    def input_path(self, default: str) -> str:
+        """Pfad einer Eingabedatei relativ zu diesem Dataset-Root."""
+        return os.path.join(self.root, os.path.relpath(default, REPO_ROOT))
+
+    def _table(self, default: str, delimiter: str = ";", keep_raw: bool = False) -> Table:
+        return read_table(self.input_path(default), delimiter=delimiter, keep_raw=keep_raw)
+
+    # ---------- tables ----------
+    @locked_cached_property
+    def models(self) -> Table:
+        return self._table(MODELS_CSV)
+
+    @locked_cached_property
+    def pax(self) -> Table:
+        # ungestrippte Werte für aircraft_full_v8 in den Modell-JSONs
+        return self._table(PAX_CSV, keep_raw=True)
+
+    @locked_cached_property
+    def liveries(self) -> Table:
+        # ungestrippte Werte für livery_full in den Modell-JSONs
+        return self._table(LIV_CSV, keep_raw=True)
+
+    @locked_cached_property
+    def logos(self) -> Table:
+        return self._table(AIRLINE_LOGOS_CSV)
+
+    @locked_cached_property
+    def flights(self) -> Table:
+        return self._table(FLIGHTS_CSV)
+
+    @locked_cached_property
+    def group_types(self) -> Table:
+        return self._table(GROUP_TYPES_CSV)
+
+    @locked_cached_property
+    def airports(self) -> Table:
+        return self._table(AIRPORTS_CSV, delimiter=",")
+
+    # ---------- column stores ----------
+    def _columns(self, table_attr: str, default: str) -> ColumnTable:
+        # Wurde die Tabelle schon als Records geladen, nicht erneut parsen
+        if table_attr in self.__dict__:
+            return ColumnTable.from_table(self.__dict__[table_attr])
+        return read_columns(self.input_path(default))
+
+    @locked_cached_property
+    def models_columns(self) -> ColumnTable:
+        return self._columns("models", MODELS_CSV)
+
+    @locked_cached_property
+    def pax_columns(self) -> ColumnTable:
+        return self._columns("pax", PAX_CSV)
+
+    @locked_cached_property
+    def group_types_columns(self) -> ColumnTable:
+        return self._columns("group_types", GROUP_TYPES_CSV)
+
+    # ---------- indexes ----------
+    @locked_cached_property
+    def pax_by_id(self) -> Dict[str, Record]:
+        return index_by_key(self.pax, "aircraft_id")
+
+    @locked_cached_property
+    def pax_raw_by_id(self) -> Dict[str, Dict[str, str]]:
+        return self.pax.raw_by_key("aircraft_id")
+
+    @locked_cached_property
+    def logos_by_id(self) -> Dict[str, Record]:
+        return index_by_key(self.logos, "logo_id")
+
+    @locked_cached_property
+    def livery_key(self) -> Optional[str]:
+        return self.liveries.find_column(LIVERY_KEY_CANDIDATES)
+
+    @locked_cached_property
+    def liveries_by_code(self) -> Dict[str, Record]:
+        return index_by_key(self.liveries, self.livery_key) if self.livery_key else {}
+
+    @locked_cached_property
+    def liveries_raw_by_code(self) -> Dict[str, Dict[str, str]]:
+        return self.liveries.raw_by_key(self.livery_key) if self.livery_key else {}
+
+
+_DATASET: Optional[Dataset] = None
+
+
+def get_dataset() -> Dataset:
+    """Prozessweites Dataset (wird beim ersten Aufruf angelegt)."""
+    global _DATASET
+    if _DATASET is None:
+        _DATASET = Dataset()
+    return _DATASET
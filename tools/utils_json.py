@@ -0,0 +1,133 @@
+# tools/utils_json.py
+"""
+JSON-Codec für alle Skripte unter tools/: orjson, falls installiert, sonst
+die Standardbibliothek. Beide liefern für dieselben Daten dieselben Bytes
+(ensure_ascii=False, indent=2 bzw. kompakte Trenner wie bisher).
+
+    data = utils_json.read_json(path)
+    raw = utils_json.dumps(obj)                   # bytes, indent=2
+    raw = utils_json.dumps(obj, compact=True)     # (",", ":")
+
+JSON_BACKEND=stdlib erzwingt die Standardbibliothek (z.B. zum Vergleichen,
+siehe tools/bench_json.py).
+
+Wo orjson anders formatiert, übernimmt die Standardbibliothek:
+- Floats mit Exponent (|x| < 1e-4 oder >= 1e16): orjson schreibt 1e-5 /
+  0.00001 statt 1e-05, 1e16 statt 1e+16. Erkannt wird das an der Ausgabe
+  (Zahl-Token zwischen JSON-Trennern); ein Fehlalarm in einem String kostet
+  nur den langsameren Weg.
+- andere Einrückung als 2, indent=None ohne compact (", " / ": "),
+  Nicht-String-Schlüssel, Ganzzahlen über 64 Bit, Verschachtelung > 254.
+- Lesen: Ganzzahlen ab 19 Stellen (orjson macht daraus Floats), BOM,
+  NaN/Infinity-Literale.
+NaN/Infinity werden in beiden Modi als null geschrieben (orjson macht das
+immer; das NaN der Standardbibliothek wäre ohnehin kein gültiges JSON).
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Any, Optional, Union
+
+import utils_metrics
+
+try:
+    import orjson
+except ImportError:  # optional, siehe requirements-data.txt
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None and os.environ.get("JSON_BACKEND", "").strip().lower() != "stdlib" else "stdlib"
+
+COMPACT_SEPARATORS = (",", ":")
+
+if orjson is not None:
+    # nicht nativ serialisieren, was die Standardbibliothek ablehnt
+    _ORJSON_OPTS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# Suche über bytes.translate + "in" statt re: auf MB-großen Dateien ~10x schneller
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_TOKEN_BEFORE = b" :[,\n"
+_TOKEN_AFTER = b",\n]}"
+# Ganzzahl, die über 64 Bit gehen kann
+_BIG_INT = b"0" * 19
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def _finite(obj: Any) -> Any:
+    """Kopie von obj mit NaN/Infinity -> None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _number_at(t: bytes, i: int, n: int) -> bool:
+    """Ist t[i:i+n] Teil eines Zahl-Tokens (t: Ziffern auf 0 abgebildet)?"""
+    j = i
+    while j > 0 and t[j - 1] in b"0.-":
+        j -= 1
+    k = i + n
+    while k < len(t) and t[k] == 0x30:
+        k += 1
+    return (j == 0 or t[j - 1] in _TOKEN_BEFORE) and (k == len(t) or t[k] in _TOKEN_AFTER)
+
+
+def _orjson_float_differs(data: bytes) -> bool:
+    """Enthält die orjson-Ausgabe einen Float, den json.dumps anders schreibt?"""
+    t = data.translate(_DIGITS_TO_ZERO)
+    for src, pat in ((t, b"0e0"), (t, b"0e-0"), (data, b"0.0000")):
+        i = src.find(pat)
+        while i != -1:
+            if _number_at(t, i, len(pat)):
+                return True
+            i = src.find(pat, i + 1)
+    return False
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int], compact: bool) -> bytes:
+    kw: dict = {"separators": COMPACT_SEPARATORS} if compact else {"indent": indent}
+    try:
+        text = json.dumps(obj, ensure_ascii=False, allow_nan=False, **kw)
+    except ValueError:  # NaN/Infinity
+        text = json.dumps(_finite(obj), ensure_ascii=False, **kw)
+    return text.encode("utf-8")
+
+
+def dumps(obj: Any, indent: Optional[int] = 2, compact: bool = False) -> bytes:
+    """obj -> UTF-8-Bytes; compact=True ignoriert indent."""
+    if orjson is not None and BACKEND == "orjson" and (compact or indent == 2):
+        try:
+            data = orjson.dumps(obj, option=_ORJSON_OPTS if compact else _ORJSON_OPTS | orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # Fehler (oder Erfolg) wie bisher über die Standardbibliothek
+        else:
+            if not _orjson_float_differs(data):
+                return data
+    return _stdlib_dumps(obj, indent, compact)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None and BACKEND == "orjson":
+        try:
+            raw = data.encode("utf-8") if isinstance(data, str) else data
+        except UnicodeEncodeError:  # einzelne Surrogate
+            return json.loads(data)
+        if _BIG_INT not in raw.translate(_DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # BOM, NaN, ... -> Standardbibliothek (wirft ggf. denselben Fehler wie bisher)
+    return json.loads(data)
+
+
+def read_json(path: PathLike) -> Any:
+    """Liest und dekodiert eine JSON-Datei (zählt bytes_read für die laufende Stufe)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    utils_metrics.count("bytes_read", len(data))
+    return loads(data)
@@ -0,0 +1,231 @@
+# tools/utils_metrics.py
+"""
+Laufzeit- und I/O-Messung pro Build-Stufe -> .cache/build_metrics.json
+(oder BUILD_METRICS=<pfad>).
+
+Pro Stufe: Wall- und CPU-Zeit (gesamt und pro Phase), gelesene Zeilen und
+Bytes, geschriebene Bytes, geschriebene/unveränderte/gelöschte Dateien und
+der Peak-RSS des Prozesses am Ende der Stufe.
+
+    with utils_metrics.stage("build_json"):
+        utils_metrics.phase("load")
+        ...
+        utils_metrics.phase("write")   # beendet "load"
+        ...
+
+Die Zähler (count) werden in utils_csv / utils_cache / utils_output
+gesetzt und landen bei der Stufe, die im aktuellen Thread läuft; Threads,
+die für eine Stufe arbeiten (ParallelWriter), hängen sich per attach() an.
+Außerhalb einer Stufe wird nichts gezählt.
+
+cpu_s ist die CPU-Zeit des Stufen-Threads, process_cpu_s die des ganzen
+Prozesses im selben Zeitraum (inkl. Schreib-Threads, bei parallelen Stufen
+aber auch die der anderen Stufen).
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import utils_profile
+from utils_time import now_local_iso
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS_JSON = os.environ.get("BUILD_METRICS", "").strip() or os.path.join(REPO_ROOT, ".cache", "build_metrics.json")
+
+COUNTERS = ("rows_read", "bytes_read", "bytes_written", "files_written", "files_unchanged", "files_removed")
+
+_local = threading.local()
+_lock = threading.Lock()
+_records: Dict[str, "StageMetrics"] = {}
+
+
+def peak_rss_kb() -> Optional[int]:
+    # Linux: VmHWM gilt für das aktuelle Programm; ru_maxrss übernimmt bei
+    # fork+exec den Peak des Elternprozesses (verfälscht bench_scale)
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS liefert Bytes, Linux KiB
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class StageMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.status: Optional[str] = None
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.process_cpu_s = 0.0
+        self.peak_rss_kb: Optional[int] = None
+        self.counters: Dict[str, int] = {k: 0 for k in COUNTERS}
+        self.phases: List[Dict[str, Any]] = []
+        self._phase: Optional[tuple] = None  # (name, wall0, cpu0)
+
+    def add(self, key: str, n: int) -> None:
+        with _lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def _close_phase(self) -> None:
+        if self._phase is None:
+            return
+        name, wall0, cpu0 = self._phase
+        self.phases.append({
+            "name": name,
+            "wall_s": round(time.perf_counter() - wall0, 4),
+            "cpu_s": round(time.thread_time() - cpu0, 4),
+        })
+        self._phase = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {}
+        if self.status is not None:
+            d["status"] = self.status
+        d.update({
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "process_cpu_s": round(self.process_cpu_s, 4),
+            "peak_rss_kb": self.peak_rss_kb,
+        })
+        d.update(self.counters)
+        d["phases"] = self.phases
+        return d
+
+
+def current() -> Optional[StageMetrics]:
+    return getattr(_local, "stage", None)
+
+
+@contextmanager
+def attach(rec: Optional[StageMetrics]) -> Iterator[None]:
+    """Zählt im aktuellen Thread für rec (z.B. in Worker-Threads einer Stufe)."""
+    prev = current()
+    _local.stage = rec
+    try:
+        yield
+    finally:
+        _local.stage = prev
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageMetrics]:
+    rec = StageMetrics(name)
+    wall0, cpu0, proc0 = time.perf_counter(), time.thread_time(), time.process_time()
+    with attach(rec):
+        try:
+            yield rec
+        finally:
+            rec._close_phase()
+            rec.wall_s = time.perf_counter() - wall0
+            rec.cpu_s = time.thread_time() - cpu0
+            rec.process_cpu_s = time.process_time() - proc0
+            rec.peak_rss_kb = peak_rss_kb()
+            with _lock:
+                _records[name] = rec
+
+
+def phase(name: str) -> None:
+    """Beginnt eine neue Phase der laufenden Stufe (die vorige endet hier)."""
+    rec = current()
+    if rec is None:
+        return
+    rec._close_phase()
+    rec._phase = (name, time.perf_counter(), time.thread_time())
+
+
+def count(key: str, n: int = 1) -> None:
+    rec = current()
+    if rec is not None and n:
+        rec.add(key, n)
+
+
+def count_file_read(path: str) -> None:
+    try:
+        count("bytes_read", os.path.getsize(path))
+    except OSError:
+        pass
+
+
+def count_file_written(path: str) -> None:
+    """Für Dateien, die nicht über utils_output geschrieben werden."""
+    try:
+        count("bytes_written", os.path.getsize(path))
+        count("files_written")
+    except OSError:
+        pass
+
+
+def records() -> Dict[str, StageMetrics]:
+    with _lock:
+        return dict(_records)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_report(path: str = METRICS_JSON, replace: bool = False, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Schreibt die gesammelten Stufen nach path. replace=False: Stufen aus
+    früheren Einzelläufen bleiben stehen, gleichnamige werden ersetzt.
+    """
+    data = {} if replace else _load(path)
+    stages = data.get("stages") if isinstance(data.get("stages"), dict) else {}
+    for name, rec in records().items():
+        stages[name] = rec.as_dict()
+
+    totals = {k: sum(int(s.get(k) or 0) for s in stages.values()) for k in COUNTERS}
+    report: Dict[str, Any] = {
+        "generated_at": now_local_iso(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+    }
+    report.update(extra or {})
+    report["totals"] = totals
+    report["stages"] = dict(sorted(stages.items()))
+
+    # kein utils_output hier (das zählt selbst über dieses Modul)
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=os.path.basename(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return path
+
+
+def run_stage(name: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Für `python tools/<stufe>.py`: fn messen (mit --profile auch profilieren) und den Report aktualisieren."""
+    with stage(name) as rec, utils_profile.profiled(name):
+        rc = fn(*args)
+    rec.status = "ran" if rc in (None, 0) else "failed"
+    path = write_report()
+    print(
+        f"[metrics] {name}: wall={rec.wall_s:.2f}s cpu={rec.cpu_s:.2f}s "
+        f"rss={rec.peak_rss_kb}KB -> {os.path.relpath(path, REPO_ROOT)}"
+    )
+    return rc
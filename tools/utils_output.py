@@ -0,0 +1,532 @@
+# tools/utils_output.py
+"""
+Gemeinsame Ausgabeschicht für alle generierten Dateien unter docs/.
+
+- Schreiben ist atomar (Temp-Datei im Zielordner + os.replace), halbe
+  Dateien sieht weder der nächste Build noch GitHub Pages.
+- Ist der neue Inhalt byte-identisch mit der vorhandenen Datei, wird gar
+  nicht geschrieben.
+- Flüchtige Felder (z.B. "generated_at") zählen beim Vergleich nicht mit.
+  Hat sich sonst nichts geändert, bleibt der alte Zeitstempel stehen, die
+  Datei also byte-stabil. Den Zeitpunkt der letzten echten Änderung hält
+  docs/data/outputs_manifest.json fest.
+
+Format: JSON_STYLE=pretty (Default, indent=2 wie bisher) oder
+JSON_STYLE=compact (minimale Trenner, keine Einrückung); auf der
+Kommandozeile auch --compact / --pretty. Kodiert wird über utils_json
+(orjson, falls installiert, mit denselben Bytes).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import utils_json
+import utils_metrics
+from utils_time import now_local_iso
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUTS_MANIFEST_JSON = os.path.join(REPO_ROOT, "docs", "data", "outputs_manifest.json")
+
+VOLATILE_KEYS = ("generated_at",)
+
+# Manifest wird gelesen/geändert/geschrieben; Stufen können parallel laufen (build_all)
+_MANIFEST_LOCK = threading.RLock()
+
+COMPACT = (
+    "--compact" in sys.argv or os.environ.get("JSON_STYLE", "").strip().lower() == "compact"
+) and "--pretty" not in sys.argv
+COMPACT_SEPARATORS = utils_json.COMPACT_SEPARATORS
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def atomic_write_bytes(path: PathLike, data: bytes) -> None:
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    utils_metrics.count("bytes_written", len(data))
+    utils_metrics.count("files_written")
+
+
+def write_bytes_if_changed(path: PathLike, data: bytes) -> bool:
+    """Schreibt data nach path, außer die Datei hat schon genau diesen Inhalt. True = geschrieben."""
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    utils_metrics.count("files_unchanged")
+                    return False
+    except OSError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+def dump_json(
+    obj: Any, indent: Optional[int] = 2, newline: bool = False, compact: Optional[bool] = None
+) -> bytes:
+    """compact=None -> globales JSON_STYLE; compact=True ignoriert indent."""
+    data = utils_json.dumps(obj, indent, compact=COMPACT if compact is None else compact)
+    return data + b"\n" if newline else data
+
+
+def _manifest_key(path: PathLike) -> str:
+    return os.path.relpath(os.path.abspath(path), REPO_ROOT).replace(os.sep, "/")
+
+
+def load_outputs_manifest() -> Dict[str, Dict[str, Any]]:
+    try:
+        # ohne utils_json.read_json: bei jedem write_json gelesen, kein Stufen-Input
+        with open(OUTPUTS_MANIFEST_JSON, "rb") as f:
+            data = utils_json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return data.get("files") or {}
+
+
+def _save_outputs_manifest(files: Dict[str, Dict[str, Any]]) -> None:
+    payload = {"files": dict(sorted(files.items()))}
+    write_bytes_if_changed(OUTPUTS_MANIFEST_JSON, dump_json(payload, newline=True, compact=False))
+
+
+def outputs_manifest_entries(paths: Iterable[PathLike]) -> Dict[str, Dict[str, Any]]:
+    """Manifest-Einträge (content_sha1, changed_at, volatile) der Dateien, soweit vorhanden."""
+    with _MANIFEST_LOCK:
+        files = load_outputs_manifest()
+    keys = (_manifest_key(p) for p in paths)
+    return {k: files[k] for k in keys if k in files}
+
+
+def merge_outputs_manifest(entries: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Übernimmt Einträge (Schlüssel wie im Manifest, relativ zum Repo), z.B.
+    für Dateien, die nicht über write_json, sondern aus dem Stufen-Cache
+    zurückkamen. Returns Anzahl geänderter Einträge.
+    """
+    with _MANIFEST_LOCK:
+        files = load_outputs_manifest()
+        changed = 0
+        for key, entry in entries.items():
+            if files.get(key) != entry:
+                files[key] = entry
+                changed += 1
+        if changed:
+            _save_outputs_manifest(files)
+        return changed
+
+
+def _entry_from_existing(path: PathLike, volatile: Iterable[str]) -> Dict[str, Any]:
+    # Noch kein Manifest-Eintrag (erster Lauf): Zeitstempel aus der vorhandenen Datei übernehmen
+    try:
+        with open(path, "rb") as f:
+            old = utils_json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(old, dict) or not all(k in old for k in volatile):
+        return {}
+    stable = {k: v for k, v in old.items() if k not in volatile}
+    return {
+        "content_sha1": hashlib.sha1(dump_json(stable, None, compact=False)).hexdigest(),
+        "volatile": {k: old[k] for k in volatile},
+    }
+
+
+def _resolve_volatile(
+    path: PathLike,
+    content_sha1: str,
+    new_values: Dict[str, Any],
+    bootstrap: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Gleicht den Inhalts-Hash mit dem Manifest ab. Unverändert -> die alten
+    flüchtigen Werte (zum Wiederverwenden); geändert -> None, das Manifest
+    bekommt den neuen Hash und den Zeitpunkt der Änderung.
+    bootstrap: ohne Manifest-Eintrag liefert es den Eintrag aus der
+    vorhandenen Datei (Hash wie content_sha1 berechnet).
+    """
+    with _MANIFEST_LOCK:
+        files = load_outputs_manifest()
+        key = _manifest_key(path)
+        entry = files.get(key) or {}
+        if not entry and bootstrap is not None:
+            entry = bootstrap()
+        prev_values = entry.get("volatile") or {}
+
+        if entry.get("content_sha1") == content_sha1 and all(k in prev_values for k in new_values):
+            if key not in files:
+                files[key] = {
+                    "content_sha1": content_sha1,
+                    "changed_at": prev_values.get("generated_at") or now_local_iso(),
+                    "volatile": prev_values,
+                }
+                _save_outputs_manifest(files)
+            return {k: prev_values[k] for k in new_values}
+
+        files[key] = {
+            "content_sha1": content_sha1,
+            "changed_at": now_local_iso(),
+            "volatile": new_values,
+        }
+        _save_outputs_manifest(files)
+        return None
+
+
+def write_json(
+    path: PathLike,
+    obj: Any,
+    volatile: Iterable[str] = (),
+    indent: Optional[int] = 2,
+    newline: bool = False,
+    compact: Optional[bool] = None,
+) -> bool:
+    """
+    Schreibt obj als JSON (ensure_ascii=False wie bisher überall).
+    volatile: Top-Level-Schlüssel, die beim Änderungsvergleich ignoriert werden;
+    bei unverändertem Inhalt werden ihre Werte vom letzten Build übernommen.
+    True = Datei wurde geschrieben.
+    """
+    volatile = tuple(k for k in volatile if isinstance(obj, dict) and k in obj)
+    if not volatile:
+        return write_bytes_if_changed(path, dump_json(obj, indent, newline, compact))
+
+    stable = {k: v for k, v in obj.items() if k not in volatile}
+    content_sha1 = hashlib.sha1(dump_json(stable, None, compact=False)).hexdigest()
+
+    values = _resolve_volatile(
+        path, content_sha1, {k: obj[k] for k in volatile}, bootstrap=lambda: _entry_from_existing(path, volatile)
+    )
+    if values is not None:
+        # nichts Echtes geändert -> alte Zeitstempel behalten (byte-stabil)
+        obj = dict(obj)
+        obj.update(values)
+
+    return write_bytes_if_changed(path, dump_json(obj, indent, newline, compact))
+
+
+# =========================
+# Streaming: JSON stückweise kodieren und schreiben
+# =========================
+STREAM_BUFFER = 1024 * 1024
+
+
+def _is_stream(v: Any) -> bool:
+    return not isinstance(v, (str, bytes, dict, list, tuple)) and hasattr(v, "__next__")
+
+
+def iter_json_chunks(
+    obj: Dict[str, Any], indent: int = 2, volatile: Iterable[str] = (), compact: bool = False
+) -> Iterator[Tuple[str, bool]]:
+    """
+    Kodiert ein Top-Level-dict stückweise, byte-gleich zu dump_json(obj, indent,
+    compact=compact). Werte, die Iteratoren sind (z.B. Generatoren), werden als
+    Liste Element für Element kodiert, die Liste existiert nie vollständig im
+    Speicher.
+    Liefert (chunk, ist_flüchtiger_Wert).
+    """
+    volatile = set(volatile)
+    if compact:
+        pad1 = pad2 = ""
+        colon = ":"
+
+        def encode(v: Any, pad: str) -> str:
+            return utils_json.dumps(v, compact=True).decode("utf-8")
+    else:
+        pad1 = "\n" + " " * indent
+        pad2 = "\n" + " " * (2 * indent)
+        colon = ": "
+
+        def encode(v: Any, pad: str) -> str:
+            return utils_json.dumps(v, indent).decode("utf-8").replace("\n", pad)
+
+    if not obj:
+        yield "{}", False
+        return
+
+    yield "{", False
+    first = True
+    for key, value in obj.items():
+        yield ("" if first else ",") + pad1 + utils_json.dumps(key, compact=True).decode("utf-8") + colon, False
+        first = False
+        if _is_stream(value):
+            empty = True
+            for item in value:
+                yield ("[" if empty else ",") + pad2 + encode(item, pad2), False
+                empty = False
+            yield "[]" if empty else pad1 + "]", False
+        else:
+            yield encode(value, pad1), key in volatile
+    yield ("}" if compact else "\n}"), False
+
+
+def _stream_sha1(chunks: Iterable[Tuple[str, bool]]) -> str:
+    """Inhalts-Hash von write_json_stream: jeder flüchtige Wert zählt als ein Nullbyte."""
+    content = hashlib.sha1()
+    for chunk, is_volatile in chunks:
+        content.update(b"\0" if is_volatile else chunk.encode("utf-8"))
+    return content.hexdigest()
+
+
+def _stream_entry_from_existing(path: PathLike, volatile: Tuple[str, ...], indent: int, compact: bool) -> Dict[str, Any]:
+    # wie _entry_from_existing, aber mit dem Hash von write_json_stream
+    try:
+        with open(path, "rb") as f:
+            old = utils_json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(old, dict) or not all(k in old for k in volatile):
+        return {}
+    return {
+        "content_sha1": _stream_sha1(iter_json_chunks(old, indent, volatile, compact)),
+        "volatile": {k: old[k] for k in volatile},
+    }
+
+
+def _iter_file(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = None if end is None else end - start
+        while left is None or left > 0:
+            block = f.read(STREAM_BUFFER if left is None else min(STREAM_BUFFER, left))
+            if not block:
+                return
+            if left is not None:
+                left -= len(block)
+            yield block
+
+
+def _patched(path: str, patches: List[Tuple[int, int, bytes]]) -> Iterator[bytes]:
+    """Inhalt von path, wobei die Bereiche (offset, länge) durch neue Bytes ersetzt sind."""
+    pos = 0
+    for offset, length, data in patches:
+        yield from _iter_file(path, pos, offset)
+        yield data
+        pos = offset + length
+    yield from _iter_file(path, pos)
+
+
+def _same_content(path: str, blocks: Iterable[bytes]) -> bool:
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return False
+    with f:
+        for block in blocks:
+            if f.read(len(block)) != block:
+                return False
+        return f.read(1) == b""
+
+
+def write_json_stream(
+    path: PathLike,
+    obj: Dict[str, Any],
+    volatile: Iterable[str] = (),
+    indent: int = 2,
+    newline: bool = False,
+    compact: Optional[bool] = None,
+) -> bool:
+    """
+    Wie write_json, aber für große Payloads: obj darf Iteratoren als Werte
+    enthalten (siehe iter_json_chunks). Geschrieben wird in eine Temp-Datei im
+    Zielordner; erst danach wird verglichen und ggf. per os.replace übernommen.
+    Flüchtige Werte (volatile) werden wie bei write_json behandelt, ohne
+    Manifest-Eintrag also aus der vorhandenen Datei übernommen.
+    True = Datei wurde geschrieben.
+    """
+    volatile = tuple(k for k in volatile if k in obj)
+    compact = COMPACT if compact is None else compact
+    path = os.path.abspath(path)
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+
+    content = hashlib.sha1()
+    # (offset, länge, key) der flüchtigen Werte in der Temp-Datei
+    volatile_spans: List[Tuple[int, int, str]] = []
+    keys = iter(volatile)
+
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            buf: List[bytes] = []
+            buffered = 0
+            offset = 0
+            for chunk, is_volatile in iter_json_chunks(obj, indent, volatile, compact):
+                data = chunk.encode("utf-8")
+                if is_volatile:
+                    volatile_spans.append((offset, len(data), next(keys)))
+                    content.update(b"\0")
+                else:
+                    content.update(data)
+                buf.append(data)
+                buffered += len(data)
+                offset += len(data)
+                if buffered >= STREAM_BUFFER:
+                    f.write(b"".join(buf))
+                    buf, buffered = [], 0
+            if newline:
+                buf.append(b"\n")
+            f.write(b"".join(buf))
+        os.chmod(tmp, 0o644)
+
+        patches: List[Tuple[int, int, bytes]] = []
+        if volatile:
+            values = _resolve_volatile(
+                path,
+                content.hexdigest(),
+                {k: obj[k] for k in volatile},
+                bootstrap=lambda: _stream_entry_from_existing(path, volatile, indent, compact),
+            )
+            if values is not None:
+                # nichts Echtes geändert -> alte Zeitstempel wieder einsetzen
+                for off, length, k in volatile_spans:
+                    old = dump_json(values[k], indent, compact=compact).decode("utf-8")
+                    if not compact:
+                        old = old.replace("\n", "\n" + " " * indent)
+                    patches.append((off, length, old.encode("utf-8")))
+
+        if _same_content(path, _patched(tmp, patches)):
+            os.remove(tmp)
+            utils_metrics.count("files_unchanged")
+            return False
+
+        if patches:
+            fd2, tmp2 = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=os.path.basename(path))
+            with os.fdopen(fd2, "wb") as f:
+                for block in _patched(tmp, patches):
+                    f.write(block)
+            os.chmod(tmp2, 0o644)
+            os.replace(tmp2, tmp)
+        os.replace(tmp, path)
+        utils_metrics.count("bytes_written", os.path.getsize(path))
+        utils_metrics.count("files_written")
+        return True
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def last_changed(path: PathLike) -> Optional[str]:
+    """Zeitpunkt der letzten echten Inhaltsänderung laut Manifest (oder None)."""
+    return (load_outputs_manifest().get(_manifest_key(path)) or {}).get("changed_at")
+
+
+# =========================
+# Parallele Ausgabe vieler kleiner Dateien (Modell-JSONs)
+# =========================
+def write_threads() -> int:
+    """
+    Threads für das Schreiben vieler kleiner Dateien.
+    WRITE_THREADS=0/1: seriell im Hauptthread, sonst Zahl (Default 8).
+    """
+    v = os.environ.get("WRITE_THREADS", "").strip()
+    return int(v) if v.isdigit() else 8
+
+
+def json_workers() -> int:
+    """
+    Prozesse für die JSON-Serialisierung.
+    JSON_WORKERS=0/leer: im Hauptprozess, JSON_WORKERS=auto: alle CPUs, sonst Zahl.
+    """
+    v = os.environ.get("JSON_WORKERS", "").strip().lower()
+    if v == "auto":
+        return os.cpu_count() or 1
+    return int(v) if v.isdigit() else 0
+
+
+def serialize_many(objs: List[Any], workers: Optional[int] = None) -> Iterator[bytes]:
+    """dump_json(obj) für alle objs, optional im Prozesspool; Reihenfolge bleibt erhalten."""
+    if workers is None:
+        workers = json_workers()
+    # Stil explizit mitgeben, Kindprozesse sehen sys.argv nicht zuverlässig
+    dump = partial(dump_json, compact=COMPACT)
+    if workers <= 1 or len(objs) < 2 * workers:
+        return map(dump, objs)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return iter(list(ex.map(dump, objs, chunksize=max(1, len(objs) // (workers * 4)))))
+
+
+class ParallelWriter:
+    """
+    Schreibt Dateien über einen begrenzten Threadpool (write_bytes_if_changed).
+    Höchstens max_pending Aufträge sind gleichzeitig offen, damit der Speicher
+    nicht mit fertig serialisierten Dateien vollläuft. Wird derselbe Pfad
+    mehrfach übergeben, gewinnt wie beim seriellen Schreiben der letzte Aufruf.
+
+        with ParallelWriter() as w:
+            w.submit(path, data)
+    """
+
+    def __init__(self, threads: Optional[int] = None, max_pending: Optional[int] = None):
+        self.threads = write_threads() if threads is None else threads
+        self.written = 0
+        self.unchanged = 0
+        self._pool = ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, self.threads) * 4)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # Zähler der aufrufenden Stufe auch in den Worker-Threads fortführen
+        self._metrics = utils_metrics.current()
+
+    def _count(self, changed: bool) -> None:
+        with self._lock:
+            if changed:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def _write(self, path: str, data: bytes, before: Optional[Future]) -> None:
+        try:
+            if before is not None:
+                before.result()
+            with utils_metrics.attach(self._metrics):
+                self._count(write_bytes_if_changed(path, data))
+        finally:
+            self._slots.release()
+
+    def submit(self, path: PathLike, data: bytes) -> None:
+        path = os.path.abspath(path)
+        if self._pool is None:
+            self._count(write_bytes_if_changed(path, data))
+            return
+        self._slots.acquire()
+        # gleicher Pfad: erst nach dem vorigen Auftrag schreiben (letzter gewinnt)
+        before = self._pending.get(path)
+        try:
+            self._pending[path] = self._pool.submit(self._write, path, data, before)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True)
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            fut.result()  # erste Exception weiterreichen
+
+    def __enter__(self) -> "ParallelWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,187 @@
+# tools/utils_profile.py
+"""
+Profiling-Schalter für alle Skripte unter tools/.
+
+    python tools/build_stats.py --profile
+    PROFILE=1 python tools/build_all.py          # jede Stufe einzeln
+    PROFILE=1 PROFILE_TRACEMALLOC=30 python tools/build_labels.py
+
+Pro Lauf bzw. Stufe entstehen unter .cache/profile/ (PROFILE_DIR):
+
+- <name>.pstats: cProfile-Daten (python -m pstats, snakeviz, ...)
+- <name>.folded: "Stack;Stack;... Anzahl" für flamegraph.pl / speedscope;
+  die Stacks stammen aus einem Sampler-Thread (PROFILE_INTERVAL_MS,
+  Default 5), cProfile kennt nur Aufrufer-Paare, keine ganzen Stacks
+- <name>.alloc.txt (nur mit --tracemalloc / PROFILE_TRACEMALLOC=N):
+  die N Zeilen mit dem größten Speicherzuwachs während des Laufs
+
+cProfile und der Sampler sehen nur den Thread der Stufe; Schreib-Threads
+(ParallelWriter) fehlen also. Es kann nur ein cProfile gleichzeitig aktiv
+sein, build_all lässt die Stufen mit Profiling deshalb seriell laufen
+(BUILD_JOBS wird auf 1 gesetzt); das hält auch tracemalloc pro Stufe sauber.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "").strip() or os.path.join(REPO_ROOT, ".cache", "profile")
+
+ENABLED = "--profile" in sys.argv or os.environ.get("PROFILE", "").strip() == "1"
+
+
+def _int_env(name: str, default: int) -> int:
+    v = os.environ.get(name, "").strip()
+    return int(v) if v.isdigit() else default
+
+
+TRACEMALLOC_TOP = _int_env("PROFILE_TRACEMALLOC", 25 if "--tracemalloc" in sys.argv else 0)
+SAMPLE_INTERVAL = _int_env("PROFILE_INTERVAL_MS", 5) / 1000.0
+
+# tracemalloc ist prozessweit; läuft, solange irgendeine Stufe profiliert wird
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _depth(frame: Optional[FrameType]) -> int:
+    n = 0
+    while frame is not None:
+        n += 1
+        frame = frame.f_back
+    return n
+
+
+class _Sampler(threading.Thread):
+    """Sammelt die Stacks eines Threads in festen Abständen (collapsed stacks)."""
+
+    def __init__(self, ident: int, root: str, skip: int, interval: float):
+        super().__init__(name=f"profile-sampler-{root}", daemon=True)
+        self.target = ident
+        self.root = root
+        self.skip = skip  # Rahmen oberhalb des profilierten Blocks
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.reverse()
+            if self.skip < len(labels) and labels[self.skip].startswith("__exit__ (utils_profile.py"):
+                continue  # Stufe ist schon fertig, wartet nur auf den Sampler
+            self.stacks[";".join([self.root] + labels[self.skip:])] += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items()))
+
+
+class profiled:
+    """
+    Profiliert den Block, falls ENABLED (sonst ohne Wirkung):
+
+        with utils_profile.profiled("build_stats"):
+            build_stats.main(ds)
+    """
+
+    def __init__(self, name: str, enabled: Optional[bool] = None):
+        self.name = name
+        self.enabled = ENABLED if enabled is None else enabled
+        self._prof: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_Sampler] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> "profiled":
+        if not self.enabled:
+            return self
+        global _trace_users
+        if TRACEMALLOC_TOP:
+            with _trace_lock:
+                if _trace_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(10)
+                _trace_users += 1
+            self._snapshot = tracemalloc.take_snapshot()
+
+        caller = sys._getframe(1)
+        self._sampler = _Sampler(threading.get_ident(), self.name, _depth(caller), SAMPLE_INTERVAL)
+        self._sampler.start()
+        self._prof = cProfile.Profile()
+        self._prof.enable()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if not self.enabled or self._prof is None:
+            return
+        self._prof.disable()
+        self._sampler.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.name)
+
+        self._prof.dump_stats(base + ".pstats")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.write(self._sampler.folded())
+        written = [base + ".pstats", base + ".folded"]
+
+        if self._snapshot is not None:
+            self._write_alloc_report(base + ".alloc.txt")
+            written.append(base + ".alloc.txt")
+
+        out = io.StringIO()
+        pstats.Stats(self._prof, stream=out).sort_stats("cumulative").print_stats(12)
+        print(f"[profile] {self.name}: top functions by cumulative time")
+        print("\n".join(line for line in out.getvalue().splitlines() if line.strip()))
+        print(f"[profile] {self.name}: " + " ".join(os.path.relpath(p, REPO_ROOT) for p in written))
+
+    def _write_alloc_report(self, path: str) -> None:
+        global _trace_users
+        after = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        with _trace_lock:
+            _trace_users -= 1
+            if _trace_users == 0:
+                tracemalloc.stop()
+
+        skip = [tracemalloc.Filter(False, m.__file__) for m in (tracemalloc, cProfile, pstats)]
+        skip.append(tracemalloc.Filter(False, __file__))
+        diff = after.filter_traces(skip).compare_to(self._snapshot.filter_traces(skip), "lineno")
+        lines = [
+            f"# {self.name}: top {TRACEMALLOC_TOP} allocation sites by growth during the run",
+            f"# traced peak (process): {peak / 1024:.1f} KiB",
+        ]
+        for stat in diff[:TRACEMALLOC_TOP]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size_diff / 1024:10.1f} KiB {stat.count_diff:+8d} blocks  "
+                f"{os.path.relpath(frame.filename, REPO_ROOT)}:{frame.lineno}"
+            )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def run(name: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Für `__main__` von Skripten ohne Stufen-Metriken."""
+    with profiled(name):
+        return fn(*args)
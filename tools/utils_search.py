@@ -0,0 +1,206 @@
+# tools/utils_search.py
+"""
+Globaler Suchindex über Modelle, Flüge, Postkarten, Flugzeugtypen und
+Bemalungen (gebaut von build_search_index.py, gelesen von helper.js:
+searchGlobal und von SearchIndex hier für Tests/Benchmarks).
+
+Ablage unter docs/data/search/:
+- docs.json: alle Treffer-Kandidaten als [kind, id, label, url], die
+  Position in der Liste ist die Dokumentnummer
+- t_<c>.json: Postings {Term: [Dokumentnummern, delta-kodiert]} für alle
+  Terme, die mit dem Zeichen c beginnen (a-z, 0-9, sonst "_")
+- manifest.json: Version, Anzahl, Shards mit Größe und sha1 (für ?v=)
+
+Terme (auf normalize()-Text, Wörter = Folgen aus a-z0-9):
+- jedes Trigramm eines Worts ("a320" -> a32, 320)
+- "^" + die ersten 1-2 Zeichen eines Worts (Präfix für kurze Eingaben)
+
+Abfrage: jedes Wort der Eingabe muss passen (UND); Wörter ab 3 Zeichen
+über alle ihre Trigramme, kürzere als Wortanfang. Ein Trigramm-Treffer
+ist kein exakter Teilstring-Treffer ("a320" passt auch auf ein Dokument
+mit "a32x" und "1320"); wie oft das vorkommt, zeigt bench_search.py.
+Geladen werden nur die Shards der Anfangszeichen der Terme.
+
+    idx = SearchIndex()                    # liest docs/data/search
+    idx.search("lufthansa a320", kinds=["model"], limit=20)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import utils_json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH_DIR = os.path.join(REPO_ROOT, "docs", "data", "search")
+SEARCH_MANIFEST_JSON = os.path.join(SEARCH_DIR, "manifest.json")
+SEARCH_DOCS_JSON = os.path.join(SEARCH_DIR, "docs.json")
+SEARCH_VERSION = 1
+
+# Reihenfolge der Treffer (und der Dokumentnummern)
+KINDS = ("model", "flight", "postcard", "type", "livery")
+
+PREFIX = "^"
+PREFIX_LEN = 2
+NGRAM = 3
+
+_COMBINING_RE = re.compile("[\u0300-\u036f]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(s: Any) -> str:
+    """Kleinbuchstaben, ohne Akzente, ß -> ss, alles außer a-z0-9 als Leerzeichen (wie helper.js)."""
+    text = unicodedata.normalize("NFKD", str(s or "").lower())
+    text = _COMBINING_RE.sub("", text).replace("ß", "ss")
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def words(s: Any) -> List[str]:
+    return normalize(s).split()
+
+
+def word_terms(w: str) -> Set[str]:
+    terms = {PREFIX + w[:n] for n in range(1, min(PREFIX_LEN, len(w)) + 1)}
+    terms.update(w[i:i + NGRAM] for i in range(len(w) - NGRAM + 1))
+    return terms
+
+
+def doc_terms(texts: Iterable[Any]) -> Set[str]:
+    terms: Set[str] = set()
+    for text in texts:
+        for w in words(text):
+            terms |= word_terms(w)
+    return terms
+
+
+def query_terms(w: str) -> Set[str]:
+    """Terme, die ein Dokument für das Abfragewort w alle haben muss."""
+    if len(w) < NGRAM:
+        return {PREFIX + w[:PREFIX_LEN]}
+    return {w[i:i + NGRAM] for i in range(len(w) - NGRAM + 1)}
+
+
+def shard_of(term: str) -> str:
+    c = term.lstrip(PREFIX)[:1]
+    return c if c and ("a" <= c <= "z" or "0" <= c <= "9") else "_"
+
+
+def shard_filename(key: str) -> str:
+    return f"t_{key}.json"
+
+
+def encode_postings(ids: Sequence[int]) -> List[int]:
+    """Aufsteigende Dokumentnummern -> Abstände (kleinere Zahlen im JSON)."""
+    out, prev = [], 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+def decode_postings(gaps: Sequence[int]) -> List[int]:
+    out, cur = [], 0
+    for g in gaps:
+        cur += g
+        out.append(cur)
+    return out
+
+
+def build_postings(doc_texts: Sequence[Iterable[Any]]) -> Dict[str, Dict[str, List[int]]]:
+    """[Texte je Dokument] -> {Shard: {Term: delta-kodierte Dokumentnummern}}."""
+    postings: Dict[str, List[int]] = {}
+    for n, texts in enumerate(doc_texts):
+        for term in doc_terms(texts):
+            postings.setdefault(term, []).append(n)
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for term in sorted(postings):
+        shards.setdefault(shard_of(term), {})[term] = encode_postings(postings[term])
+    return shards
+
+
+class SearchIndex:
+    """Abfragen gegen den gebauten Index; Shards werden erst bei Bedarf gelesen."""
+
+    def __init__(self, search_dir: str = SEARCH_DIR):
+        self.search_dir = search_dir
+        manifest = utils_json.read_json(os.path.join(search_dir, "manifest.json"))
+        if not isinstance(manifest, dict) or manifest.get("version") != SEARCH_VERSION:
+            raise ValueError(f"search index: unsupported manifest in {search_dir}")
+        self.manifest = manifest
+        self.docs: List[List[Any]] = utils_json.read_json(os.path.join(search_dir, "docs.json"))["docs"]
+        self._shards: Dict[str, Dict[str, List[int]]] = {}
+
+    @classmethod
+    def from_memory(cls, docs: List[List[Any]], shards: Dict[str, Dict[str, List[int]]]) -> "SearchIndex":
+        """Index ohne Dateien (z.B. direkt aus build_postings für Benchmarks)."""
+        idx = cls.__new__(cls)
+        idx.search_dir = ""
+        idx.manifest = {"version": SEARCH_VERSION, "count": len(docs), "shards": {k: {} for k in shards}}
+        idx.docs = docs
+        idx._shards = dict(shards)
+        return idx
+
+    @property
+    def loaded_shards(self) -> List[str]:
+        return sorted(self._shards)
+
+    def _shard(self, key: str) -> Dict[str, List[int]]:
+        shard = self._shards.get(key)
+        if shard is None:
+            shard = {}
+            meta = self.manifest.get("shards", {}).get(key)
+            if meta and self.search_dir:
+                shard = utils_json.read_json(os.path.join(self.search_dir, meta["file"]))
+            self._shards[key] = shard
+        return shard
+
+    def postings(self, term: str) -> List[int]:
+        return decode_postings(self._shard(shard_of(term)).get(term, ()))
+
+    def match(self, q: str) -> List[int]:
+        """Dokumentnummern (aufsteigend), die zu allen Wörtern von q passen."""
+        terms: Set[str] = set()
+        for w in words(q):
+            terms |= query_terms(w)
+        if not terms:
+            return []
+        # kürzeste Liste zuerst, dann schneiden
+        lists = sorted((self.postings(t) for t in terms), key=len)
+        hits = set(lists[0])
+        for ids in lists[1:]:
+            if not hits:
+                break
+            hits.intersection_update(ids)
+        return sorted(hits)
+
+    def search(self, q: str, kinds: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        want = set(kinds) if kinds else None
+        out: List[Dict[str, Any]] = []
+        for n in self.match(q):
+            kind, doc_id, label, url = self.docs[n]
+            if want is not None and kind not in want:
+                continue
+            out.append({"kind": kind, "id": doc_id, "label": label, "url": url})
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+
+def linear_match(doc_texts: Sequence[Iterable[Any]], q: str) -> List[int]:
+    """Vergleich ohne Index: jedes Abfragewort als Teilstring eines Worts (Referenz für bench_search)."""
+    qs = words(q)
+    if not qs:
+        return []
+    out = []
+    for n, texts in enumerate(doc_texts):
+        ws = [w for text in texts for w in words(text)]
+        if all(any((w.startswith(x) if len(x) < NGRAM else x in w) for w in ws) for x in qs):
+            out.append(n)
+    return out
+
+
+def manifest_entry(key: str, data: bytes, terms: int) -> Dict[str, Any]:
+    return {"file": shard_filename(key), "terms": terms, "bytes": len(data), "sha1": hashlib.sha1(data).hexdigest()}
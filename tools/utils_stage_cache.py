@@ -0,0 +1,228 @@
+# tools/utils_stage_cache.py
+"""
+Inhaltsadressierter Cache für die Ausgaben der build_all-Stufen unter
+.cache/stages (wird im Workflow per actions/cache zwischen Läufen
+wiederhergestellt).
+
+- blobs/<sha1[:2]>/<sha1>: Dateiinhalte, dedupliziert über alle Einträge
+  (die meisten Modell-JSONs sind in aufeinanderfolgenden Einträgen gleich)
+- entries/<stage>-<key>.json: welche Ausgabedatei welchen Blob hat;
+  key = Hash aus Stufenskript + Eingaben (siehe build_all.input_key)
+
+Trifft der Schlüssel, werden die Ausgaben nur zurückkopiert statt die
+Stufe laufen zu lassen. Gesamtgröße: STAGE_CACHE_MAX_MB (Default 512),
+verdrängt werden die am längsten nicht benutzten Einträge, danach fliegen
+nicht mehr referenzierte Blobs raus. Abschalten wie beim Parse-Cache:
+--no-cache oder NO_CACHE=1.
+
+Der Eintrag hält auch die outputs_manifest.json-Einträge der Ausgaben
+(changed_at, Inhalts-Hash); beim Zurückkopieren kommen sie mit, sonst
+passte das Manifest nicht mehr zu den Dateien. Lesen/Schreiben von
+Blobs und Einträgen zählt nicht in die Metriken der Stufe (dort stehen
+nur die Ausgaben).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import utils_cache
+import utils_json
+import utils_metrics
+from utils_output import (
+    atomic_write_bytes,
+    dump_json,
+    merge_outputs_manifest,
+    outputs_manifest_entries,
+    write_bytes_if_changed,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGE_CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "stages")
+STAGE_CACHE_MAX_BYTES = int(os.environ.get("STAGE_CACHE_MAX_MB", "512") or 512) * 1024 * 1024
+
+# Dateitypen, die in Ordner-Ausgaben zählen (.html: statische Seiten, build_public_pages)
+OUTPUT_EXTS = (".json", ".html")
+
+
+def _rel(path: str) -> str:
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+
+
+def _expand(outputs: List[str]) -> Tuple[List[str], List[str]]:
+    """Ausgaben -> (Dateien, Ordner); Ordner zählen mit allen OUTPUT_EXTS-Dateien darin."""
+    files: List[str] = []
+    dirs: List[str] = []
+    for p in outputs:
+        if os.path.isdir(p):
+            dirs.append(p)
+            files.extend(os.path.join(p, fn) for fn in sorted(os.listdir(p)) if fn.endswith(OUTPUT_EXTS))
+        else:
+            files.append(p)
+    return files, dirs
+
+
+class StageCache:
+    def __init__(self, root: str = STAGE_CACHE_DIR, max_bytes: int = STAGE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = utils_cache.ENABLED
+        self.hits = 0
+        self.misses = 0
+        self.stored_bytes = 0
+        self.restored_files = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    # ---------- paths ----------
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, "blobs", sha[:2], sha)
+
+    def _entry_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, "entries", f"{stage}-{key}.json")
+
+    # ---------- lookup / restore ----------
+    def _load_entry(self, stage: str, key: str) -> Optional[Dict[str, object]]:
+        path = self._entry_path(stage, key)
+        try:
+            with utils_metrics.attach(None):
+                entry = utils_json.read_json(path)
+        except (OSError, ValueError):
+            return None
+        # Einträge von vor dem Manifest-Feld -> neu laufen lassen
+        if "manifest" not in entry:
+            return None
+        # unvollständig (Blob verdrängt/gelöscht) -> wie Fehlschlag behandeln
+        if not all(os.path.exists(self._blob_path(sha)) for sha in entry.get("files", {}).values()):
+            return None
+        return entry
+
+    def restore(self, stage: str, key: str) -> bool:
+        """Schreibt die gecachten Ausgaben zurück. True = Treffer."""
+        if not self.enabled:
+            return False
+        entry = self._load_entry(stage, key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        files: Dict[str, str] = entry.get("files", {})
+        restored = 0
+        for rel, sha in files.items():
+            with open(self._blob_path(sha), "rb") as f:
+                if write_bytes_if_changed(os.path.join(REPO_ROOT, rel), f.read()):
+                    restored += 1
+
+        # Ordner-Ausgaben: Dateien, die es im Eintrag nicht gibt, entfernen
+        for rel_dir in entry.get("dirs", []):
+            d = os.path.join(REPO_ROOT, rel_dir)
+            os.makedirs(d, exist_ok=True)
+            for fn in os.listdir(d):
+                if fn.endswith(OUTPUT_EXTS) and f"{rel_dir}/{fn}" not in files:
+                    os.remove(os.path.join(d, fn))
+                    restored += 1
+        for rel in entry.get("absent", []):
+            p = os.path.join(REPO_ROOT, rel)
+            if os.path.isfile(p):
+                os.remove(p)
+        merge_outputs_manifest(entry["manifest"])
+
+        os.utime(self._entry_path(stage, key))  # für die Verdrängung (zuletzt benutzt)
+        with self._lock:
+            self.hits += 1
+            self.restored_files += restored
+        return True
+
+    # ---------- store ----------
+    def store(self, stage: str, key: str, outputs: List[str]) -> None:
+        if not self.enabled:
+            return
+        files, dirs = _expand(outputs)
+        entry_files: Dict[str, str] = {}
+        absent: List[str] = []
+        stored = 0
+        for p in files:
+            if not os.path.isfile(p):
+                absent.append(_rel(p))
+                continue
+            with open(p, "rb") as f:
+                data = f.read()
+            sha = hashlib.sha1(data).hexdigest()
+            blob = self._blob_path(sha)
+            if not os.path.exists(blob):
+                with utils_metrics.attach(None):
+                    atomic_write_bytes(blob, data)
+                stored += len(data)
+            entry_files[_rel(p)] = sha
+
+        entry = {
+            "stage": stage,
+            "key": key,
+            "files": entry_files,
+            "dirs": [_rel(d) for d in dirs],
+            "absent": absent,
+            "manifest": outputs_manifest_entries(files),
+        }
+        with utils_metrics.attach(None):
+            atomic_write_bytes(self._entry_path(stage, key), dump_json(entry, compact=False))
+        with self._lock:
+            self.stored_bytes += stored
+
+    # ---------- eviction ----------
+    def evict(self) -> int:
+        """Verdrängt die ältesten Einträge bis zum Limit und löscht unreferenzierte Blobs."""
+        entries_dir = os.path.join(self.root, "entries")
+        blobs_dir = os.path.join(self.root, "blobs")
+        if not os.path.isdir(entries_dir):
+            return 0
+
+        blob_sizes: Dict[str, int] = {}
+        if os.path.isdir(blobs_dir):
+            for sub in os.listdir(blobs_dir):
+                for sha in os.listdir(os.path.join(blobs_dir, sub)):
+                    blob_sizes[sha] = os.path.getsize(os.path.join(blobs_dir, sub, sha))
+
+        entries: List[Tuple[float, str, List[str]]] = []
+        refs: Dict[str, int] = {}
+        for fn in os.listdir(entries_dir):
+            p = os.path.join(entries_dir, fn)
+            try:
+                shas = list(utils_json.read_json(p).get("files", {}).values())
+                mtime = os.path.getmtime(p)
+            except (OSError, ValueError):
+                shas, mtime = [], 0.0
+            entries.append((mtime, p, shas))
+            for sha in set(shas):
+                refs[sha] = refs.get(sha, 0) + 1
+
+        total = sum(blob_sizes.get(sha, 0) for sha in refs)
+        removed = 0
+        for _mtime, p, shas in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(p)
+            removed += 1
+            for sha in set(shas):
+                refs[sha] -= 1
+                if refs[sha] == 0:
+                    total -= blob_sizes.get(sha, 0)
+
+        for sha in blob_sizes:
+            if refs.get(sha, 0) <= 0:
+                try:
+                    os.remove(self._blob_path(sha))
+                except OSError:
+                    pass
+
+        self.evicted += removed
+        return removed
+
+    def report(self) -> str:
+        return (
+            f"[stage_cache] hits={self.hits} misses={self.misses} "
+            f"restored_files={self.restored_files} stored={self.stored_bytes} bytes "
+            f"evicted={self.evicted} limit={self.max_bytes // (1024 * 1024)}MB"
+        )